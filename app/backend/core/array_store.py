@@ -0,0 +1,66 @@
+# app/backend/core/array_store.py
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+# 파일 지문을 계산할 때 한 번에 읽는 블록 크기
+FINGERPRINT_BLOCK_BYTES = 1 << 20
+
+
+def lookup_ids(ids, order, values) -> np.ndarray:
+    """
+    원본 ID 배열을 values(인덱스 → ID 배열)의 인덱스로 변환합니다. (values에 없으면 -1)
+    order는 values의 오름차순 정렬 순서(argsort)이며, searchsorted(sorter=order)로 이진 탐색합니다.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if not len(values):
+        return np.full(len(ids), -1, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(values, ids, sorter=order), len(values) - 1)
+    idx = np.asarray(order[pos], dtype=np.int64)
+    return np.where(values[idx] == ids, idx, -1)
+
+
+def file_fingerprint(path: str) -> dict:
+    """
+    파일의 크기와 전체 내용의 해시. (FINGERPRINT_BLOCK_BYTES씩 나눠 읽으므로 메모리 사용량은 일정)
+    수정 시각을 쓰지 않으므로 같은 내용의 복사본은 같은 지문을 가지며, 크기가 같은 수정도 감지합니다.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(FINGERPRINT_BLOCK_BYTES), b""):
+            digest.update(block)
+            size += len(block)
+    return {"name": os.path.basename(path), "size": size, "digest": digest.hexdigest()}
+
+
+def save_array_dir(path: str, arrays: dict, meta: dict):
+    """
+    배열들을 path/<이름>.npy로, meta를 path/meta.json으로 저장합니다.
+    임시 디렉터리에 모두 쓴 뒤 교체하므로, 작성 중에도 기존 디렉터리를 읽는 프로세스에는 영향이 없습니다.
+    """
+    tmp_dir = path + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    old_dir = path + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_dir)
+    os.rename(tmp_dir, path)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_array_dir(path: str, names: list[str]) -> tuple[dict, dict]:
+    """save_array_dir로 저장한 배열을 메모리 맵으로 엽니다. 반환값: (이름 → 배열, meta)"""
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    return arrays, meta
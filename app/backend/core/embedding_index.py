@@ -0,0 +1,183 @@
+# app/backend/core/embedding_index.py
+
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy.orm import Session
+from backend.core.array_store import load_array_dir, save_array_dir
+from backend.core.matching_index import MatchingIndex, get_matching_index
+from backend.core.ncf_inference import NCF_MODEL_PATH, NCFPredictor, get_ncf_predictor
+
+EMBEDDING_INDEX_DIR = "app/data/embedding_index"
+
+# IVF(거친 양자화) 설정: 리스트 수가 0이면 버킷 안의 모든 후보와 비교합니다. (정확한 검색)
+IVF_LISTS = int(os.getenv("EMBEDDING_IVF_LISTS", "0"))
+IVF_PROBE = int(os.getenv("EMBEDDING_IVF_PROBE", "8"))
+
+# 한 번에 코사인 유사도를 계산하는 후보 행 수 (행렬-벡터 곱 블록 크기)
+BLOCK_ROWS = 1 << 16
+
+ARRAY_NAMES = ["vectors", "valid", "centroids", "list_indptr", "list_rows"]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def spherical_kmeans(vectors: np.ndarray, n_lists: int, n_iter: int = 10, seed: int = 42) -> tuple:
+    """정규화된 벡터의 구면 k-means. 반환값: (정규화된 중심 (n_lists, d), 행별 리스트 번호)"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+class EmbeddingIndex:
+    """
+    NCF 사용자 임베딩 기반 유사 사용자 인덱스.
+
+    - 행 순서는 MatchingIndex와 같아(성별, 나이, ml_user_id 순), candidate_range의 나이/성별 구간을 그대로 씁니다.
+    - vectors는 L2 정규화한 연속 float32 행렬이므로, 코사인 유사도가 행렬-벡터 곱 한 번입니다.
+    - NCF 모델에 없는 사용자(학습 샘플에 평점이 없던 사용자)는 valid=False로 후보에서 제외합니다.
+    - IVF를 쓰면 k-means 중심 중 질의와 가까운 IVF_PROBE개 리스트의 행만 비교합니다. (근사 검색)
+    """
+
+    def __init__(self, vectors, valid, centroids, list_indptr, list_rows, meta: dict):
+        self.vectors = vectors
+        self.valid = valid
+        self.centroids = centroids
+        self.list_indptr = list_indptr
+        self.list_rows = list_rows
+        self.meta = meta
+
+    @classmethod
+    def build(cls, index: MatchingIndex, predictor: NCFPredictor, model_mtime: float, n_lists: int = IVF_LISTS):
+        user_idx = predictor.user_index(index.row_user_ids)
+        valid = user_idx >= 0
+        vectors = np.zeros((len(user_idx), predictor.user_embedding.shape[1]), dtype=np.float32)
+        vectors[valid] = _normalize(predictor.user_embedding[user_idx[valid]])
+
+        n_lists = min(n_lists, int(valid.sum()))
+        if n_lists > 0:
+            centroids, assign = spherical_kmeans(vectors[valid], n_lists)
+            rows = np.flatnonzero(valid)
+            order = np.lexsort((rows, assign))  # 리스트 안에서는 행 번호 오름차순 (구간 필터에 searchsorted 사용)
+            list_rows = rows[order].astype(np.int64)
+            list_indptr = np.zeros(n_lists + 1, dtype=np.int64)
+            np.cumsum(np.bincount(assign, minlength=n_lists), out=list_indptr[1:])
+        else:
+            centroids = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            list_rows = np.zeros(0, dtype=np.int64)
+            list_indptr = np.zeros(1, dtype=np.int64)
+
+        meta = {"version": index.version, "model_mtime": model_mtime, "n_rows": len(vectors), "n_lists": n_lists}
+        return cls(vectors, valid, centroids, list_indptr, list_rows, meta)
+
+    def matches(self, index: MatchingIndex, model_mtime: float, n_lists: int = IVF_LISTS) -> bool:
+        """매칭 인덱스(rating 버전)와 모델 파일, IVF 설정이 인덱스를 만들 때와 같은지 확인합니다."""
+        return self.meta.get("version") == index.version and self.meta.get("model_mtime") == model_mtime \
+            and self.meta.get("n_rows") == len(index.row_user_ids) \
+            and self.meta.get("n_lists") == min(n_lists, int(np.count_nonzero(self.valid)))
+
+    def save(self, path: str = EMBEDDING_INDEX_DIR):
+        """배열을 .npy로 저장합니다. 임시 디렉터리에 쓴 뒤 교체하므로 읽는 프로세스에 영향이 없습니다."""
+        save_array_dir(path, {name: getattr(self, name) for name in ARRAY_NAMES}, self.meta)
+
+    @classmethod
+    def load(cls, path: str = EMBEDDING_INDEX_DIR):
+        """저장된 인덱스를 메모리 맵으로 엽니다."""
+        arrays, meta = load_array_dir(path, ARRAY_NAMES)
+        return cls(meta=meta, **arrays)
+
+    def _candidate_rows(self, query: np.ndarray, lo: int, hi: int, n_probe: int):
+        """IVF: 질의와 가까운 n_probe개 리스트에서 행 구간 [lo, hi)에 속하는 행 번호 배열"""
+        n_probe = min(n_probe, len(self.centroids))
+        probed = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        rows = []
+        for lst in probed:
+            list_rows = self.list_rows[self.list_indptr[lst]:self.list_indptr[lst + 1]]
+            rows.append(list_rows[np.searchsorted(list_rows, lo):np.searchsorted(list_rows, hi)])
+        return np.sort(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+
+    def search(self, index: MatchingIndex, lo: int, hi: int, query_vector: np.ndarray, k: int = 1,
+               n_probe: int = IVF_PROBE) -> list[tuple[int, float]]:
+        """
+        행 구간 [lo, hi)의 후보 중 질의 벡터와 코사인 유사도가 가장 높은 k명을 [(ml_user_id, 유사도), ...]로 반환합니다.
+        블록 단위 행렬-벡터 곱으로 유사도를 구하고, 블록마다 argpartition으로 상위 k개만 남깁니다.
+        IVF로 탐색한 리스트에 구간 안의 후보가 k명보다 적으면 구간 전체를 비교하므로, 유효한 후보가 있으면 항상 결과가 있습니다.
+        """
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        rows = self._candidate_rows(query, lo, hi, n_probe) if len(self.centroids) else None
+        if rows is not None and np.count_nonzero(self.valid[rows]) < k:
+            # 탐색한 리스트에 나이/성별 구간의 후보가 k명보다 적으면, 구간 전체를 정확히 비교합니다.
+            rows = None
+        n = (hi - lo) if rows is None else len(rows)
+
+        best_rows, best_scores = [], []
+        for start in range(0, n, BLOCK_ROWS):
+            block = np.arange(lo + start, min(lo + start + BLOCK_ROWS, hi)) if rows is None \
+                else rows[start:start + BLOCK_ROWS]
+            block = block[self.valid[block]]
+            if not len(block):
+                continue
+            scores = self.vectors[block] @ query
+            top = min(k, len(block))
+            part = np.argpartition(-scores, top - 1)[:top]
+            best_rows.append(block[part])
+            best_scores.append(scores[part])
+        if not best_rows:
+            return []
+
+        rows, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+        user_ids = index.row_user_ids[rows]
+        order = np.lexsort((user_ids, -scores))[:k]  # 동점이면 ml_user_id가 작은 사용자 우선
+        return [(int(user_ids[i]), float(scores[i])) for i in order]
+
+
+def fold_in_query(predictor: NCFPredictor, movie_ids) -> np.ndarray:
+    """설문 선호 영화로 fold-in한 사용자 임베딩 (NCF 사용자 임베딩과 같은 공간의 질의 벡터)"""
+    movie_idx = predictor.movie_index(sorted(movie_ids))
+    return predictor.fold_in(movie_idx[movie_idx >= 0])
+
+
+# --- 프로세스 전역 인덱스 캐시 ---
+_embedding_index = None
+_embedding_index_lock = threading.Lock()
+
+
+def get_embedding_index(db: Session, model_path: str = NCF_MODEL_PATH):
+    """
+    매칭 인덱스와 같은 rating 버전, 같은 모델 파일로 만든 임베딩 인덱스를 반환합니다.
+    메모리 → 파일(메모리 맵) → 새로 생성(후 파일 저장) 순서로 찾습니다. 모델 파일이 없으면 (index, None, None).
+    """
+    global _embedding_index
+    index = get_matching_index(db)
+    predictor = get_ncf_predictor(model_path)
+    if predictor is None:
+        return index, None, None
+    model_mtime = os.path.getmtime(model_path)
+    with _embedding_index_lock:
+        if _embedding_index is not None and _embedding_index.matches(index, model_mtime):
+            return index, _embedding_index, predictor
+
+        if os.path.exists(os.path.join(EMBEDDING_INDEX_DIR, "meta.json")):
+            loaded = EmbeddingIndex.load(EMBEDDING_INDEX_DIR)
+            if loaded.matches(index, model_mtime):
+                _embedding_index = loaded
+                return index, _embedding_index, predictor
+
+        print(f"⏳ 임베딩 인덱스 생성 중... (IVF 리스트 {IVF_LISTS}개)")
+        start = time.perf_counter()
+        _embedding_index = EmbeddingIndex.build(index, predictor, model_mtime)
+        _embedding_index.save(EMBEDDING_INDEX_DIR)
+        print(f"✅ 임베딩 인덱스 생성 및 저장 완료 ({time.perf_counter() - start:.2f}초)")
+        return index, _embedding_index, predictor
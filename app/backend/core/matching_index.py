@@ -0,0 +1,262 @@
+# app/backend/core/matching_index.py
+
+import os
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+from backend.db import crud
+from backend.core.rating_dataset import DATASET_DIR, open_dataset
+
+# 평점 (사용자, 영화) 쌍을 읽어올 곳: "db"(rating 테이블) 또는 "dataset"(컴파일된 평점 데이터셋 메모리 맵)
+INDEX_SOURCE = os.getenv("MATCHING_INDEX_SOURCE", "db")
+
+# best_match_anytime이 마감 시각을 확인하는 간격 (후보 행 수)
+ANYTIME_ROWS = 1 << 14
+
+
+class MatchingIndex:
+    """
+    유사 사용자 매칭용 MovieLens 사용자 × 영화 이진 행렬(CSR) 인덱스.
+
+    - 행은 (성별, 나이, ml_user_id) 순으로 정렬되어 있어, 나이/성별 1차 필터링 결과가
+      항상 연속된 행 구간이 됩니다.
+    - 행별 시청 영화 수(|B|)를 미리 계산해 두어, 자카드 유사도를
+      |A∩B| / (|A| + |B| - |A∩B|) 형태의 희소 행렬-벡터 곱 한 번으로 구합니다.
+    """
+
+    def __init__(self, matrix, row_user_ids, row_genders, row_ages, movie_ids, version=0):
+        self.matrix = matrix
+        self.row_user_ids = row_user_ids
+        self.row_genders = row_genders
+        self.row_ages = row_ages
+        self.movie_ids = movie_ids
+        self.version = version
+        self.row_sizes = np.diff(matrix.indptr).astype(np.int64)
+        self._id_order = np.argsort(row_user_ids, kind="stable")
+
+        # 성별별 행 구간과 (성별, 나이) 버킷별 행 구간
+        self.gender_ranges = {}
+        self.bucket_ranges = {}
+        bucket_keys = list(zip(row_genders.tolist(), row_ages.tolist()))
+        start = 0
+        for i in range(1, len(bucket_keys) + 1):
+            if i == len(bucket_keys) or bucket_keys[i] != bucket_keys[start]:
+                gender, age = bucket_keys[start]
+                self.bucket_ranges[(gender, age)] = (start, i)
+                g_start, _ = self.gender_ranges.get(gender, (start, i))
+                self.gender_ranges[gender] = (g_start, i)
+                start = i
+
+    @classmethod
+    def build(cls, db: Session, version: int = 0):
+        """DB의 movie_lens_data / rating 테이블로부터 인덱스를 생성합니다."""
+        profiles = crud.get_ml_user_profiles(db)
+        pairs = crud.get_rating_pairs(db)
+
+        user_ids = np.array([p.ml_user_id for p in profiles], dtype=np.int64)
+        genders = np.array([p.gender or "" for p in profiles], dtype=object)
+        ages = np.array([p.age if p.age is not None else -1 for p in profiles], dtype=np.int64)
+        pair_users = np.fromiter((p.ml_user_id for p in pairs), dtype=np.int64, count=len(pairs))
+        pair_movies = np.fromiter((p.movie_id for p in pairs), dtype=np.int64, count=len(pairs))
+
+        return cls.from_arrays(user_ids, genders, ages, pair_users, pair_movies, version)
+
+    @classmethod
+    def from_dataset(cls, db: Session, dataset, version: int = 0):
+        """
+        컴파일된 평점 데이터셋(메모리 맵)의 평점으로 인덱스를 생성합니다. DB에서는 사용자 프로필과 영화 ID만 읽습니다.
+        적재 스크립트와 같은 필터(평점 1.0~5.0, DB에 있는 사용자/영화)를 적용하므로,
+        DB가 이 데이터셋으로 적재되었다면 build()와 같은 인덱스가 됩니다.
+        """
+        profiles = crud.get_ml_user_profiles(db)
+        user_ids = np.array([p.ml_user_id for p in profiles], dtype=np.int64)
+        genders = np.array([p.gender or "" for p in profiles], dtype=object)
+        ages = np.array([p.age if p.age is not None else -1 for p in profiles], dtype=np.int64)
+
+        rating = np.asarray(dataset.rating)
+        valid = (rating >= 1.0) & (rating <= 5.0)
+        pair_users = np.asarray(dataset.user_ids)[dataset.user_idx[valid]].astype(np.int64)
+        pair_movies = np.asarray(dataset.movie_ids)[dataset.movie_idx[valid]].astype(np.int64)
+        known_movies = np.array([movie_id for movie_id, _ in crud.get_all_movie_titles(db)], dtype=np.int64)
+        in_db = np.isin(pair_movies, known_movies)
+
+        return cls.from_arrays(user_ids, genders, ages, pair_users[in_db], pair_movies[in_db], version)
+
+    def export_arrays(self) -> dict:
+        """인덱스를 구성하는 NumPy 배열들을 이름별로 반환합니다."""
+        return {
+            "data": self.matrix.data,
+            "indptr": self.matrix.indptr,
+            "indices": self.matrix.indices,
+            "row_user_ids": self.row_user_ids,
+            "row_genders": self.row_genders.astype(str),
+            "row_ages": self.row_ages,
+            "movie_ids": self.movie_ids,
+        }
+
+    @classmethod
+    def from_exported(cls, arrays: dict, version: int = 0):
+        """export_arrays()의 배열들로 인덱스를 복사 없이 다시 구성합니다."""
+        indptr = arrays["indptr"]
+        matrix = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], indptr),
+            shape=(len(indptr) - 1, len(arrays["movie_ids"])),
+            copy=False,
+        )
+        return cls(matrix, arrays["row_user_ids"], arrays["row_genders"], arrays["row_ages"],
+                   arrays["movie_ids"], version)
+
+    @classmethod
+    def from_arrays(cls, user_ids, genders, ages, pair_users, pair_movies, version=0):
+        """사용자 프로필 배열과 (사용자, 영화) 쌍 배열로 인덱스를 생성합니다."""
+        gender_values, gender_codes = np.unique(genders.astype(str), return_inverse=True)
+        order = np.lexsort((user_ids, ages, gender_codes))
+        row_user_ids = user_ids[order]
+        row_genders = gender_values[gender_codes[order]]
+        row_ages = ages[order]
+
+        # ml_user_id → 행 번호
+        id_order = np.argsort(row_user_ids)
+        sorted_ids = row_user_ids[id_order]
+        known = np.isin(pair_users, sorted_ids)
+        pair_users, pair_movies = pair_users[known], pair_movies[known]
+        rows = id_order[np.searchsorted(sorted_ids, pair_users)]
+
+        movie_ids = np.unique(pair_movies)
+        cols = np.searchsorted(movie_ids, pair_movies)
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(row_user_ids), len(movie_ids)),
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1  # 같은 (사용자, 영화) 평점이 여러 건이어도 1로 취급
+
+        return cls(matrix, row_user_ids, row_genders, row_ages, movie_ids, version)
+
+    def candidate_range(self, gender: str, age_min: int, age_max: int) -> tuple[int, int]:
+        """성별이 같고 나이가 [age_min, age_max]인 후보들의 행 구간을 반환합니다."""
+        if gender not in self.gender_ranges:
+            return 0, 0
+        g_start, g_end = self.gender_ranges[gender]
+        ages = self.row_ages[g_start:g_end]
+        lo = g_start + int(np.searchsorted(ages, age_min, side="left"))
+        hi = g_start + int(np.searchsorted(ages, age_max, side="right"))
+        return lo, hi
+
+    def query_vector(self, movie_ids) -> np.ndarray:
+        """영화 ID 집합을 행렬 열 공간의 0/1 벡터로 변환합니다. (인덱스에 없는 영화는 제외)"""
+        query = np.zeros(len(self.movie_ids), dtype=np.int32)
+        ids = np.fromiter(movie_ids, dtype=np.int64)
+        if len(ids) and len(self.movie_ids):
+            cols = np.searchsorted(self.movie_ids, ids)
+            cols = np.minimum(cols, len(self.movie_ids) - 1)
+            query[cols[self.movie_ids[cols] == ids]] = 1
+        return query
+
+    def jaccard(self, lo: int, hi: int, movie_ids: set) -> np.ndarray:
+        """행 구간 [lo, hi)의 각 사용자와 movie_ids 간 자카드 유사도를 한 번에 계산합니다."""
+        intersection = self.matrix[lo:hi] @ self.query_vector(movie_ids)
+        union = self.row_sizes[lo:hi] + len(movie_ids) - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(union > 0, intersection / np.maximum(union, 1), 0.0)
+
+    def row_of(self, ml_user_id: int):
+        """ml_user_id의 행 번호를 반환합니다. (없으면 None)"""
+        pos = int(np.searchsorted(self.row_user_ids, ml_user_id, sorter=self._id_order))
+        if pos < len(self._id_order) and self.row_user_ids[self._id_order[pos]] == ml_user_id:
+            return int(self._id_order[pos])
+        return None
+
+    def overlap_movie_ids(self, ml_user_id: int, movie_ids: set) -> list[int]:
+        """ml_user_id가 평가한 영화 중 movie_ids에 포함된 영화 ID 목록을 반환합니다."""
+        row = self.row_of(ml_user_id)
+        if row is None:
+            return []
+        watched = self.movie_ids[self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]]
+        return sorted(set(watched.tolist()) & set(movie_ids))
+
+    def best_match(self, lo: int, hi: int, movie_ids: set):
+        """
+        행 구간 [lo, hi) 중 평점 기록이 있는 후보 가운데 자카드 유사도가 가장 높은 사용자를 찾습니다.
+        동점이면 ml_user_id가 가장 작은 사용자를 반환합니다. (기존 루프와 동일한 결과)
+        """
+        rated = self.row_sizes[lo:hi] > 0
+        if not rated.any():
+            return None, 0
+        similarities = self.jaccard(lo, hi, movie_ids)
+        max_similarity = similarities[rated].max()
+        winners = rated & (similarities == max_similarity)
+        best_user_id = int(self.row_user_ids[lo:hi][winners].min())
+        return best_user_id, float(max_similarity)
+
+    def best_match_anytime(self, lo: int, hi: int, movie_ids: set, deadline: float, chunk: int = ANYTIME_ROWS):
+        """
+        마감 시각(time.perf_counter 기준)까지만 계산하는 best_match입니다.
+        행 구간 [lo, hi)를 chunk행씩 나눠 유사도를 계산하고, 매 청크 전에 마감 시각을 확인해 지났으면 지금까지의 최고 후보를 반환합니다.
+        완료되면 best_match와 같은 결과입니다. (동점이면 ml_user_id가 작은 사용자)
+        반환값: ((ml_user_id, 유사도) 또는 (None, 0), 완료 여부, 유사도를 계산한 후보 비율)
+        """
+        best = None  # (유사도, -ml_user_id)
+        complete = True
+        end = lo
+        for start in range(lo, hi, chunk):
+            if time.perf_counter() >= deadline:
+                complete = False
+                break
+            end = min(start + chunk, hi)
+            rated = self.row_sizes[start:end] > 0
+            if not rated.any():
+                continue
+            similarities = self.jaccard(start, end, movie_ids)
+            top = similarities[rated].max()
+            winner = int(self.row_user_ids[start:end][rated & (similarities == top)].min())
+            if best is None or (float(top), -winner) > best:
+                best = (float(top), -winner)
+
+        scanned = (end - lo) / (hi - lo) if hi > lo else 1.0
+        if best is None:
+            return (None, 0), complete, scanned
+        return (-best[1], best[0]), complete, scanned
+
+
+# --- 프로세스 전역 인덱스 캐시 ---
+_index = None
+_index_lock = threading.Lock()
+
+
+def peek_matching_index(version: int):
+    """이미 만들어 둔 매칭 인덱스가 rating 버전 version의 것이면 반환합니다. (없거나 오래되었으면 None, 새로 만들지 않음)"""
+    with _index_lock:
+        if _index is not None and _index.version == version:
+            return _index
+        return None
+
+
+def get_matching_index(db: Session) -> MatchingIndex:
+    """
+    프로세스 전역 매칭 인덱스를 반환합니다.
+    rating 테이블의 데이터 버전이 바뀌었으면 인덱스를 다시 생성합니다.
+    """
+    global _index
+    with _index_lock:
+        version = crud.get_data_version(db, "rating")
+        if _index is None or _index.version != version:
+            print(f"⏳ 매칭 인덱스 생성 중... (rating 버전: {version}, 원본: {INDEX_SOURCE})")
+            if INDEX_SOURCE == "dataset":
+                _index = MatchingIndex.from_dataset(db, open_dataset(DATASET_DIR), version)
+            else:
+                _index = MatchingIndex.build(db, version)
+            print(f"✅ 매칭 인덱스 생성 완료: 사용자 {_index.matrix.shape[0]}명 × 영화 {_index.matrix.shape[1]}편, "
+                  f"평점 {_index.matrix.nnz}건")
+        return _index
+
+
+def invalidate_matching_index():
+    """다음 호출 시 인덱스를 다시 생성하도록 캐시를 비웁니다."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,226 @@
+# app/backend/core/minhash_lsh.py
+
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy.orm import Session
+from backend.core.matching_index import MatchingIndex, get_matching_index
+
+LSH_FILE_PATH = "app/data/minhash_lsh.npz"
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+# 설문 선호 영화(5~10편)와 MovieLens 시청 목록(수십~수백 편)의 자카드 값은 매우 작기 때문에,
+# 밴드당 행 수(rows)를 작게, 밴드 수(bands)를 크게 잡아야 후보를 놓치지 않습니다.
+DEFAULT_BANDS = 128
+DEFAULT_ROWS = 1
+
+# 서명 계산 시 (평점 수 × 해시 수) 임시 배열 크기 상한
+_MAX_HASH_BLOCK = 1 << 24
+
+
+class MinHashLSH:
+    """
+    MovieLens 사용자별 MinHash 서명과 밴드 LSH 버킷 테이블.
+
+    - 서명: h_i(x) = (a_i * movie_id + b_i) mod p 의 사용자별 최솟값 (bands × rows 개)
+    - 버킷: 밴드마다 rows개 서명을 하나의 64비트 키로 합친 뒤 정렬해 두고, searchsorted로 조회합니다.
+    - 후보는 MatchingIndex의 CSR 행으로 정확한 자카드 유사도를 다시 계산해 순위를 매깁니다.
+    """
+
+    def __init__(self, signatures, band_keys, band_rows, a, b, band_mults, bands, rows, version=0):
+        self.signatures = signatures
+        self.band_keys = band_keys
+        self.band_rows = band_rows
+        self.a = a
+        self.b = b
+        self.band_mults = band_mults
+        self.bands = bands
+        self.rows = rows
+        self.version = version
+
+    @classmethod
+    def build(cls, index: MatchingIndex, bands: int = DEFAULT_BANDS, rows: int = DEFAULT_ROWS, seed: int = 42):
+        """매칭 인덱스의 CSR 행렬로부터 서명과 버킷 테이블을 NumPy 벡터 연산으로 생성합니다."""
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        a = rng.integers(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        b = rng.integers(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        band_mults = rng.integers(1, np.iinfo(np.int64).max, size=rows, dtype=np.uint64) | np.uint64(1)
+
+        matrix = index.matrix
+        n_rows = matrix.shape[0]
+        signatures = np.full((n_rows, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+        nonempty = np.flatnonzero(index.row_sizes > 0)
+        if len(nonempty):
+            values = index.movie_ids[matrix.indices].astype(np.uint64)
+            starts = matrix.indptr[nonempty]
+            step = max(1, _MAX_HASH_BLOCK // max(len(values), 1))
+            for p in range(0, num_perm, step):
+                hashed = (values[:, None] * a[None, p:p + step] + b[None, p:p + step]) % MERSENNE_PRIME
+                signatures[nonempty, p:p + step] = np.minimum.reduceat(hashed, starts, axis=0)
+
+        band_keys = np.empty((bands, len(nonempty)), dtype=np.uint64)
+        band_rows = np.empty((bands, len(nonempty)), dtype=np.int32)
+        for band in range(bands):
+            keys = cls._band_key(signatures[nonempty, band * rows:(band + 1) * rows], band_mults)
+            order = np.argsort(keys, kind="stable")
+            band_keys[band] = keys[order]
+            band_rows[band] = nonempty[order]
+
+        return cls(signatures, band_keys, band_rows, a, b, band_mults, bands, rows, index.version)
+
+    @staticmethod
+    def _band_key(band_signatures, band_mults):
+        """밴드의 rows개 서명 값을 하나의 64비트 키로 합칩니다. (uint64 오버플로는 mod 2^64로 동작)"""
+        return (band_signatures.astype(np.uint64) * band_mults).sum(axis=-1, dtype=np.uint64)
+
+    def signature(self, movie_ids) -> np.ndarray:
+        """영화 ID 집합의 MinHash 서명을 계산합니다."""
+        values = np.fromiter(movie_ids, dtype=np.uint64)
+        if not len(values):
+            return np.full(len(self.a), np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashed = (values[:, None] * self.a[None, :] + self.b[None, :]) % MERSENNE_PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def candidates(self, movie_ids) -> np.ndarray:
+        """하나 이상의 밴드에서 같은 버킷에 들어가는 행 번호들을 반환합니다."""
+        query_keys = self._band_key(self.signature(movie_ids).reshape(self.bands, self.rows), self.band_mults)
+        found = []
+        for band in range(self.bands):
+            keys = self.band_keys[band]
+            lo = np.searchsorted(keys, query_keys[band], side="left")
+            hi = np.searchsorted(keys, query_keys[band], side="right")
+            if hi > lo:
+                found.append(self.band_rows[band, lo:hi])
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(found))
+
+    def query(self, index: MatchingIndex, lo: int, hi: int, movie_ids: set):
+        """
+        행 구간 [lo, hi)에 속한 LSH 후보만 정확한 자카드 유사도로 재정렬해 최고 후보를 반환합니다.
+        반환값: (ml_user_id, 유사도, 재계산한 후보 수). 후보가 없으면 (None, 0, 0).
+        """
+        rows = self.candidates(movie_ids)
+        rows = rows[(rows >= lo) & (rows < hi)]
+        if not len(rows):
+            return None, 0, 0
+        intersection = index.matrix[rows] @ index.query_vector(movie_ids)
+        union = index.row_sizes[rows] + len(movie_ids) - intersection
+        similarities = intersection / union
+        max_similarity = similarities.max()
+        best_user_id = int(index.row_user_ids[rows][similarities == max_similarity].min())
+        return best_user_id, float(max_similarity), len(rows)
+
+    def save(self, path: str = LSH_FILE_PATH):
+        """서명과 버킷 테이블을 압축 없는 바이너리(.npz) 파일로 저장합니다."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(
+            path,
+            signatures=self.signatures, band_keys=self.band_keys, band_rows=self.band_rows,
+            a=self.a, b=self.b, band_mults=self.band_mults,
+            meta=np.array([self.bands, self.rows, self.version], dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: str = LSH_FILE_PATH):
+        with np.load(path) as data:
+            bands, rows, version = (int(v) for v in data["meta"])
+            return cls(
+                data["signatures"], data["band_keys"], data["band_rows"],
+                data["a"], data["b"], data["band_mults"], bands, rows, version,
+            )
+
+
+# --- 프로세스 전역 LSH 캐시 ---
+_lsh = None
+_lsh_lock = threading.Lock()
+
+
+def get_lsh_index(db: Session, bands: int = DEFAULT_BANDS, rows: int = DEFAULT_ROWS):
+    """
+    매칭 인덱스와 같은 rating 버전의 LSH 인덱스를 반환합니다.
+    메모리 → 파일 → 새로 생성(후 파일 저장) 순서로 찾습니다.
+    """
+    global _lsh
+    index = get_matching_index(db)
+    with _lsh_lock:
+        if _lsh is not None and (_lsh.version, _lsh.bands, _lsh.rows) == (index.version, bands, rows) \
+                and _lsh.signatures.shape[0] == index.matrix.shape[0]:
+            return index, _lsh
+
+        if os.path.exists(LSH_FILE_PATH):
+            loaded = MinHashLSH.load(LSH_FILE_PATH)
+            if (loaded.version, loaded.bands, loaded.rows) == (index.version, bands, rows) \
+                    and loaded.signatures.shape[0] == index.matrix.shape[0]:
+                _lsh = loaded
+                return index, _lsh
+
+        print(f"⏳ MinHash-LSH 인덱스 생성 중... (bands={bands}, rows={rows})")
+        start = time.perf_counter()
+        _lsh = MinHashLSH.build(index, bands=bands, rows=rows)
+        _lsh.save(LSH_FILE_PATH)
+        print(f"✅ MinHash-LSH 인덱스 생성 및 저장 완료 ({time.perf_counter() - start:.2f}초)")
+        return index, _lsh
+
+
+def recall_latency_report(index: MatchingIndex, configs, n_queries: int = 200, picks: int = 10, seed: int = 0):
+    """
+    정확한 매칭(MatchingIndex.best_match)과 LSH 매칭의 recall@1과 지연 시간을 비교합니다.
+    질의는 평점 기록이 있는 MovieLens 사용자의 시청 영화 중 picks편을 무작위로 골라 만듭니다.
+    동점 후보가 여러 명일 수 있으므로, LSH가 찾은 유사도가 정확한 최댓값과 같으면 적중으로 봅니다.
+    """
+    rng = np.random.default_rng(seed)
+    rated_rows = np.flatnonzero(index.row_sizes > 0)
+    if not len(rated_rows):
+        print("❌ 평점 기록이 있는 사용자가 없습니다.")
+        return []
+
+    queries = []
+    for row in rng.choice(rated_rows, size=min(n_queries, len(rated_rows)), replace=False):
+        watched = index.movie_ids[index.matrix.indices[index.matrix.indptr[row]:index.matrix.indptr[row + 1]]]
+        movie_ids = set(rng.choice(watched, size=min(picks, len(watched)), replace=False).tolist())
+        age = int(index.row_ages[row])
+        queries.append((index.row_genders[row], age - 5, age + 5, movie_ids))
+
+    exact_results, exact_times = [], []
+    for gender, age_min, age_max, movie_ids in queries:
+        start = time.perf_counter()
+        lo, hi = index.candidate_range(gender, age_min, age_max)
+        exact_results.append(index.best_match(lo, hi, movie_ids))
+        exact_times.append(time.perf_counter() - start)
+
+    def percentiles(times):
+        p50, p95, p99 = np.percentile(np.array(times) * 1000, [50, 95, 99])
+        return f"p50={p50:.3f}ms p95={p95:.3f}ms p99={p99:.3f}ms"
+
+    print(f"\n--- 📏 MinHash-LSH recall@1 / 지연 시간 리포트 (질의 {len(queries)}개, 선택 영화 {picks}편) ---")
+    print(f"[exact]          {percentiles(exact_times)}")
+
+    report = []
+    for bands, rows in configs:
+        start = time.perf_counter()
+        lsh = MinHashLSH.build(index, bands=bands, rows=rows)
+        build_sec = time.perf_counter() - start
+
+        hits, misses, times, n_candidates = 0, 0, [], []
+        for (gender, age_min, age_max, movie_ids), (_, exact_similarity) in zip(queries, exact_results):
+            start = time.perf_counter()
+            lo, hi = index.candidate_range(gender, age_min, age_max)
+            best_user_id, similarity, n_checked = lsh.query(index, lo, hi, movie_ids)
+            times.append(time.perf_counter() - start)
+            n_candidates.append(n_checked)
+            if best_user_id is None:
+                misses += 1
+            elif np.isclose(similarity, exact_similarity):
+                hits += 1
+
+        recall = hits / len(queries)
+        print(f"[bands={bands:>3} rows={rows}] recall@1={recall:.3f}  후보 없음={misses}  "
+              f"평균 재계산 후보={np.mean(n_candidates):.1f}명  {percentiles(times)}  (생성 {build_sec:.2f}초)")
+        report.append({"bands": bands, "rows": rows, "recall_at_1": recall, "no_candidate": misses,
+                       "build_sec": build_sec, "latency_ms": np.array(times) * 1000})
+    return report
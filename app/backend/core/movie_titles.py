@@ -0,0 +1,38 @@
+# app/backend/core/movie_titles.py
+
+import threading
+
+from sqlalchemy.orm import Session
+from backend.db import crud
+
+# --- 프로세스 전역 제목 → 영화 ID 인덱스 (pref_movie_ids가 없는 예전 설문 행 전용) ---
+_title_index = None  # (데이터 버전, 제목 → 영화 ID 사전)
+_title_index_lock = threading.Lock()
+
+
+def get_title_index(db: Session) -> dict:
+    """
+    영화 제목 → 영화 ID 사전을 반환합니다. 처음 호출할 때 한 번의 쿼리로 만듭니다.
+    movie.title이 바뀌면(데이터 버전 'movie_title') 다시 만듭니다.
+    MovieLens에는 같은 제목의 영화가 있으므로, 제목이 겹치면 movie_id가 가장 작은 영화를 사용합니다.
+    """
+    global _title_index
+    with _title_index_lock:
+        version = crud.get_data_version(db, "movie_title")
+        if _title_index is None or _title_index[0] != version:
+            index = {}
+            for movie_id, title in crud.get_all_movie_titles(db):
+                index.setdefault(title, movie_id)
+            _title_index = (version, index)
+        return _title_index[1]
+
+
+def resolve_pref_movie_ids(db: Session, user) -> list[int]:
+    """
+    신규 사용자의 선호 영화 ID 목록을 반환합니다.
+    설문에서 저장한 pref_movie_ids가 있으면 그대로 쓰고, 없는 예전 행은 제목 인덱스로 변환합니다.
+    """
+    if user.pref_movie_ids is not None:
+        return list(user.pref_movie_ids)
+    index = get_title_index(db)
+    return [index[title] for title in (user.pref_movie_list or []) if title in index]
@@ -0,0 +1,186 @@
+# app/backend/core/ncf_inference.py
+
+import os
+import threading
+import time
+
+import numpy as np
+from backend.core.array_store import lookup_ids
+
+# 서빙 프로세스가 사용할 모델 (.npz) 경로 (NCF_MODEL_PATH 환경 변수로 변경 가능)
+NCF_MODEL_PATH = os.getenv("NCF_MODEL_PATH", os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', '..', 'model_server', 'ncf_model_light.npz')))
+
+# 설문 선호 영화를 몇 점짜리 평점으로 보고 사용자 임베딩을 맞출지
+FOLD_IN_TARGET_RATING = 5.0
+
+# export_ncf.py가 .npz에 저장하는 배열 (이름 → 모양)
+# - user_embedding (n_users, d) / movie_embedding (n_movies, d): Embedding 테이블
+# - w1 (2d, 32), b1 / w2 (32, 16), b2 / w3 (16, 1), b3: Dense 층 가중치 (Keras kernel과 같은 (입력, 출력) 모양)
+# - user_ids / movie_ids: 인덱스 → 원본 ID (평점 데이터셋의 매핑과 같음)
+NCF_ARRAY_NAMES = [
+    "user_embedding", "movie_embedding",
+    "w1", "b1", "w2", "b2", "w3", "b3",
+    "user_ids", "movie_ids",
+]
+
+
+class NCFPredictor:
+    """
+    mysqlmovie.py의 NCF 모델(임베딩 → concat → Dense 32 → 16 → 1, ReLU)을 NumPy 행렬 연산만으로 계산하는 예측기.
+    TensorFlow를 import하지 않으므로 서빙 프로세스의 시작 시간과 메모리 사용량이 작습니다.
+    """
+
+    def __init__(self, arrays: dict):
+        for name in NCF_ARRAY_NAMES:
+            setattr(self, name, np.asarray(arrays[name]))
+        dim = self.user_embedding.shape[1]
+        # concat(user, movie) @ w1 == user @ w1[:d] + movie @ w1[d:] 이므로 첫 층을 사용자/영화 부분으로 나눠 둡니다.
+        self.w1_user = np.ascontiguousarray(self.w1[:dim])
+        self.w1_movie = np.ascontiguousarray(self.w1[dim:])
+        self._user_order = np.argsort(self.user_ids, kind="stable")
+        self._movie_order = np.argsort(self.movie_ids, kind="stable")
+        self._movie_hidden = None
+        self.mean_user_embedding = self.user_embedding.mean(axis=0)
+
+    @classmethod
+    def load(cls, path: str) -> "NCFPredictor":
+        with np.load(path) as npz:
+            return cls({name: npz[name] for name in NCF_ARRAY_NAMES})
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def n_movies(self) -> int:
+        return len(self.movie_ids)
+
+    def user_index(self, user_ids) -> np.ndarray:
+        """원본 userId 배열을 임베딩 인덱스로 변환합니다. (학습에 없던 사용자는 -1)"""
+        return lookup_ids(user_ids, self._user_order, self.user_ids)
+
+    def movie_index(self, movie_ids) -> np.ndarray:
+        """원본 movieId 배열을 임베딩 인덱스로 변환합니다. (학습에 없던 영화는 -1)"""
+        return lookup_ids(movie_ids, self._movie_order, self.movie_ids)
+
+    def _head(self, hidden1: np.ndarray) -> np.ndarray:
+        """첫 Dense 층의 (ReLU 이전) 출력에서 최종 예측 평점을 계산합니다."""
+        h = np.maximum(hidden1, 0)
+        h = np.maximum(h @ self.w2 + self.b2, 0)
+        return (h @ self.w3 + self.b3)[:, 0]
+
+    def predict_indices(self, user_idx, movie_idx) -> np.ndarray:
+        """(사용자 인덱스, 영화 인덱스) 쌍 배열의 예측 평점을 한 번의 배치 연산으로 계산합니다."""
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        movie_idx = np.asarray(movie_idx, dtype=np.int64)
+        hidden1 = self.user_embedding[user_idx] @ self.w1_user + self.movie_embedding[movie_idx] @ self.w1_movie
+        return self._head(hidden1 + self.b1)
+
+    def predict(self, user_ids, movie_ids) -> np.ndarray:
+        """원본 (userId, movieId) 쌍 배열의 예측 평점. 학습에 없던 사용자/영화가 섞인 쌍은 NaN입니다."""
+        user_idx = self.user_index(user_ids)
+        movie_idx = self.movie_index(movie_ids)
+        known = (user_idx >= 0) & (movie_idx >= 0)
+        scores = np.full(len(user_idx), np.nan, dtype=np.float32)
+        if known.any():
+            scores[known] = self.predict_indices(user_idx[known], movie_idx[known])
+        return scores
+
+    def movie_hidden(self) -> np.ndarray:
+        """모든 영화의 첫 Dense 층 기여분 (movie_embedding @ w1_movie + b1). 한 번 계산해 재사용합니다."""
+        if self._movie_hidden is None:
+            self._movie_hidden = self.movie_embedding @ self.w1_movie + self.b1
+        return self._movie_hidden
+
+    def predict_user(self, user_idx: int, movie_idx=None) -> np.ndarray:
+        """
+        한 사용자의 (전체 또는 지정한) 영화별 예측 평점.
+        사용자 기여분은 한 번만 계산하고 미리 계산한 영화 기여분에 더하므로, 첫 층 비용이 영화 수와 무관해집니다.
+        """
+        return self.predict_embedding(self.user_embedding[user_idx], movie_idx)
+
+    def predict_embedding(self, user_vector: np.ndarray, movie_idx=None) -> np.ndarray:
+        """모델에 없는 사용자 임베딩(fold_in 결과 등)으로 (전체 또는 지정한) 영화별 예측 평점을 계산합니다."""
+        movie_hidden = self.movie_hidden() if movie_idx is None else self.movie_hidden()[np.asarray(movie_idx)]
+        return self._head(movie_hidden + np.asarray(user_vector, dtype=self.w1_user.dtype) @ self.w1_user)
+
+    def fold_in(self, movie_idx, ratings=None, steps: int = 50, lr: float = 0.05, reg: float = 0.1) -> np.ndarray:
+        """
+        새 사용자의 임베딩을 학습 없이 끼워 넣습니다. (fold-in)
+        영화 임베딩과 MLP 가중치는 고정하고, 사용자 임베딩 하나만 평점에 맞도록 Adam으로 steps번 갱신합니다.
+        - 시작점과 정규화 기준이 학습된 사용자 임베딩의 평균이므로, 선호 영화가 몇 편뿐이어도 평균 취향에서 지나치게 벗어나지 않습니다.
+        - ratings를 주지 않으면 모든 영화를 FOLD_IN_TARGET_RATING점으로 봅니다. (설문 선호 영화)
+        """
+        movie_idx = np.asarray(movie_idx, dtype=np.int64)
+        target = np.full(len(movie_idx), FOLD_IN_TARGET_RATING, dtype=np.float32) if ratings is None \
+            else np.asarray(ratings, dtype=np.float32)
+        anchor = self.mean_user_embedding.astype(np.float32)
+        if not len(movie_idx):
+            return anchor.copy()
+
+        movie_hidden = self.movie_hidden()[movie_idx]
+        w3 = self.w3[:, 0]
+        u = anchor.copy()
+        m = np.zeros_like(u)
+        v = np.zeros_like(u)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for t in range(1, steps + 1):
+            # 순전파 (_head와 같은 계산, 역전파에 필요한 중간값 보관)
+            pre1 = movie_hidden + u @ self.w1_user
+            h1 = np.maximum(pre1, 0)
+            pre2 = h1 @ self.w2 + self.b2
+            h2 = np.maximum(pre2, 0)
+            pred = h2 @ w3 + self.b3[0]
+
+            # 역전파: loss = mean((pred - target)^2) + reg * ||u - anchor||^2
+            d_pred = 2.0 * (pred - target) / len(target)
+            d_pre2 = d_pred[:, None] * w3[None, :] * (pre2 > 0)
+            d_pre1 = (d_pre2 @ self.w2.T) * (pre1 > 0)
+            grad = self.w1_user @ d_pre1.sum(axis=0) + 2.0 * reg * (u - anchor)
+
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad * grad
+            u = u - lr * (m / (1 - beta1 ** t)) / (np.sqrt(v / (1 - beta2 ** t)) + eps)
+        return u.astype(np.float32)
+
+    def predict_users(self, user_idx) -> np.ndarray:
+        """여러 사용자의 전체 영화 예측 평점 행렬 (사용자 수, 영화 수). 메모리는 사용자 수 × 영화 수 × 32에 비례합니다."""
+        user_hidden = self.user_embedding[np.asarray(user_idx)] @ self.w1_user
+        hidden1 = (user_hidden[:, None, :] + self.movie_hidden()[None, :, :]).reshape(-1, self.w1.shape[1])
+        return self._head(hidden1).reshape(len(user_hidden), self.n_movies)
+
+
+# --- 프로세스 전역 예측기 (서빙용) ---
+_ncf_predictor = None
+_ncf_predictor_mtime = None
+_ncf_predictor_lock = threading.Lock()
+
+
+def get_ncf_predictor(path: str = NCF_MODEL_PATH):
+    """
+    프로세스 전역 NCF 예측기를 반환합니다. 모델 파일이 없으면 None.
+    export_ncf.py로 파일을 다시 내보내면(수정 시각 변경) 다음 호출 때 새로 읽습니다.
+    """
+    global _ncf_predictor, _ncf_predictor_mtime
+    with _ncf_predictor_lock:
+        if not os.path.exists(path):
+            return None
+        mtime = os.path.getmtime(path)
+        if _ncf_predictor is None or _ncf_predictor_mtime != mtime:
+            _ncf_predictor = NCFPredictor.load(path)
+            _ncf_predictor.movie_hidden()
+            _ncf_predictor_mtime = mtime
+        return _ncf_predictor
+
+
+def fold_in_scores(predictor: NCFPredictor, movie_ids, steps: int = 50) -> tuple:
+    """
+    선호 영화 ID 목록으로 사용자 임베딩을 fold-in한 뒤, 전체 영화의 예측 평점 벡터를 반환합니다.
+    반환값: (예측 평점 배열 (predictor.movie_ids 순서), 모델에 있는 선호 영화 인덱스, 소요 시간(ms))
+    """
+    start = time.perf_counter()
+    movie_idx = predictor.movie_index(movie_ids)
+    movie_idx = movie_idx[movie_idx >= 0]
+    scores = predictor.predict_embedding(predictor.fold_in(movie_idx, steps=steps))
+    return scores, movie_idx, (time.perf_counter() - start) * 1000
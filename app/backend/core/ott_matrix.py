@@ -0,0 +1,95 @@
+# app/backend/core/ott_matrix.py
+
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+from backend.db import crud
+from backend.db.ott_mask import decode_ott_mask
+
+
+class OttMatrix:
+    """
+    영화 × OTT 플랫폼 제공 여부 행렬 (NumPy bool).
+
+    - 행: OTT 정보가 있는 영화 (movie_id 오름차순, searchsorted로 행 번호 조회)
+    - 열: 비트 위치가 부여된 ott_table의 플랫폼 (ott_name 오름차순)
+    추천은 선택된 영화 행들의 (가중) 열 합계로 계산합니다.
+    """
+
+    def __init__(self, movie_ids, masks, ott_bits, ott_names, version=0):
+        self.movie_ids = movie_ids
+        self.masks = masks
+        self.ott_bits = ott_bits
+        self.ott_names = ott_names
+        self.version = version
+        self.names_by_bit = dict(zip(ott_bits.tolist(), ott_names))
+        # 비트마스크를 (영화 × 플랫폼) bool 행렬로 한 번에 펼칩니다.
+        self.available = ((masks[:, None] >> ott_bits[None, :]) & 1).astype(bool)
+
+    @classmethod
+    def build(cls, db: Session, version: int = 0):
+        """movie.ott_mask와 ott_table.bit_position으로부터 행렬을 생성합니다."""
+        platforms = sorted(
+            (o for o in crud.get_all_ott_platforms(db) if o.bit_position is not None),
+            key=lambda o: o.ott_name,
+        )
+        ott_bits = np.array([o.bit_position for o in platforms], dtype=np.int64)
+        ott_names = [o.ott_name for o in platforms]
+
+        rows = sorted(crud.get_movie_ott_masks(db))
+        movie_ids = np.array([movie_id for movie_id, _ in rows], dtype=np.int64)
+        masks = np.array([mask for _, mask in rows], dtype=np.int64)
+
+        return cls(movie_ids, masks, ott_bits, ott_names, version)
+
+    def rows_of(self, movie_ids) -> tuple[np.ndarray, np.ndarray]:
+        """movie_id 목록의 행 번호와, 각 영화가 행렬에 있는지 여부를 반환합니다."""
+        ids = np.asarray(list(movie_ids), dtype=np.int64)
+        if not len(self.movie_ids) or not len(ids):
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        rows = np.minimum(np.searchsorted(self.movie_ids, ids), len(self.movie_ids) - 1)
+        return rows, self.movie_ids[rows] == ids
+
+    def scores(self, movie_ids, weights=None) -> np.ndarray:
+        """선택된 영화들에 대한 플랫폼별 (가중) 제공 편수를 계산합니다."""
+        rows, found = self.rows_of(movie_ids)
+        selected = self.available[rows[found]]
+        if weights is None:
+            return selected.sum(axis=0, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)[found]
+        return weights @ selected
+
+    def rank(self, movie_ids, weights=None) -> list[tuple[str, float]]:
+        """플랫폼을 점수 내림차순으로 정렬해 [(OTT 이름, 점수), ...]로 반환합니다. (점수 0인 플랫폼 제외)"""
+        scores = self.scores(movie_ids, weights)
+        order = np.argsort(-scores, kind="stable")
+        return [(self.ott_names[col], float(scores[col])) for col in order if scores[col] > 0]
+
+    def mask_of(self, movie_id: int) -> int:
+        """영화 한 편의 OTT 비트마스크를 반환합니다. (OTT 정보가 없으면 0)"""
+        rows, found = self.rows_of([movie_id])
+        return int(self.masks[rows[0]]) if found[0] else 0
+
+    def platforms_of(self, movie_id: int) -> list[str]:
+        """영화 한 편을 제공하는 OTT 이름 목록을 반환합니다."""
+        return decode_ott_mask(self.mask_of(movie_id), self.names_by_bit)
+
+
+# --- 프로세스 전역 캐시 ---
+_ott_matrix = None
+_ott_matrix_lock = threading.Lock()
+
+
+def get_ott_matrix(db: Session) -> OttMatrix:
+    """
+    프로세스 전역 OTT 행렬을 반환합니다.
+    movie.ott_mask 또는 ott_table이 바뀌면(데이터 버전 'movie_ott') 다시 생성합니다.
+    """
+    global _ott_matrix
+    with _ott_matrix_lock:
+        version = crud.get_data_version(db, "movie_ott")
+        if _ott_matrix is None or _ott_matrix.version != version:
+            _ott_matrix = OttMatrix.build(db, version)
+            print(f"✅ OTT 행렬 생성 완료: 영화 {len(_ott_matrix.movie_ids)}편 × OTT {len(_ott_matrix.ott_names)}개")
+        return _ott_matrix
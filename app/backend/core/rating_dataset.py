@@ -0,0 +1,141 @@
+# app/backend/core/rating_dataset.py
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from backend.core.array_store import file_fingerprint, load_array_dir, lookup_ids, save_array_dir
+from backend.core.rating_sampler import SAMPLE_FRACTION, SAMPLE_SEED, CHUNK_ROWS, iter_sampled_ratings
+
+DATASET_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'rating_dataset'))
+
+# 데이터셋을 구성하는 배열 파일 (이름 → 설명)
+# - user_ids / movie_ids: 인덱스 → 원본 ID (샘플 파일에서 처음 등장한 순서, 기존 unique() 매핑과 같음)
+# - user_order / movie_order: 원본 ID 오름차순 정렬 순서 (ID → 인덱스 이진 탐색용)
+# - user_idx / movie_idx / rating: 샘플 평점 (파일 순서)
+# - user_indptr / csr_movie_idx / csr_rating: 사용자별 평점 (CSR, 사용자 안에서는 movie_idx 오름차순)
+ARRAY_NAMES = [
+    "user_ids", "movie_ids", "user_order", "movie_order",
+    "user_idx", "movie_idx", "rating",
+    "user_indptr", "csr_movie_idx", "csr_rating",
+]
+
+
+class RatingDataset:
+    """
+    compile_dataset()이 만든 평점 데이터셋을 np.load(mmap_mode='r')로 연 읽기 전용 뷰.
+    배열은 OS 페이지 캐시를 통해 여러 프로세스가 복사 없이 공유합니다.
+    """
+
+    def __init__(self, arrays: dict, meta: dict, path: str):
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.meta = meta
+        self.path = path
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def n_movies(self) -> int:
+        return len(self.movie_ids)
+
+    def user_index(self, user_ids) -> np.ndarray:
+        """원본 userId 배열을 사용자 인덱스로 변환합니다. (데이터셋에 없으면 -1)"""
+        return lookup_ids(user_ids, self.user_order, self.user_ids)
+
+    def movie_index(self, movie_ids) -> np.ndarray:
+        """원본 movieId 배열을 영화 인덱스로 변환합니다. (데이터셋에 없으면 -1)"""
+        return lookup_ids(movie_ids, self.movie_order, self.movie_ids)
+
+    def user_ratings(self, user_idx: int):
+        """사용자 인덱스의 (영화 인덱스 배열, 평점 배열)을 반환합니다."""
+        start, end = self.user_indptr[user_idx], self.user_indptr[user_idx + 1]
+        return self.csr_movie_idx[start:end], self.csr_rating[start:end]
+
+    def is_current(self, csv_path: str, frac: float = SAMPLE_FRACTION) -> bool:
+        """원본 CSV와 샘플링 기준이 데이터셋을 만들 때와 같은지 확인합니다."""
+        return self.meta.get("source") == _source_signature(csv_path) \
+            and self.meta.get("frac") == frac and self.meta.get("seed") == SAMPLE_SEED
+
+
+def _source_signature(csv_path: str) -> dict:
+    # 적재 스크립트(app/backend/data)와 모델 서버가 같은 파일의 복사본을 쓰므로 수정 시각 대신 내용 지문을 비교합니다.
+    return file_fingerprint(csv_path)
+
+
+def _append_new_ids(known_ids: list, seen: set, chunk_ids: np.ndarray):
+    """청크에서 처음 등장한 ID를 등장 순서대로 known_ids에 추가합니다."""
+    for value in pd.unique(chunk_ids).tolist():
+        if value not in seen:
+            seen.add(value)
+            known_ids.append(value)
+
+
+def compile_dataset(csv_path: str, out_dir: str = DATASET_DIR, chunk_rows: int = CHUNK_ROWS,
+                    frac: float = SAMPLE_FRACTION) -> RatingDataset:
+    """
+    ratings.csv를 공용 해시 샘플러로 한 번 읽어, 샘플 평점을 타입이 고정된 .npy 열 배열로 저장합니다.
+    임시 디렉터리에 모두 쓴 뒤 교체하므로, 작성 중에도 기존 데이터셋을 읽는 프로세스에는 영향이 없습니다.
+    frac=1.0이면 전체 평점으로 만듭니다. (DB에 적재되는 샘플과는 ID 매핑이 다르므로 out_dir을 따로 지정)
+    """
+    start = time.perf_counter()
+    user_list, movie_list, user_seen, movie_seen = [], [], set(), set()
+    raw_users, raw_movies, ratings = [], [], []
+    for chunk in iter_sampled_ratings(csv_path, frac=frac, chunk_rows=chunk_rows):
+        users = chunk["userId"].to_numpy()
+        movies = chunk["movieId"].to_numpy()
+        _append_new_ids(user_list, user_seen, users)
+        _append_new_ids(movie_list, movie_seen, movies)
+        raw_users.append(users)
+        raw_movies.append(movies)
+        ratings.append(chunk["rating"].to_numpy())
+
+    user_ids = np.array(user_list, dtype=np.int32)
+    movie_ids = np.array(movie_list, dtype=np.int32)
+    user_order = np.argsort(user_ids, kind="stable").astype(np.int32)
+    movie_order = np.argsort(movie_ids, kind="stable").astype(np.int32)
+
+    raw_users = np.concatenate(raw_users) if raw_users else np.empty(0, dtype=np.int32)
+    raw_movies = np.concatenate(raw_movies) if raw_movies else np.empty(0, dtype=np.int32)
+    rating = np.concatenate(ratings).astype(np.float32) if ratings else np.empty(0, dtype=np.float32)
+    user_idx = user_order[np.searchsorted(user_ids, raw_users, sorter=user_order)].astype(np.int32)
+    movie_idx = movie_order[np.searchsorted(movie_ids, raw_movies, sorter=movie_order)].astype(np.int32)
+
+    csr_order = np.lexsort((movie_idx, user_idx))
+    user_indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(user_idx, minlength=len(user_ids)), out=user_indptr[1:])
+
+    arrays = {
+        "user_ids": user_ids, "movie_ids": movie_ids, "user_order": user_order, "movie_order": movie_order,
+        "user_idx": user_idx, "movie_idx": movie_idx, "rating": rating,
+        "user_indptr": user_indptr, "csr_movie_idx": movie_idx[csr_order], "csr_rating": rating[csr_order],
+    }
+    meta = {
+        "source": _source_signature(csv_path), "frac": frac, "seed": SAMPLE_SEED,
+        "n_ratings": int(len(rating)), "n_users": int(len(user_ids)), "n_movies": int(len(movie_ids)),
+    }
+
+    save_array_dir(out_dir, arrays, meta)
+
+    print(f"✅ 평점 데이터셋 생성 완료: 평점 {meta['n_ratings']}건, 사용자 {meta['n_users']}명, "
+          f"영화 {meta['n_movies']}편 ({time.perf_counter() - start:.2f}초) → {out_dir}")
+    return open_dataset(out_dir)
+
+
+def open_dataset(path: str = DATASET_DIR) -> RatingDataset:
+    """데이터셋의 모든 배열을 메모리 맵으로 엽니다. (파일 내용을 읽지 않으므로 즉시 반환)"""
+    arrays, meta = load_array_dir(path, ARRAY_NAMES)
+    return RatingDataset(arrays, meta, path)
+
+
+def load_or_compile_dataset(csv_path: str, path: str = DATASET_DIR, frac: float = SAMPLE_FRACTION) -> RatingDataset:
+    """최신 데이터셋이 있으면 메모리 맵으로 열고, 없거나 원본 CSV가 바뀌었으면 새로 만듭니다."""
+    if os.path.exists(os.path.join(path, "meta.json")):
+        dataset = open_dataset(path)
+        if dataset.is_current(csv_path, frac):
+            return dataset
+        print("⚠️ 원본 CSV가 바뀌어 평점 데이터셋을 다시 만듭니다.")
+    return compile_dataset(csv_path, path, frac=frac)
@@ -0,0 +1,57 @@
+# app/backend/core/rating_sampler.py
+
+import numpy as np
+import pandas as pd
+
+# 적재 스크립트(load_data.py)와 모델 학습/테스트(model_server)가 함께 사용하는 샘플링 기준
+SAMPLE_FRACTION = 0.1
+SAMPLE_SEED = 42
+CHUNK_ROWS = 1_000_000
+
+RATING_COLUMNS = ["userId", "movieId", "rating"]
+RATING_DTYPES = {"userId": "int32", "movieId": "int32", "rating": "float32"}
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 마무리 함수 (uint64 배열, 곱셈 오버플로는 mod 2^64로 동작)"""
+    x = x + _GOLDEN_GAMMA
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def sample_mask(user_ids, movie_ids, frac: float = SAMPLE_FRACTION, seed: int = SAMPLE_SEED) -> np.ndarray:
+    """
+    (userId, movieId) 쌍마다 샘플 포함 여부를 반환합니다.
+    포함 여부는 쌍의 해시값만으로 정해지므로, 파일을 읽는 순서나 청크 크기, 다른 필터와 무관하게 항상 같습니다.
+    """
+    users = np.asarray(user_ids).astype(np.uint64)
+    movies = np.asarray(movie_ids).astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    keys = (users << np.uint64(32)) | movies
+    hashed = _splitmix64(keys ^ _splitmix64(np.array([seed], dtype=np.uint64)))
+    if frac >= 1.0:
+        return np.ones(len(keys), dtype=bool)
+    threshold = np.uint64(int(max(frac, 0.0) * 2.0 ** 64))
+    return hashed < threshold
+
+
+def iter_sampled_ratings(path: str = "ratings.csv", frac: float = SAMPLE_FRACTION, seed: int = SAMPLE_SEED,
+                         chunk_rows: int = CHUNK_ROWS):
+    """
+    ratings.csv를 chunk_rows행씩 작은 타입(int32/float32)으로 읽으며, 샘플에 포함되는 행만 DataFrame 청크로 돌려줍니다.
+    한 번에 chunk_rows행만 메모리에 올리므로 파일 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    reader = pd.read_csv(path, usecols=RATING_COLUMNS, dtype=RATING_DTYPES, chunksize=chunk_rows)
+    for chunk in reader:
+        yield chunk[sample_mask(chunk["userId"].to_numpy(), chunk["movieId"].to_numpy(), frac, seed)]
+
+
+def read_sampled_ratings(path: str = "ratings.csv", frac: float = SAMPLE_FRACTION, seed: int = SAMPLE_SEED,
+                         chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """샘플에 포함되는 평점 전체를 파일 순서대로 하나의 DataFrame으로 반환합니다."""
+    chunks = list(iter_sampled_ratings(path, frac, seed, chunk_rows))
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in RATING_DTYPES.items()})
+    return pd.concat(chunks, ignore_index=True)
@@ -1,49 +1,135 @@
 # app/backend/core/recommender.py
 
-from collections import Counter
+import os
+import warnings
+
+import numpy as np
 from sqlalchemy.orm import Session
 from backend.db import crud
+from backend.core.movie_titles import get_title_index, resolve_pref_movie_ids
+from backend.core.ncf_inference import fold_in_scores, get_ncf_predictor
+from backend.core.ott_matrix import OttMatrix, get_ott_matrix
+from backend.db.ott_mask import decode_ott_mask
 import json
 
-def recommend_ott_platform(db: Session, movie_title_list: list[str]) -> tuple[str, dict]:
+# 매칭된 MovieLens 사용자가 이 평점 이상을 준 영화만 추천에 사용합니다.
+HIGH_RATING_THRESHOLD = 4.0
+
+# NCF_FOLD_IN=1이면 결과 페이지에서 설문 선호 영화로 fold-in한 NCF 예측 평점 기반 추천도 보여줍니다.
+NCF_FOLD_IN = os.getenv("NCF_FOLD_IN", "0") == "1"
+FOLD_IN_TOP_N = 20
+
+def recommend_ott_platform(db: Session, movie_ids: list[int], weights: list[float] = None) -> tuple[str, dict]:
     """
-    DB의 ott_list 컬럼을 기반으로, 가장 많이 언급된 OTT 플랫폼을 추천하고,
-    영화별 OTT 리스트를 함께 반환합니다.
+    DB의 ott_mask(OTT 비트마스크) 정보를 기반으로, 가장 많이 제공되는 OTT 플랫폼을 추천하고,
+    영화별(제목) OTT 리스트를 함께 반환합니다.
+    weights(예: 매칭된 사용자의 평점)를 주면 영화별 가중치를 곱해 순위를 매깁니다.
+    예전처럼 영화 제목 목록을 넘기면 경고와 함께 제목 인덱스로 영화 ID로 바꿔 처리합니다. (제목이 없는 영화는 제외)
     """
-    print("\n--- 🎬 OTT 플랫폼 추천 로직 (DB 기반) 시작 🎬 ---")
+    if any(isinstance(movie, str) for movie in movie_ids):
+        warnings.warn("recommend_ott_platform에 영화 제목 대신 movie_id 목록을 넘기세요.", DeprecationWarning, stacklevel=2)
+        index = get_title_index(db)
+        known = [(index[title], w) for title, w in zip(movie_ids, weights or [None] * len(movie_ids)) if title in index]
+        movie_ids = [movie_id for movie_id, _ in known]
+        weights = [w for _, w in known] if weights is not None else None
 
-    movie_ott_map = {}
-    all_otts = []
+    print("\n--- 🎬 OTT 플랫폼 추천 로직 (OTT 행렬 기반) 시작 🎬 ---")
 
-    for title in movie_title_list:
-        movie = db.query(crud.models.Movie).filter(crud.models.Movie.title == title).first()
-        if not movie or not movie.ott_list:
-            continue
+    matrix = get_ott_matrix(db)
+    ranking = matrix.rank(movie_ids, weights)
 
-        ott_uuids = [uuid for uuid, flag in movie.ott_list.items() if flag]
-        movie_ott_map[title] = ott_uuids
-        all_otts.extend(ott_uuids)
+    titles = crud.get_movie_titles_by_ids(db, movie_ids)
+    movie_ott_name_map = {}
+    for movie_id in movie_ids:
+        platforms = decode_ott_mask(matrix.mask_of(movie_id), matrix.names_by_bit)
+        if platforms and movie_id in titles:
+            movie_ott_name_map[titles[movie_id]] = platforms
 
-    if not all_otts:
+    if not ranking:
         print("❌ OTT 정보 없음")
-        return "추천 OTT 없음", movie_ott_map
-
-    # 가장 많이 언급된 OTT UUID 추출
-    ott_counter = Counter(all_otts)
-    top_ott_uuid, _ = ott_counter.most_common(1)[0]
-
-    # UUID → 이름 매핑
-    all_ott_objs = crud.get_all_ott_platforms(db)
-    uuid_to_name = {str(o.ott_id): o.ott_name for o in all_ott_objs}
-    top_ott_name = uuid_to_name.get(top_ott_uuid, "알 수 없음")
+        return "추천 OTT 없음", movie_ott_name_map
 
-    # 이름으로 변환된 결과 생성
-    movie_ott_name_map = {
-        title: [uuid_to_name.get(uid, "Unknown") for uid in otts]
-        for title, otts in movie_ott_map.items()
-    }
+    top_ott_name = ranking[0][0]
 
     print(json.dumps(movie_ott_name_map, indent=2, ensure_ascii=False))
+    print("📊 OTT 순위: " + ", ".join(f"{name}({score:g})" for name, score in ranking))
     print(f"🎯 최종 추천 OTT: {top_ott_name}")
 
     return top_ott_name, movie_ott_name_map
+
+def summarize_recommendation(matrix: OttMatrix, movie_ids: list[int], ratings: list[float], titles: dict) -> dict:
+    """
+    사용자가 높은 평점을 준 영화 목록으로 ml_user_recommendation 저장 형식의 추천 결과를 만듭니다.
+    - OTT에서 제공되는 영화만 남겨 평점 내림차순(동점 시 ID 오름차순)으로 정렬합니다.
+    - top_ott(최적의 OTT 플랫폼)는 기존과 같이 추천 영화를 가장 많이 제공하는 플랫폼입니다. (가중치 없는 편수)
+    - ranked_otts는 평점을 가중치로 한 OTT 행렬의 열 합계 순위로, 화면에 따로 표시합니다.
+    """
+    ids = np.asarray(movie_ids, dtype=np.int64)
+    weights = np.asarray(ratings, dtype=np.float64)
+    _, found = matrix.rows_of(ids)
+    ids, weights = ids[found], weights[found]
+    order = np.lexsort((ids, -weights))
+    ids, weights = ids[order].tolist(), weights[order]
+
+    counts = matrix.rank(ids)
+    ranking = matrix.rank(ids, weights)
+    return {
+        "top_ott": counts[0][0] if counts else None,
+        "ranked_otts": [[name, score] for name, score in ranking],
+        "movie_ids": ids,
+        "movie_otts": {
+            titles[movie_id]: decode_ott_mask(matrix.mask_of(movie_id), matrix.names_by_bit)
+            for movie_id in ids if movie_id in titles
+        },
+    }
+
+def get_ml_user_recommendation(db: Session, ml_user_id: int) -> dict:
+    """
+    MovieLens 사용자의 추천 결과를 반환합니다.
+    ml_user_recommendation에 현재 데이터 버전의 결과가 있으면 그대로 사용하고(기본 키 조회 한 번),
+    없거나 오래된 경우에는 바로 계산해 반환합니다. (읽기 경로이므로 저장은 build_ml_user_recommendations.py가 맡습니다.)
+    """
+    recommendation, rating_version, ott_version = crud.get_ml_user_recommendation(db, ml_user_id)
+    if recommendation is not None \
+            and (recommendation.rating_version, recommendation.ott_version) == (rating_version, ott_version):
+        print(f"♻️ 미리 계산된 추천 결과 사용: ml_user_id={ml_user_id}")
+        return {
+            "top_ott": recommendation.top_ott,
+            "ranked_otts": recommendation.ranked_otts,
+            "movie_ids": recommendation.movie_ids,
+            "movie_otts": recommendation.movie_otts,
+        }
+
+    print(f"⏳ 추천 결과 계산 중: ml_user_id={ml_user_id}")
+    matrix = get_ott_matrix(db)
+    watched = [(movie_id, float(r)) for movie_id, r in crud.get_watched_movies_by_ml_user(db, ml_user_id)
+               if movie_id is not None and r is not None and r >= HIGH_RATING_THRESHOLD]
+    titles = crud.get_movie_titles_by_ids(db, [movie_id for movie_id, _ in watched])
+    return summarize_recommendation(matrix, [m for m, _ in watched], [r for _, r in watched], titles)
+
+def get_fold_in_recommendation(db: Session, user, top_n: int = FOLD_IN_TOP_N):
+    """
+    설문 사용자의 선호 영화로 NCF 사용자 임베딩을 fold-in해, 예측 평점이 높은 영화로 추천 결과를 만듭니다.
+    - 선호 영화로 고른 영화는 제외하고, OTT에서 제공되는 영화 중 예측 평점 상위 top_n편을 사용합니다.
+    - 반환 형식은 summarize_recommendation과 같으며(플랫폼 순위는 예측 평점 가중), 소요 시간(elapsed_ms)을 덧붙입니다.
+    - 모델 파일이 없거나 선호 영화가 모델에 하나도 없으면 None.
+    """
+    predictor = get_ncf_predictor()
+    if predictor is None:
+        return None
+    scores, movie_idx, elapsed_ms = fold_in_scores(predictor, resolve_pref_movie_ids(db, user))
+    if not len(movie_idx):
+        return None
+
+    matrix = get_ott_matrix(db)
+    _, available = matrix.rows_of(predictor.movie_ids)
+    available[movie_idx] = False
+    candidates = np.flatnonzero(available)
+    top = candidates[np.argsort(-scores[candidates], kind="stable")[:top_n]]
+    movie_ids = predictor.movie_ids[top].tolist()
+
+    titles = crud.get_movie_titles_by_ids(db, movie_ids)
+    recommendation = summarize_recommendation(matrix, movie_ids, scores[top].tolist(), titles)
+    recommendation["elapsed_ms"] = elapsed_ms
+    print(f"🧠 NCF fold-in 추천 완료: {len(movie_ids)}편 ({elapsed_ms:.1f}ms)")
+    return recommendation
@@ -0,0 +1,208 @@
+# app/backend/core/topk_search.py
+
+import heapq
+import threading
+import time
+
+import numpy as np
+from sqlalchemy.orm import Session
+from backend.core.matching_index import MatchingIndex, get_matching_index
+
+_EPS = 1e-12
+
+# search_anytime이 마감 시각을 확인하는 간격 (posting 항목 수)
+ANYTIME_CHUNK = 1 << 15
+
+
+class SetSimilarityIndex:
+    """
+    영화 → 시청 사용자(행) 역색인 기반의 정확한 top-k 자카드 검색.
+
+    집합 유사도 조인의 가지치기 기법을 그대로 사용합니다.
+    - 크기 필터: 자카드 ≥ t 이려면 후보 크기 m이 t·n ≤ m ≤ n/t 를 만족해야 합니다.
+      (posting list를 후보 크기순으로 정렬해 두어 이진 탐색으로 구간만 읽습니다.)
+    - 접두사 필터: 질의 영화를 전역 빈도 오름차순(희귀한 영화 먼저)으로 처리하면,
+      i번째 영화에서 처음 만난 후보의 유사도 상한은 (n - i) / n 입니다.
+      이 상한이 현재 k번째 유사도보다 작아지면 나머지 영화의 posting list는 읽지 않습니다.
+    - 크기 k의 힙으로 현재 상위 k개를 유지하며, 그 최솟값이 임계값 t 역할을 합니다.
+    """
+
+    def __init__(self, index: MatchingIndex):
+        self.index = index
+        self.version = index.version
+
+        csc = index.matrix.tocsc()
+        csc.sort_indices()
+        self.doc_freq = np.diff(csc.indptr).astype(np.int64)
+        self.posting_ptr = csc.indptr.astype(np.int64)
+
+        # 각 영화의 posting list를 (후보 크기, 행 번호) 순으로 정렬합니다.
+        cols = np.repeat(np.arange(len(self.doc_freq)), self.doc_freq)
+        rows = csc.indices.astype(np.int64)
+        order = np.lexsort((rows, index.row_sizes[rows], cols))
+        self.posting_rows = rows[order]
+        self.posting_sizes = index.row_sizes[self.posting_rows]
+
+    def _ordered_query_columns(self, movie_ids):
+        """질의 영화를 행렬 열 번호로 바꾸고 전역 빈도 오름차순으로 정렬합니다. (인덱스에 없는 영화는 -1)"""
+        movie_index = self.index.movie_ids
+        ids = np.array(sorted(movie_ids), dtype=np.int64)
+        cols = np.full(len(ids), -1, dtype=np.int64)
+        if len(ids) and len(movie_index):
+            pos = np.minimum(np.searchsorted(movie_index, ids), len(movie_index) - 1)
+            known = movie_index[pos] == ids
+            cols[known] = pos[known]
+        freq = np.where(cols >= 0, self.doc_freq[np.maximum(cols, 0)], 0)
+        return cols[np.argsort(freq, kind="stable")]
+
+    def search(self, lo: int, hi: int, movie_ids: set, k: int = 1, min_similarity: float = 0.0):
+        """
+        행 구간 [lo, hi)에서 movie_ids와 자카드 유사도가 가장 높은 상위 k명을 찾습니다.
+        반환값: ([(ml_user_id, 유사도), ...] 유사도 내림차순·동점 시 ID 오름차순, 가지치기 통계 dict)
+        """
+        index = self.index
+        n = len(movie_ids)
+        columns = self._ordered_query_columns(movie_ids)
+        query = index.query_vector(movie_ids)
+        seen = np.zeros(index.matrix.shape[0], dtype=bool)
+        heap = []  # (유사도, -ml_user_id) 최소 힙 → 루트가 현재 k번째
+
+        stats = {
+            "query_size": n,
+            "bucket_size": hi - lo,
+            "prefix_length": 0,
+            "postings_total": int(self.doc_freq[columns[columns >= 0]].sum()),
+            "postings_scanned": 0,
+            "size_pruned": 0,
+            "candidates_verified": 0,
+        }
+
+        def threshold():
+            return max(min_similarity, heap[0][0]) if len(heap) == k else min_similarity
+
+        for i, col in enumerate(columns.tolist()):
+            tau = threshold()
+            if (n - i) / n < tau - _EPS:
+                break  # 접두사 필터: 이후 영화에서 처음 만날 후보는 임계값을 넘을 수 없습니다.
+            stats["prefix_length"] = i + 1
+            if col < 0:
+                continue
+
+            # 크기 필터: posting list 중 tau·n ≤ m ≤ n/tau 구간만 읽습니다.
+            p0, p1 = int(self.posting_ptr[col]), int(self.posting_ptr[col + 1])
+            sizes = self.posting_sizes[p0:p1]
+            s0 = p0 + int(np.searchsorted(sizes, tau * n - _EPS, side="left"))
+            s1 = p1 if tau <= 0 else p0 + int(np.searchsorted(sizes, n / tau + _EPS, side="right"))
+            stats["postings_scanned"] += max(s1 - s0, 0)
+            stats["size_pruned"] += (p1 - p0) - max(s1 - s0, 0)
+            if s1 <= s0:
+                continue
+
+            rows = self.posting_rows[s0:s1]
+            rows = rows[(rows >= lo) & (rows < hi)]
+            rows = rows[~seen[rows]]
+            if not len(rows):
+                continue
+            seen[rows] = True
+
+            # 후보 검증: 정확한 교집합 크기를 희소 행렬-벡터 곱으로 한 번에 계산합니다.
+            intersection = index.matrix[rows] @ query
+            similarities = intersection / (index.row_sizes[rows] + n - intersection)
+            stats["candidates_verified"] += len(rows)
+
+            keep = similarities >= tau - _EPS
+            for similarity, row in zip(similarities[keep].tolist(), rows[keep].tolist()):
+                item = (similarity, -int(index.row_user_ids[row]))
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+        # 겹치는 영화가 있는 후보가 k명보다 적으면, 유사도 0인 후보를 ID 오름차순으로 채웁니다.
+        if len(heap) < k and min_similarity <= 0:
+            rated = index.row_sizes[lo:hi] > 0
+            unseen = rated & ~seen[lo:hi]
+            zero_ids = np.sort(index.row_user_ids[lo:hi][unseen])[:k - len(heap)]
+            heap.extend((0.0, -int(uid)) for uid in zero_ids)
+
+        results = [(-neg_id, similarity) for similarity, neg_id in sorted(heap, reverse=True)]
+        return results, stats
+
+    def search_anytime(self, lo: int, hi: int, movie_ids: set, deadline: float, chunk: int = ANYTIME_CHUNK):
+        """
+        마감 시각(time.perf_counter 기준)까지만 계산하는 top-1 검색입니다.
+        - 희귀한 영화의 posting list부터 chunk개씩 읽어 후보를 검증하므로, 선택도가 높은 영화를 함께 본
+          후보가 먼저 평가됩니다. 매 청크를 읽기 전에 마감 시각을 확인하고, 지났으면 지금까지의 최고 후보를 반환합니다.
+        - 접두사 상한 (n - i) / n 보다 현재 최고 유사도가 크면 남은 후보가 이길 수 없으므로 완료로 봅니다.
+        - 완료되면 best_match / search(k=1)와 같은 결과입니다. (동점이면 ml_user_id가 작은 사용자)
+        반환값: ((ml_user_id, 유사도) 또는 (None, 0), 완료 여부, 읽은 posting 비율)
+          posting 비율은 질의 영화들의 시청 기록(영화, 사용자) 중 읽은 비율로, 후보 사용자 비율과는 다릅니다.
+        """
+        index = self.index
+        n = len(movie_ids)
+        columns = self._ordered_query_columns(movie_ids)
+        query = index.query_vector(movie_ids)
+        seen = np.zeros(index.matrix.shape[0], dtype=bool)
+        postings_total = int(self.doc_freq[columns[columns >= 0]].sum())
+        postings_scanned = 0
+        best = None  # (유사도, -ml_user_id)
+
+        complete = True
+        for i, col in enumerate(columns.tolist()):
+            if best is not None and best[0] > (n - i) / n + _EPS:
+                break  # 남은 영화에서 처음 만날 후보의 유사도 상한이 현재 최고보다 작습니다.
+            if col < 0:
+                continue
+            p0, p1 = int(self.posting_ptr[col]), int(self.posting_ptr[col + 1])
+            for start in range(p0, p1, chunk):
+                if time.perf_counter() >= deadline:
+                    complete = False
+                    break
+                rows = self.posting_rows[start:min(start + chunk, p1)]
+                postings_scanned += len(rows)
+                rows = rows[(rows >= lo) & (rows < hi)]
+                rows = rows[~seen[rows]]
+                if not len(rows):
+                    continue
+                seen[rows] = True
+
+                intersection = index.matrix[rows] @ query
+                similarities = intersection / (index.row_sizes[rows] + n - intersection)
+                top = similarities.max()
+                winner = int(index.row_user_ids[rows][similarities == top].min())
+                if best is None or (float(top), -winner) > best:
+                    best = (float(top), -winner)
+            if not complete:
+                break
+
+        scanned = postings_scanned / postings_total if postings_total else 1.0
+        if best is None:
+            rated = index.row_sizes[lo:hi] > 0
+            if not complete or not rated.any():
+                return (None, 0), complete, scanned
+            # 겹치는 영화가 있는 후보가 없으면, 유사도 0인 후보 중 ID가 가장 작은 사용자를 반환합니다.
+            return (int(index.row_user_ids[lo:hi][rated].min()), 0.0), complete, scanned
+        return (-best[1], best[0]), complete, scanned
+
+
+# --- 프로세스 전역 역색인 캐시 ---
+_set_index = None
+_set_index_lock = threading.Lock()
+
+
+def peek_set_similarity_index(version: int):
+    """이미 만들어 둔 역색인이 rating 버전 version의 것이면 반환합니다. (없거나 오래되었으면 None, 새로 만들지 않음)"""
+    with _set_index_lock:
+        if _set_index is not None and _set_index.version == version:
+            return _set_index
+        return None
+
+
+def get_set_similarity_index(db: Session):
+    """매칭 인덱스와 같은 rating 버전의 역색인을 반환합니다. (버전이 바뀌면 다시 생성)"""
+    global _set_index
+    index = get_matching_index(db)
+    with _set_index_lock:
+        if _set_index is None or _set_index.index is not index:
+            _set_index = SetSimilarityIndex(index)
+        return _set_index
@@ -1,10 +1,17 @@
 # app/backend/core/user_matching.py
 
-import pandas as pd
 from sqlalchemy.orm import Session
 from backend.db import crud
+from backend.db.database import SessionLocal
+from backend.core.matching_index import get_matching_index, peek_matching_index
+from backend.core.movie_titles import resolve_pref_movie_ids
+from backend.core.minhash_lsh import get_lsh_index
+from backend.core.topk_search import get_set_similarity_index, peek_set_similarity_index
+from backend.core.embedding_index import IVF_PROBE, fold_in_query, get_embedding_index
 import json
 import os
+import threading
+import time
 from datetime import datetime
 
 # ... (파일 상단 jaccard_similarity, OUTPUT_FILE_PATH 등은 그대로) ...
@@ -17,80 +24,347 @@ def jaccard_similarity(set1, set2):
     return intersection / union if union != 0 else 0
 
 
-def find_similar_user(db: Session, new_user_id: str):
+def match_conditions(gender: str, age: int):
     """
-    신규 사용자와 가장 유사한 MovieLens 사용자를 찾아 매칭합니다.
+    신규 사용자의 성별/나이로 1차 필터링 조건을 만듭니다.
+    설문 성별('Male'/'Female')을 MovieLens 형식('M'/'F')으로 바꾸고, 나이는 ±5세 범위를 사용합니다.
+    """
+    gender_to_match = 'M' if gender == 'Male' else 'F'
+    return gender_to_match, age - 5, age + 5
+
+
+def _load_match_query(db: Session, new_user_id: str):
+    """
+    신규 사용자를 조회하고 매칭 조건을 만듭니다.
+    반환값: (신규 사용자, 성별('M'/'F'), 최소 나이, 최대 나이, 선호 영화 ID 집합). 사용자가 없으면 None.
     """
-    print("\n--- 🕵️ 유사 사용자 찾기 프로세스 시작 🕵️ ---")
-    
-    # 1. 데이터 로드
     new_user = crud.get_user(db, user_id=new_user_id)
     if not new_user:
         print("❌ 오류: DB에서 신규 사용자를 찾을 수 없습니다.")
-        return None, 0
+        return None
     print(f"✅ 신규 사용자 정보: 나이={new_user.age}, 성별='{new_user.gender}'")
 
-    all_ml_users = crud.get_all_ml_users(db)
-    all_ratings = crud.get_all_ratings(db)
-
-    ml_users_df = pd.DataFrame([u.__dict__ for u in all_ml_users])
-    ratings_df = pd.DataFrame([r.__dict__ for r in all_ratings])
-    
-    # --- ✨ 2. 1차 필터링 (성별 데이터 형식 통일) ✨ ---
-    age_min, age_max = new_user.age - 5, new_user.age + 5
-    
-    # 신규 사용자의 성별을 'M' 또는 'F'로 변환합니다.
-    gender_to_match = 'M' if new_user.gender == 'Male' else 'F'
+    # --- ✨ 1차 필터링 조건 (성별 데이터 형식 통일) ✨ ---
+    gender_to_match, age_min, age_max = match_conditions(new_user.gender, new_user.age)
     print(f"   -> 매칭을 위해 성별을 '{gender_to_match}'로 변환합니다.")
 
-    candidates_df = ml_users_df[
-        (ml_users_df['age'].between(age_min, age_max)) &
-        (ml_users_df['gender'] == gender_to_match) # 변환된 값으로 비교
-    ]
-    candidate_ids = candidates_df['ml_user_id'].tolist()
-    print(f"✅ 1차 필터링(나이/성별): {len(candidate_ids)}명의 후보를 찾았습니다.")
-    # --- ✨ 여기까지 수정 --- ✨
+    new_user_movie_ids = set(resolve_pref_movie_ids(db, new_user))
+    print(f"✅ 신규 사용자의 선호 영화 ID 개수: {len(new_user_movie_ids)}개")
+
+    return new_user, gender_to_match, age_min, age_max, new_user_movie_ids
 
-    if not candidate_ids:
+
+def _print_search_stats(stats: dict):
+    """top-k 검색의 가지치기 통계를 출력합니다."""
+    print(f"📊 가지치기 통계: 질의 영화 {stats['query_size']}편 중 {stats['prefix_length']}편의 posting list만 확인, "
+          f"posting {stats['postings_scanned']}/{stats['postings_total']}건 스캔 "
+          f"(크기 필터로 {stats['size_pruned']}건 제외), "
+          f"후보 {stats['candidates_verified']}/{stats['bucket_size']}명 검증")
+
+
+def _match_with_index(db: Session, gender: str, age_min: int, age_max: int, movie_ids: set):
+    """프로세스 전역 매칭 인덱스(CSR 행렬)로 후보 전체의 자카드 유사도를 한 번에 계산합니다."""
+    index = get_matching_index(db)
+
+    lo, hi = index.candidate_range(gender, age_min, age_max)
+    print(f"✅ 1차 필터링(나이/성별): {hi - lo}명의 후보를 찾았습니다.")
+
+    if hi == lo:
         print("결과: 1차 필터링 후 후보자가 없어 매칭을 종료합니다.")
         return None, 0
 
-    # ... (이하 로직은 동일) ...
-    new_user_movie_ids = {crud.get_movie_id_by_title(db, title) for title in new_user.pref_movie_list if crud.get_movie_id_by_title(db, title)}
-    print(f"✅ 신규 사용자의 선호 영화 ID 개수: {len(new_user_movie_ids)}개")
-
-    candidate_ratings = ratings_df[ratings_df['ml_user_id'].isin(candidate_ids)]
-    user_movie_groups = candidate_ratings.groupby('ml_user_id')['movie_id'].apply(set)
-    print(f"✅ 평점 기록이 있는 후보자 수: {len(user_movie_groups)}명")
+    rated_count = int((index.row_sizes[lo:hi] > 0).sum())
+    print(f"✅ 평점 기록이 있는 후보자 수: {rated_count}명")
 
-    if user_movie_groups.empty:
+    if rated_count == 0:
         print("결과: 1차 필터링된 후보들의 평점 기록이 샘플에 없어 매칭을 종료합니다.")
         return None, 0
-    
-    best_match_user_id, max_similarity = -1, -1
-    
+
     print("⏳ 2차 필터링(자카드 유사도) 계산 시작...")
-    for i, (ml_user_id, watched_movie_ids) in enumerate(user_movie_groups.items()):
-        similarity = jaccard_similarity(new_user_movie_ids, watched_movie_ids)
-        if i < 5:
-            print(f"  - 후보 {ml_user_id} 와의 유사도: {similarity:.4f}")
-        if similarity > max_similarity:
-            max_similarity = similarity
-            best_match_user_id = ml_user_id
-
-    if best_match_user_id != -1:
+    return index.best_match(lo, hi, movie_ids)
+
+
+def _match_with_sql(db: Session, gender: str, age_min: int, age_max: int, movie_ids: set):
+    """ml_user_profile 테이블을 이용해 DB 안에서 자카드 유사도를 계산하고 최고 후보 1명만 받아옵니다."""
+    print("⏳ DB(ml_user_profile)에서 1차/2차 필터링을 함께 수행합니다...")
+    return crud.find_most_similar_profile(db, gender, age_min, age_max, sorted(movie_ids))
+
+
+def _match_with_minhash(db: Session, gender: str, age_min: int, age_max: int, movie_ids: set):
+    """MinHash-LSH로 후보를 좁힌 뒤, 후보들만 정확한 자카드 유사도로 재계산합니다. (근사 매칭)"""
+    index, lsh = get_lsh_index(db)
+
+    lo, hi = index.candidate_range(gender, age_min, age_max)
+    print(f"✅ 1차 필터링(나이/성별): {hi - lo}명의 후보를 찾았습니다.")
+
+    if hi == lo:
+        print("결과: 1차 필터링 후 후보자가 없어 매칭을 종료합니다.")
+        return None, 0
+
+    best_match_user_id, max_similarity, n_checked = lsh.query(index, lo, hi, movie_ids)
+    print(f"✅ LSH 후보 {n_checked}명의 자카드 유사도를 재계산했습니다. (bands={lsh.bands}, rows={lsh.rows})")
+
+    if best_match_user_id is None:
+        print("   -> LSH 후보가 없어 정확한 매칭으로 대체합니다.")
+        return index.best_match(lo, hi, movie_ids)
+    return best_match_user_id, max_similarity
+
+
+def _match_with_topk(db: Session, gender: str, age_min: int, age_max: int, movie_ids: set):
+    """역색인 + 접두사/크기 필터로 가지치기한 정확한 top-1 검색입니다."""
+    set_index = get_set_similarity_index(db)
+    lo, hi = set_index.index.candidate_range(gender, age_min, age_max)
+    print(f"✅ 1차 필터링(나이/성별): {hi - lo}명의 후보를 찾았습니다.")
+
+    if hi == lo:
+        print("결과: 1차 필터링 후 후보자가 없어 매칭을 종료합니다.")
+        return None, 0
+
+    results, stats = set_index.search(lo, hi, movie_ids, k=1)
+    _print_search_stats(stats)
+    return results[0] if results else (None, 0)
+
+
+def _match_with_embedding(db: Session, gender: str, age_min: int, age_max: int, movie_ids: set):
+    """선호 영화로 fold-in한 임베딩과 NCF 사용자 임베딩의 코사인 유사도로 매칭합니다. (유사도는 자카드가 아닌 코사인)"""
+    index, embedding_index, predictor = get_embedding_index(db)
+    if embedding_index is None:
+        print("   -> NCF 모델 파일이 없어 매칭 인덱스(자카드) 엔진으로 대체합니다.")
+        return _match_with_index(db, gender, age_min, age_max, movie_ids)
+
+    lo, hi = index.candidate_range(gender, age_min, age_max)
+    print(f"✅ 1차 필터링(나이/성별): {hi - lo}명의 후보를 찾았습니다.")
+
+    if hi == lo:
+        print("결과: 1차 필터링 후 후보자가 없어 매칭을 종료합니다.")
+        return None, 0
+
+    query = fold_in_query(predictor, movie_ids)
+    ivf = f"IVF {len(embedding_index.centroids)}개 중 {IVF_PROBE}개 탐색" if len(embedding_index.centroids) else "전체 비교"
+    print(f"⏳ 2차 필터링(임베딩 코사인 유사도, {ivf}) 계산 시작...")
+    results = embedding_index.search(index, lo, hi, query, k=1)
+    return results[0] if results else (None, 0)
+
+
+# --- 매칭 엔진 선택 (환경 변수 MATCHING_ENGINE 또는 engine 인자) ---
+MATCHING_ENGINES = {
+    "index": _match_with_index,
+    "sql": _match_with_sql,
+    "minhash": _match_with_minhash,
+    "topk": _match_with_topk,
+    "embedding": _match_with_embedding,
+}
+MATCHING_ENGINE = os.getenv("MATCHING_ENGINE", "index")
+
+# 설문 페이지의 매칭 시간 제한 (ms, find_similar_user_anytime / MATCHING_ENGINE=index 또는 topk일 때)
+MATCHING_BUDGET_MS = int(os.getenv("MATCHING_BUDGET_MS", "500"))
+
+
+def find_similar_user(db: Session, new_user_id: str, engine: str = None):
+    """
+    신규 사용자와 가장 유사한 MovieLens 사용자를 찾아 매칭합니다.
+    - engine="index": 프로세스 메모리의 희소 행렬 인덱스로 계산 (기본값)
+    - engine="sql": ml_user_profile 테이블(GIN 인덱스)을 이용해 DB에서 계산
+    - engine="minhash": MinHash-LSH 후보만 재계산하는 근사 매칭
+    - engine="topk": 역색인 + 접두사/크기 필터로 가지치기한 정확한 검색 (find_similar_users의 k=1)
+    - engine="embedding": NCF 사용자 임베딩의 코사인 유사도로 검색 (모델 파일이 없으면 index로 대체)
+    """
+    engine = engine or MATCHING_ENGINE
+    if engine not in MATCHING_ENGINES:
+        raise ValueError(f"알 수 없는 매칭 엔진입니다: {engine} (사용 가능: {', '.join(MATCHING_ENGINES)})")
+
+    print("\n--- 🕵️ 유사 사용자 찾기 프로세스 시작 🕵️ ---")
+    
+    # 1~2. 데이터 로드 및 1차 필터링 조건
+    match_query = _load_match_query(db, new_user_id)
+    if match_query is None:
+        return None, 0
+    new_user, gender_to_match, age_min, age_max, new_user_movie_ids = match_query
+
+    # 3. 선택한 엔진으로 2차 필터링(자카드 유사도)
+    print(f"⚙️ 매칭 엔진: {engine}")
+    rating_version = crud.get_data_version(db, "rating")
+    best_match_user_id, max_similarity = MATCHING_ENGINES[engine](
+        db, gender_to_match, age_min, age_max, new_user_movie_ids
+    )
+
+    # 4. 결과 저장 (similarity 테이블 → 이후 get_match에서 재사용)
+    if best_match_user_id is not None:
         print(f"🎉 매칭 성공! 가장 유사한 사용자: {best_match_user_id} (유사도: {max_similarity:.4f})")
-        save_match_to_jsonl(db, new_user, best_match_user_id, max_similarity)
+        watched_movies = crud.get_watched_movies_by_ml_user(db, ml_user_id=best_match_user_id)
+        save_match_to_db(db, new_user, best_match_user_id, max_similarity, watched_movies, rating_version)
+        save_match_to_jsonl(db, new_user, best_match_user_id, max_similarity, watched_movies)
         return best_match_user_id, max_similarity
     else:
         print("결과: 유사도 계산 후에도 매칭된 사용자가 없습니다.")
+        save_match_to_db(db, new_user, None, 0.0, [], rating_version)
         return None, 0
+
+
+# --- 인덱스 백그라운드 준비 (find_similar_user_anytime) ---
+_warm_lock = threading.Lock()
+
+
+def _warm_index(build):
+    """백그라운드 스레드에서 build(db)로 인덱스를 (다시) 만듭니다. 한 번에 하나의 스레드만 실행합니다."""
+    db = SessionLocal()
+    try:
+        build(db)
+    except Exception as e:
+        print(f"🚨 인덱스 준비 중 오류가 발생했습니다: {e}")
+    finally:
+        db.close()
+        _warm_lock.release()
+
+
+def _start_warming_index(build):
+    if _warm_lock.acquire(blocking=False):
+        threading.Thread(target=_warm_index, args=(build,), daemon=True).start()
+
+
+# 시간 제한 검색을 지원하는 엔진 → (이미 만든 인덱스 조회, 인덱스 생성) 함수
+ANYTIME_ENGINES = {
+    "index": (peek_matching_index, get_matching_index),
+    "topk": (peek_set_similarity_index, get_set_similarity_index),
+}
+
+
+def find_similar_user_anytime(db: Session, new_user_id: str, budget_ms: int = MATCHING_BUDGET_MS, engine: str = None):
+    """
+    시간 제한(budget_ms) 안에서 신규 사용자와 가장 유사한 MovieLens 사용자를 찾습니다. (engine="index" 또는 "topk")
+    후보를 청크 단위로 계산하며 매 청크 전에 마감 시각을 확인하고, 시간이 다 되면 지금까지의 최고 후보를 반환합니다.
+    - index(기본값): 나이/성별 후보 구간을 행 청크 순서대로 계산합니다.
+    - topk: 희귀한 선호 영화를 함께 본 후보부터 posting list 청크 단위로 계산합니다.
+    반환값: (ml_user_id, 유사도, 완료 여부, 탐색한 비율)
+      탐색한 비율은 index에서는 유사도를 계산한 후보 비율, topk에서는 선호 영화 시청 기록(posting) 중 읽은 비율입니다.
+
+    - 그 밖의 엔진이 설정되어 있으면 시간 제한 없이 find_similar_user로 매칭합니다. (완료 여부 True, 비율 1.0)
+    - 현재 rating 버전의 인덱스가 아직 없으면 만들지 않고 바로 (None, 0, False, 0.0)을 반환하며,
+      인덱스는 백그라운드에서 준비합니다. (인덱스 생성이 시간 제한을 넘기지 않도록)
+    - 완료된 결과는 find_similar_user와 같고 그대로 저장됩니다. 중간에 멈춘 결과는 rating 버전 없이 저장해,
+      이후 get_match에서 정확한 결과로 다시 계산되도록 합니다.
+    """
+    engine = engine or MATCHING_ENGINE
+    if engine not in ANYTIME_ENGINES:
+        best_match_user_id, max_similarity = find_similar_user(db, new_user_id, engine=engine)
+        return best_match_user_id, max_similarity, True, 1.0
+
+    deadline = time.perf_counter() + budget_ms / 1000
+    print(f"\n--- 🕵️ 유사 사용자 찾기 프로세스 시작 (엔진 {engine}, 시간 제한 {budget_ms}ms) 🕵️ ---")
+
+    match_query = _load_match_query(db, new_user_id)
+    if match_query is None:
+        return None, 0, True, 1.0
+    new_user, gender_to_match, age_min, age_max, new_user_movie_ids = match_query
+
+    rating_version = crud.get_data_version(db, "rating")
+    peek_index, build_index = ANYTIME_ENGINES[engine]
+    prepared = peek_index(rating_version)
+    if prepared is None:
+        print("⏳ 인덱스가 준비되지 않아 매칭을 미룹니다. (백그라운드에서 생성 시작)")
+        _start_warming_index(build_index)
+        return None, 0, False, 0.0
+
+    if engine == "topk":
+        lo, hi = prepared.index.candidate_range(gender_to_match, age_min, age_max)
+        search = prepared.search_anytime
+    else:
+        lo, hi = prepared.candidate_range(gender_to_match, age_min, age_max)
+        search = prepared.best_match_anytime
+    print(f"✅ 1차 필터링(나이/성별): {hi - lo}명의 후보를 찾았습니다.")
+
+    (best_match_user_id, max_similarity), complete, scanned = search(lo, hi, new_user_movie_ids, deadline)
+    elapsed_ms = budget_ms - (deadline - time.perf_counter()) * 1000
+    if complete:
+        print(f"✅ 시간 제한 안에 매칭을 끝냈습니다. ({elapsed_ms:.1f}ms)")
+    else:
+        print(f"⏱️ 시간 제한으로 탐색 범위의 {scanned:.1%}만 확인한 결과입니다. ({elapsed_ms:.1f}ms)")
+
+    if best_match_user_id is None:
+        print("결과: 유사도 계산 후에도 매칭된 사용자가 없습니다.")
+        if complete:
+            save_match_to_db(db, new_user, None, 0.0, [], rating_version)
+        return None, 0, complete, scanned
+
+    print(f"🎉 매칭 성공! 가장 유사한 사용자: {best_match_user_id} (유사도: {max_similarity:.4f})")
+    watched_movies = crud.get_watched_movies_by_ml_user(db, ml_user_id=best_match_user_id)
+    save_match_to_db(db, new_user, best_match_user_id, max_similarity, watched_movies,
+                     rating_version if complete else None)
+    if complete:
+        save_match_to_jsonl(db, new_user, best_match_user_id, max_similarity, watched_movies)
+    return best_match_user_id, max_similarity, complete, scanned
+
+
+def get_match(db: Session, user_id: str, engine: str = None):
+    """
+    신규 사용자의 매칭 결과를 반환합니다.
+    similarity 테이블에 저장된 결과가 있고, 매칭 당시의 rating 데이터 버전이 현재와 같으면
+    다시 계산하지 않고 저장된 결과를 그대로 사용합니다. 그렇지 않으면 find_similar_user로 다시 매칭합니다.
+    """
+    cached, current_version = crud.get_cached_similarity(db, user_id)
+    if cached is not None and cached.similarity_score is not None and cached.rating_version == current_version:
+        print(f"⚡ 저장된 매칭 결과를 사용합니다. (사용자 {user_id} → {cached.ml_user_id})")
+        if cached.ml_user_id is None:
+            return None, 0
+        return cached.ml_user_id, float(cached.similarity_score)
+
+    if cached is not None:
+        print("♻️ rating 데이터가 바뀌었거나 무효화된 매칭 결과라 다시 계산합니다.")
+    return find_similar_user(db, user_id, engine=engine)
+
+
+def invalidate_match(db: Session, user_id: str):
+    """저장된 매칭 결과를 무효화합니다. 다음 get_match 호출 시 다시 계산됩니다."""
+    crud.invalidate_similarity(db, user_id)
+
+
+def find_similar_users(db: Session, user_id: str, k: int = 10, min_similarity: float = 0.0):
+    """
+    신규 사용자와 자카드 유사도가 가장 높은 MovieLens 사용자 상위 k명을 찾습니다.
+    유사도가 min_similarity 미만인 사용자는 제외하며, 결과는 [(ml_user_id, 유사도), ...] 입니다.
+    k=1, min_similarity=0 이면 find_similar_user와 같은 사용자를 반환합니다.
+    """
+    print(f"\n--- 🕵️ 유사 사용자 상위 {k}명 찾기 시작 🕵️ ---")
+    match_query = _load_match_query(db, user_id)
+    if match_query is None:
+        return []
+    _, gender, age_min, age_max, movie_ids = match_query
+
+    set_index = get_set_similarity_index(db)
+    lo, hi = set_index.index.candidate_range(gender, age_min, age_max)
+    print(f"✅ 1차 필터링(나이/성별): {hi - lo}명의 후보를 찾았습니다.")
+
+    results, stats = set_index.search(lo, hi, movie_ids, k=k, min_similarity=min_similarity)
+    _print_search_stats(stats)
+    for rank, (ml_user_id, similarity) in enumerate(results, start=1):
+        print(f"  {rank}. 사용자 {ml_user_id} (유사도: {similarity:.4f})")
+    return results
+
+def save_match_to_db(db: Session, new_user, ml_user_id, similarity, watched_movies, rating_version):
+    """매칭 결과를 겹치는 영화 제목, 유사도, rating 버전과 함께 similarity 테이블에 저장합니다."""
+    watched_ids = {movie_id for movie_id, _ in watched_movies}
+    overlapped_ids = [movie_id for movie_id in resolve_pref_movie_ids(db, new_user) if movie_id in watched_ids]
+    id_to_title = crud.get_movie_titles_by_ids(db, overlapped_ids)
+    overlapped_movies = [id_to_title[movie_id] for movie_id in overlapped_ids if movie_id in id_to_title]
+
+    crud.save_similarity(
+        db,
+        user_id=str(new_user.user_id),
+        ml_user_id=ml_user_id,
+        overlapped_movies=overlapped_movies,
+        similarity_score=float(similarity),
+        rating_version=rating_version,
+    )
+    print(f"✅ 매칭 결과를 similarity 테이블에 저장했습니다. (겹치는 영화 {len(overlapped_movies)}편)")
+
+
 # ... (파일 하단 save_match_to_jsonl 함수는 그대로) ...
-def save_match_to_jsonl(db: Session, new_user, ml_user_id, similarity):
+def save_match_to_jsonl(db: Session, new_user, ml_user_id, similarity, watched_movies=None):
     """매칭 결과를 상세 정보와 함께 jsonl 파일에 저장합니다."""
     
     ml_user = crud.get_ml_user(db, ml_user_id=ml_user_id)
-    watched_movies = crud.get_watched_movies_by_ml_user(db, ml_user_id=ml_user_id)
+    if watched_movies is None:
+        watched_movies = crud.get_watched_movies_by_ml_user(db, ml_user_id=ml_user_id)
     watched_movies_dict = {movie_id: float(rating) for movie_id, rating in watched_movies} # rating을 float으로 변환
 
     result_data = {
@@ -99,7 +373,8 @@ def save_match_to_jsonl(db: Session, new_user, ml_user_id, similarity):
             "user_id": str(new_user.user_id),
             "gender": new_user.gender,
             "age": new_user.age,
-            "pref_movie_list": new_user.pref_movie_list
+            "pref_movie_list": new_user.pref_movie_list,
+            "pref_movie_ids": new_user.pref_movie_ids
         },
         "matched_ml_user_info": {
             "ml_user_id": ml_user.ml_user_id,
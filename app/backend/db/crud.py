@@ -1,11 +1,12 @@
 # app/backend/db/crud.py
 
+import json
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.expression import func
-# ✨ sqlalchemy에서 String과 cast 함수를 함께 import 합니다.
-from sqlalchemy import cast, String
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from . import models
+from .ott_mask import MAX_OTT_PLATFORMS, encode_ott_mask
 
 # --- 사용자 설문 관련 함수 ---
 def create_user(db: Session, user_data: dict):
@@ -17,6 +18,7 @@ def create_user(db: Session, user_data: dict):
         income=user_data["income"],
         ott_consume_freq=user_data["ott_consume_freq"],
         pref_movie_list=user_data["pref_movie_list"],
+        pref_movie_ids=user_data.get("pref_movie_ids"),
         current_otts=user_data["current_otts"],
         watch_with=user_data["watch_with"],
         preferred_movie_genres=user_data["preferred_movie_genres"],
@@ -57,6 +59,16 @@ def get_movies_for_survey(db: Session, limit: int = 100):
              .limit(limit)\
              .all()
 
+def get_survey_movie_pool(db: Session):
+    """
+    미리 계산된 설문 후보 영화 풀(survey_movie_pool)을 순위 순으로 가져옵니다.
+    풀은 scripts/update_view_counts.py, update_averagers.py 실행 시 다시 만들어집니다.
+    """
+    return db.query(models.Movie)\
+             .join(models.SurveyMoviePool, models.SurveyMoviePool.movie_id == models.Movie.movie_id)\
+             .order_by(models.SurveyMoviePool.pool_rank)\
+             .all()
+
 # --- 유사 사용자 매칭에 필요한 함수들 ---
 def get_user(db: Session, user_id: str):
     """ID로 특정 신규 사용자의 정보를 조회합니다."""
@@ -70,10 +82,79 @@ def get_all_ratings(db: Session):
     """모든 평점 정보를 조회합니다."""
     return db.query(models.Rating).all()
 
-def get_movie_id_by_title(db: Session, title: str):
-    """영화 제목으로 영화 ID를 조회합니다."""
-    movie = db.query(models.Movie).filter(models.Movie.title == title).first()
-    return movie.movie_id if movie else None
+def get_ml_user_profiles(db: Session):
+    """매칭 인덱스 구성을 위해 MovieLens 사용자의 (ID, 성별, 나이)만 조회합니다."""
+    return db.query(models.MovieLensUser.ml_user_id, models.MovieLensUser.gender, models.MovieLensUser.age).all()
+
+def get_rating_pairs(db: Session):
+    """매칭 인덱스 구성을 위해 평점 테이블의 (사용자 ID, 영화 ID) 쌍만 조회합니다."""
+    return db.query(models.Rating.ml_user_id, models.Rating.movie_id).all()
+
+def get_data_version(db: Session, table_name: str) -> int:
+    """테이블의 데이터 버전을 조회합니다. (트리거가 한 번도 실행되지 않았다면 0)"""
+    row = db.query(models.DataVersion.version).filter(models.DataVersion.table_name == table_name).first()
+    return row.version if row else 0
+
+FIND_MOST_SIMILAR_PROFILE_SQL = text("""
+SELECT p.ml_user_id,
+       o.overlap::float / (p.movie_count + :n_movies - o.overlap) AS similarity
+FROM ml_user_profile p
+CROSS JOIN LATERAL (
+    SELECT COUNT(*) AS overlap
+    FROM unnest(p.movie_ids) AS m(movie_id)
+    WHERE m.movie_id = ANY(CAST(:movie_ids AS integer[]))
+) o
+WHERE p.gender = :gender
+  AND p.age BETWEEN :age_min AND :age_max
+  AND p.movie_ids && CAST(:movie_ids AS integer[])
+ORDER BY similarity DESC, p.ml_user_id
+LIMIT 1
+""")
+
+FIRST_PROFILE_IN_BUCKET_SQL = text("""
+SELECT MIN(ml_user_id) AS ml_user_id
+FROM ml_user_profile
+WHERE gender = :gender AND age BETWEEN :age_min AND :age_max
+""")
+
+def find_most_similar_profile(db: Session, gender: str, age_min: int, age_max: int, movie_ids: list[int]):
+    """
+    ml_user_profile 테이블에서 나이/성별 조건을 만족하는 사용자 중 자카드 유사도가 가장 높은 사용자를 찾습니다.
+    교집합/합집합 크기는 DB에서 계산하고, 최고 후보 한 건만 반환합니다. (동점이면 ml_user_id가 작은 사용자)
+    겹치는 영화가 있는 후보가 없으면 조건을 만족하는 첫 사용자를 유사도 0으로 반환합니다.
+    """
+    params = {"gender": gender, "age_min": age_min, "age_max": age_max}
+    if movie_ids:
+        row = db.execute(
+            FIND_MOST_SIMILAR_PROFILE_SQL,
+            {**params, "movie_ids": list(movie_ids), "n_movies": len(movie_ids)},
+        ).first()
+        if row:
+            return row.ml_user_id, float(row.similarity)
+
+    row = db.execute(FIRST_PROFILE_IN_BUCKET_SQL, params).first()
+    if row and row.ml_user_id is not None:
+        return row.ml_user_id, 0.0
+    return None, 0
+
+def get_all_movie_titles(db: Session):
+    """모든 영화의 (ID, 제목)을 ID 순으로 조회합니다. (제목 인덱스 구성용)"""
+    return db.query(models.Movie.movie_id, models.Movie.title).order_by(models.Movie.movie_id).all()
+
+def get_movies_by_ids(db: Session, movie_ids):
+    """여러 영화 ID에 해당하는 영화들을 한 번의 IN 쿼리로 조회합니다."""
+    movie_ids = list(set(movie_ids))
+    if not movie_ids:
+        return []
+    return db.query(models.Movie).filter(models.Movie.movie_id.in_(movie_ids)).all()
+
+def get_movie_titles_by_ids(db: Session, movie_ids) -> dict:
+    """여러 영화 ID를 한 번의 IN 쿼리로 제목에 매핑합니다."""
+    movie_ids = list(set(movie_ids))
+    if not movie_ids:
+        return {}
+    rows = db.query(models.Movie.movie_id, models.Movie.title).filter(models.Movie.movie_id.in_(movie_ids)).all()
+    return {movie_id: title for movie_id, title in rows}
 
 def get_ml_user(db: Session, ml_user_id: int):
     """ID로 특정 MovieLens 사용자의 정보를 조회합니다."""
@@ -83,6 +164,102 @@ def get_watched_movies_by_ml_user(db: Session, ml_user_id: int):
     """특정 MovieLens 사용자가 시청(평가)한 영화 목록을 조회합니다."""
     return db.query(models.Rating.movie_id, models.Rating.rating).filter(models.Rating.ml_user_id == ml_user_id).all()
 
+def get_high_ratings(db: Session, min_rating: float, ml_user_ids=None):
+    """
+    평점이 min_rating 이상인 (ml_user_id, movie_id, rating)을 조회합니다. (추천 사전 계산용)
+    ml_user_ids를 주면 그 사용자들의 평점만 조회합니다.
+    """
+    query = db.query(models.Rating.ml_user_id, models.Rating.movie_id, models.Rating.rating)\
+              .filter(models.Rating.rating >= min_rating)\
+              .filter(models.Rating.movie_id.isnot(None))
+    if ml_user_ids is not None:
+        query = query.filter(models.Rating.ml_user_id.in_(list(ml_user_ids)))
+    return query.all()
+
+CHANGED_RECOMMENDATION_USERS_SQL = text("""
+SELECT ml_user_id FROM rating
+WHERE rating_seq > :after_rating_seq AND rating_seq <= :upto_rating_seq
+UNION
+SELECT r.ml_user_id FROM movie m JOIN rating r ON r.movie_id = m.movie_id
+WHERE m.ott_seq > :after_ott_seq AND m.ott_seq <= :upto_ott_seq AND r.rating >= :min_rating
+UNION
+SELECT u.ml_user_id FROM movie_lens_data u
+WHERE NOT EXISTS (SELECT 1 FROM ml_user_recommendation rec WHERE rec.ml_user_id = u.ml_user_id)
+""")
+
+def get_changed_recommendation_users(db: Session, after_rating_seq: int, upto_rating_seq: int,
+                                     after_ott_seq: int, upto_ott_seq: int, min_rating: float) -> list[int]:
+    """
+    추천 결과를 다시 계산해야 하는 MovieLens 사용자 ID 목록을 반환합니다.
+    - 워터마크 이후(rating_seq) 평점이 추가된 사용자
+    - 워터마크 이후(movie.ott_seq) OTT 정보가 바뀐 영화에 min_rating 이상을 준 사용자
+    - 추천 결과 행이 아직 없는 사용자
+    """
+    rows = db.execute(CHANGED_RECOMMENDATION_USERS_SQL, {
+        "after_rating_seq": after_rating_seq, "upto_rating_seq": upto_rating_seq,
+        "after_ott_seq": after_ott_seq, "upto_ott_seq": upto_ott_seq, "min_rating": min_rating,
+    }).scalars().all()
+    return sorted(uid for uid in rows if uid is not None)
+
+def get_ml_user_recommendation(db: Session, ml_user_id: int):
+    """
+    미리 계산된 추천 결과와 현재 (rating, movie_ott) 데이터 버전을 한 번의 기본 키 조회로 가져옵니다.
+    반환값: (MovieLensUserRecommendation 또는 None, 현재 rating 버전, 현재 movie_ott 버전)
+    """
+    def current_version(table_name):
+        return db.query(models.DataVersion.version)\
+                 .filter(models.DataVersion.table_name == table_name)\
+                 .scalar_subquery()
+
+    row = db.query(models.MovieLensUserRecommendation, current_version("rating"), current_version("movie_ott"))\
+            .filter(models.MovieLensUserRecommendation.ml_user_id == ml_user_id)\
+            .first()
+    if row is None:
+        return None, get_data_version(db, "rating"), get_data_version(db, "movie_ott")
+    recommendation, rating_version, ott_version = row
+    return recommendation, rating_version or 0, ott_version or 0
+
+def count_stale_ml_user_recommendations(db: Session, rating_version: int, ott_version: int) -> int:
+    """
+    다시 계산해야 하는 MovieLens 사용자 수를 반환합니다.
+    (추천 결과가 없거나, 저장된 데이터 버전이 현재 버전과 다른 사용자)
+    """
+    return db.query(func.count(models.MovieLensUser.ml_user_id))\
+             .outerjoin(models.MovieLensUserRecommendation,
+                        models.MovieLensUserRecommendation.ml_user_id == models.MovieLensUser.ml_user_id)\
+             .filter((models.MovieLensUserRecommendation.ml_user_id.is_(None))
+                     | (models.MovieLensUserRecommendation.rating_version != rating_version)
+                     | (models.MovieLensUserRecommendation.ott_version != ott_version))\
+             .scalar()
+
+def upsert_ml_user_recommendations(db: Session, rows: list[dict], only_changed: bool = True):
+    """
+    추천 결과를 한 번의 INSERT ... ON CONFLICT로 저장합니다. (커밋은 호출한 쪽에서 처리합니다.)
+    only_changed=True이면 내용(추천 OTT, 영화 목록)이 바뀐 행만 다시 쓰며,
+    이때 바뀌지 않은 행의 버전은 stamp_ml_user_recommendations로 일괄 갱신합니다.
+    """
+    if not rows:
+        return
+    table = models.MovieLensUserRecommendation.__table__
+    stmt = pg_insert(table).values(rows)
+    content = ["top_ott", "ranked_otts", "movie_ids", "movie_otts"]
+    where = None
+    if only_changed:
+        where = tuple_(*(table.c[key] for key in content)).is_distinct_from(
+            tuple_(*(stmt.excluded[key] for key in content)))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["ml_user_id"],
+        set_={key: stmt.excluded[key] for key in content + ["rating_version", "ott_version"]},
+        where=where,
+    )
+    db.execute(stmt)
+
+def stamp_ml_user_recommendations(db: Session, rating_version: int, ott_version: int):
+    """모든 추천 결과의 데이터 버전을 현재 버전으로 갱신합니다. (커밋은 호출한 쪽에서 처리합니다.)"""
+    model = models.MovieLensUserRecommendation
+    db.query(model).filter((model.rating_version != rating_version) | (model.ott_version != ott_version))\
+      .update({"rating_version": rating_version, "ott_version": ott_version}, synchronize_session=False)
+
 def create_similarity(db: Session, user_id: str, ml_user_id: int, overlapped_movies: list):
     """유사도 매칭 결과를 similarity 테이블에 저장합니다."""
     db_similarity = models.Similarity(
@@ -95,6 +272,71 @@ def create_similarity(db: Session, user_id: str, ml_user_id: int, overlapped_mov
     db.refresh(db_similarity)
     return db_similarity
 
+def save_similarity(db: Session, user_id: str, ml_user_id: int, overlapped_movies: list,
+                    similarity_score: float, rating_version: int):
+    """
+    매칭 결과를 similarity 테이블에 저장합니다. 이미 결과가 있으면 새 결과로 덮어씁니다.
+    rating_version은 매칭에 사용한 rating 데이터 버전으로, 캐시 유효성 판단에 사용됩니다.
+    """
+    values = {
+        "user_id": user_id,
+        "ml_user_id": ml_user_id,
+        "overlapped_movies": overlapped_movies,
+        "similarity_score": similarity_score,
+        "rating_version": rating_version,
+    }
+    stmt = pg_insert(models.Similarity).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={key: stmt.excluded[key] for key in values if key != "user_id"},
+    )
+    db.execute(stmt)
+    db.commit()
+
+def get_cached_similarity(db: Session, user_id: str):
+    """
+    저장된 매칭 결과와 현재 rating 데이터 버전을 한 번의 기본 키 조회로 함께 가져옵니다.
+    반환값: (Similarity 또는 None, 현재 rating 버전)
+    """
+    current_version = db.query(models.DataVersion.version)\
+                        .filter(models.DataVersion.table_name == "rating")\
+                        .scalar_subquery()
+    row = db.query(models.Similarity, current_version)\
+            .filter(models.Similarity.user_id == user_id)\
+            .first()
+    if row is None:
+        return None, get_data_version(db, "rating")
+    similarity, version = row
+    return similarity, version or 0
+
+def invalidate_similarity(db: Session, user_id: str):
+    """저장된 매칭 결과를 무효화해 다음 조회 시 다시 계산되도록 합니다."""
+    db.query(models.Similarity).filter(models.Similarity.user_id == user_id).update({"rating_version": None})
+    db.commit()
+
+def get_pending_users(db: Session, after_user_id=None, limit: int = 1000):
+    """
+    similarity 테이블에 매칭 결과가 없는 신규 사용자를 user_id 순으로 limit명씩 조회합니다.
+    after_user_id를 넘기면 그 다음 사용자부터 조회합니다. (키셋 페이지네이션)
+    """
+    query = db.query(models.User.user_id, models.User.gender, models.User.age,
+                     models.User.pref_movie_list, models.User.pref_movie_ids)\
+              .outerjoin(models.Similarity, models.Similarity.user_id == models.User.user_id)\
+              .filter(models.Similarity.user_id.is_(None))
+    if after_user_id is not None:
+        query = query.filter(models.User.user_id > after_user_id)
+    return query.order_by(models.User.user_id).limit(limit).all()
+
+def bulk_create_similarities(db: Session, rows: list[dict]):
+    """
+    여러 매칭 결과를 한 번의 INSERT로 similarity 테이블에 저장합니다.
+    이미 결과가 있는 사용자는 건너뜁니다. (여러 작업이 동시에 실행되어도 안전)
+    """
+    if not rows:
+        return
+    db.execute(pg_insert(models.Similarity).values(rows).on_conflict_do_nothing(index_elements=["user_id"]))
+    db.commit()
+
 
 # --- ✨ OTT 추천 및 데이터 관리를 위한 새로운 함수들 ✨ ---
 
@@ -102,24 +344,123 @@ def get_all_movies(db: Session):
     """DB에 있는 모든 영화 정보를 가져옵니다. (OTT 정보 업데이트용)"""
     return db.query(models.Movie).all()
 
-def update_movie_ott_list(db: Session, movie_id: int, ott_data: dict):
+def update_movie_ott_list(db: Session, movie_id: int, ott_data: dict, ott_mask: int = None):
     """
-    특정 영화의 ott_list (JSONB) 컬럼을 업데이트합니다.
+    특정 영화의 ott_list (JSONB) 컬럼과 ott_mask (비트마스크) 컬럼을 함께 업데이트합니다.
     Google 검색 API 결과를 이 함수를 통해 DB에 저장할 수 있습니다.
+    - ott_data: {OTT UUID 문자열: 제공 여부}
+    - ott_mask를 주지 않으면 ott_table의 비트 위치로 ott_data를 인코딩합니다.
     """
-    db.query(models.Movie).filter(models.Movie.movie_id == movie_id).update({"ott_list": ott_data})
+    if ott_mask is None:
+        ott_mask = encode_ott_mask(ott_data, get_ott_bit_positions(db))
+    db.query(models.Movie).filter(models.Movie.movie_id == movie_id)\
+      .update({"ott_list": ott_data, "ott_mask": ott_mask})
     db.commit()
 
+def bulk_update_movie_ott(db: Session, rows: list[tuple]):
+    """
+    여러 영화의 ott_list / ott_mask를 한 번의 UPDATE ... FROM (VALUES ...)로 갱신합니다.
+    - rows: [(movie_id, {OTT UUID 문자열: 제공 여부}, ott_mask), ...]
+    - 저장한 영화의 작업 임대(ott_lease_*)도 함께 해제합니다.
+    - 커밋은 호출한 쪽에서 처리합니다. 반환값은 갱신된 행 수입니다.
+    """
+    if not rows:
+        return 0
+    placeholders, params = [], {}
+    for i, (movie_id, ott_data, ott_mask) in enumerate(rows):
+        placeholders.append(f"(:movie_id_{i}, CAST(:ott_list_{i} AS jsonb), :ott_mask_{i})")
+        params[f"movie_id_{i}"] = movie_id
+        params[f"ott_list_{i}"] = json.dumps(ott_data)
+        params[f"ott_mask_{i}"] = ott_mask
+    result = db.execute(text(f"""
+        UPDATE movie AS m
+        SET ott_list = v.ott_list, ott_mask = v.ott_mask, ott_lease_owner = NULL, ott_lease_until = NULL
+        FROM (VALUES {", ".join(placeholders)}) AS v(movie_id, ott_list, ott_mask)
+        WHERE m.movie_id = v.movie_id
+    """), params)
+    return result.rowcount
+
+PENDING_OTT_CONDITION = "(ott_list IS NULL OR ott_list = '{}'::jsonb)"
+
+def get_pending_ott_movies(db: Session, after_movie_id: int = 0, limit: int = 500):
+    """
+    OTT 정보가 없는 영화의 (movie_id, title)을 movie_id 순으로 한 페이지만 조회합니다. (키셋 페이지네이션)
+    다음 페이지는 마지막 movie_id를 after_movie_id로 넘겨 조회합니다.
+    """
+    return db.execute(text(f"""
+        SELECT movie_id, title FROM movie
+        WHERE {PENDING_OTT_CONDITION} AND movie_id > :after_movie_id
+        ORDER BY movie_id
+        LIMIT :limit
+    """), {"after_movie_id": after_movie_id, "limit": limit}).all()
+
+def claim_pending_ott_movies(db: Session, owner: str, after_movie_id: int = 0, limit: int = 500,
+                             lease_sec: int = 600):
+    """
+    OTT 정보가 없는 영화 한 페이지를 owner 이름으로 임대(lease)하고 (movie_id, title)을 movie_id 순으로 반환합니다.
+    - 다른 프로세스가 잠근 행은 FOR UPDATE SKIP LOCKED로 건너뛰고, 임대가 유효한 행도 제외합니다.
+    - 임대가 만료되면(프로세스 비정상 종료 등) 다른 프로세스가 다시 가져갈 수 있습니다.
+    - 커밋은 호출한 쪽에서 처리합니다.
+    """
+    rows = db.execute(text(f"""
+        WITH claimed AS (
+            SELECT movie_id FROM movie
+            WHERE {PENDING_OTT_CONDITION}
+              AND movie_id > :after_movie_id
+              AND (ott_lease_until IS NULL OR ott_lease_until < now())
+            ORDER BY movie_id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE movie AS m
+        SET ott_lease_owner = :owner, ott_lease_until = now() + make_interval(secs => :lease_sec)
+        FROM claimed
+        WHERE m.movie_id = claimed.movie_id
+        RETURNING m.movie_id, m.title
+    """), {"owner": owner, "after_movie_id": after_movie_id, "limit": limit, "lease_sec": lease_sec}).all()
+    return sorted(rows, key=lambda row: row.movie_id)
+
+def release_ott_leases(db: Session, owner: str):
+    """owner가 임대한 뒤 저장하지 못한 영화의 임대를 해제합니다. (커밋은 호출한 쪽에서 처리합니다.)"""
+    return db.execute(text("""
+        UPDATE movie SET ott_lease_owner = NULL, ott_lease_until = NULL
+        WHERE ott_lease_owner = :owner
+    """), {"owner": owner}).rowcount
+
 def get_recommended_movies_with_ott(db: Session, movie_ids: list[int]):
     """
-    추천된 영화 ID 목록을 받아, ott_list가 비어있지 않은 영화만 반환합니다.
-    JSONB 컬럼의 값이 NULL이 아니고, 빈 JSON '{}'이 아닌 영화를 필터링합니다.
+    추천된 영화 ID 목록을 받아, 하나 이상의 OTT에서 제공되는 영화만 반환합니다.
+    ott_mask <> 0 조건은 부분 인덱스(idx_movie_ott_available)를 사용합니다.
     """
     return db.query(models.Movie)\
              .filter(models.Movie.movie_id.in_(movie_ids))\
-             .filter(models.Movie.ott_list.isnot(None))\
-             .filter(cast(models.Movie.ott_list, String) != '{}')\
+             .filter(models.Movie.ott_mask != 0)\
+             .all()
+
+def get_movies_available_on(db: Session, platform_mask: int, movie_ids: list[int] = None):
+    """
+    platform_mask의 플랫폼 중 하나 이상에서 제공되는 영화를 반환합니다.
+    (예: platform_bit(netflix.bit_position) → Netflix 제공 영화)
+    """
+    query = db.query(models.Movie)\
+              .filter(models.Movie.ott_mask != 0)\
+              .filter(models.Movie.ott_mask.op("&")(platform_mask) != 0)
+    if movie_ids is not None:
+        query = query.filter(models.Movie.movie_id.in_(movie_ids))
+    return query.all()
+
+def get_movie_ott_masks(db: Session):
+    """하나 이상의 OTT에서 제공되는 모든 영화의 (ID, ott_mask)를 조회합니다. (OTT 행렬 구성용)"""
+    return db.query(models.Movie.movie_id, models.Movie.ott_mask)\
+             .filter(models.Movie.ott_mask != 0)\
+             .all()
+
+def get_ott_bit_positions(db: Session) -> dict:
+    """{OTT UUID 문자열: 비트 위치}를 반환합니다. (비트 위치가 없는 플랫폼은 제외)"""
+    rows = db.query(models.OttTable.ott_id, models.OttTable.bit_position)\
+             .filter(models.OttTable.bit_position.isnot(None))\
              .all()
+    return {str(ott_id): bit_position for ott_id, bit_position in rows}
 
 def get_or_create_ott(db: Session, ott_name: str):
     """
@@ -132,7 +473,12 @@ def get_or_create_ott(db: Session, ott_name: str):
 
     if not db_ott:
         created = True
-        db_ott = models.OttTable(ott_name=ott_name)
+        # 새 플랫폼에는 아직 사용되지 않은 다음 비트 위치를 부여합니다. (한 번 부여되면 바뀌지 않음)
+        max_bit = db.query(func.max(models.OttTable.bit_position)).scalar()
+        bit_position = 0 if max_bit is None else max_bit + 1
+        if bit_position >= MAX_OTT_PLATFORMS:
+            raise ValueError(f"OTT 플랫폼은 최대 {MAX_OTT_PLATFORMS}개까지 등록할 수 있습니다.")
+        db_ott = models.OttTable(ott_name=ott_name, bit_position=bit_position)
         db.add(db_ott)
         # flush()를 통해 DB에 INSERT 쿼리를 보내고,
         # 서버에서 생성된 UUID를 db_ott 객체에 반영합니다.
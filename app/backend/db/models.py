@@ -1,8 +1,8 @@
 # app/backend/db/models.py
 
 from sqlalchemy import (
-    Column, Integer, String, ARRAY, TEXT, NUMERIC, 
-    ForeignKey, func, CheckConstraint
+    Column, Integer, BigInteger, SmallInteger, String, ARRAY, TEXT, NUMERIC, REAL,
+    ForeignKey, func, CheckConstraint, FetchedValue, DateTime
 )
 # 필요한 타입들을 추가로 import 합니다.
 from sqlalchemy.dialects.postgresql import UUID, JSONB 
@@ -22,6 +22,7 @@ class User(Base):
     income = Column(String(50))
     ott_consume_freq = Column(String(50))
     pref_movie_list = Column(ARRAY(TEXT))
+    pref_movie_ids = Column(ARRAY(Integer))  # pref_movie_list와 같은 순서의 영화 ID
     
     # 새로운 설문 항목 컬럼
     current_otts = Column(ARRAY(TEXT))
@@ -38,6 +39,28 @@ class MovieLensUser(Base):
     gender = Column(String(10))
     age = Column(Integer)
 
+class MovieLensUserProfile(Base):
+    """rating 테이블에서 파생된 MovieLens 사용자별 시청 영화 배열 모델 (SQL 매칭 엔진용)"""
+    __tablename__ = "ml_user_profile"
+
+    ml_user_id = Column(Integer, ForeignKey("movie_lens_data.ml_user_id"), primary_key=True)
+    gender = Column(String(10))
+    age = Column(Integer)
+    movie_ids = Column(ARRAY(Integer), nullable=False)
+    movie_count = Column(Integer, nullable=False)
+
+class MovieLensUserRecommendation(Base):
+    """MovieLens 사용자별 OTT 추천 결과 모델 (Result 페이지용 사전 계산)"""
+    __tablename__ = "ml_user_recommendation"
+
+    ml_user_id = Column(Integer, ForeignKey("movie_lens_data.ml_user_id"), primary_key=True)
+    top_ott = Column(String(50))
+    ranked_otts = Column(JSONB, nullable=False)
+    movie_ids = Column(ARRAY(Integer), nullable=False)
+    movie_otts = Column(JSONB, nullable=False)
+    rating_version = Column(BigInteger, nullable=False)
+    ott_version = Column(BigInteger, nullable=False)
+
 class Movie(Base):
     """영화 정보 및 OTT 플랫폼 정보 모델"""
     __tablename__ = "movie"
@@ -46,8 +69,24 @@ class Movie(Base):
     title = Column(String(255))
     rating_avg = Column(NUMERIC(3, 2))
     view_count = Column(Integer, default=0)
+    rating_sum = Column(NUMERIC)  # NULL이 아닌 평점의 합계 (rating 행이 없으면 NULL)
+    rating_count = Column(Integer, nullable=False, default=0)  # NULL이 아닌 평점 수
     # platform 컬럼을 제거하고 ott_list를 JSONB 타입으로 지정합니다.
     ott_list = Column(JSONB)
+    # ott_table.bit_position 기준 OTT 제공 여부 비트마스크 (NULL: 미검색, 0: 제공 플랫폼 없음)
+    ott_mask = Column(Integer)
+    # OTT 정보 수집 작업 임대 (update_ott_info.py 여러 프로세스가 작업을 나눠 가져갈 때 사용)
+    ott_lease_owner = Column(String(100))
+    ott_lease_until = Column(DateTime(timezone=True))
+    # ott_mask가 마지막으로 바뀐 순번 (트리거가 movie_ott_seq로 매김, 추천 사전 계산 증분 갱신용)
+    ott_seq = Column(BigInteger, nullable=False, server_default=FetchedValue())
+
+class SurveyMoviePool(Base):
+    """설문에 노출할 후보 영화 풀 모델 (인기·고평점 상위 영화)"""
+    __tablename__ = "survey_movie_pool"
+
+    movie_id = Column(Integer, ForeignKey("movie.movie_id"), primary_key=True)
+    pool_rank = Column(Integer, nullable=False)
 
 class Rating(Base):
     """모델이 예측한 사용자별 영화 평점 모델"""
@@ -57,6 +96,16 @@ class Rating(Base):
     ml_user_id = Column(Integer, ForeignKey("movie_lens_data.ml_user_id"))
     movie_id = Column(Integer, ForeignKey("movie.movie_id"))
     rating = Column(NUMERIC(3, 2), CheckConstraint('rating >= 0.0 AND rating <= 5.0', name='rating_check'))
+    rating_seq = Column(BigInteger, server_default=FetchedValue())  # BIGSERIAL (입력 순서)
+
+class PredictedRating(Base):
+    """NCF 모델이 예측한 사용자별 미시청 영화 상위 N편 모델 (scripts/score_predicted_ratings.py로 갱신)"""
+    __tablename__ = "predicted_rating"
+
+    ml_user_id = Column(Integer, ForeignKey("movie_lens_data.ml_user_id"), primary_key=True)
+    movie_id = Column(Integer, ForeignKey("movie.movie_id"), primary_key=True)
+    predicted_rating = Column(REAL, nullable=False)
+    rank = Column(SmallInteger, nullable=False)
 
 class Similarity(Base):
     """신규 사용자와 MovieLens 사용자 매칭 결과 모델"""
@@ -65,6 +114,8 @@ class Similarity(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("user.user_id"), primary_key=True)
     ml_user_id = Column(Integer, ForeignKey("movie_lens_data.ml_user_id"))
     overlapped_movies = Column(ARRAY(TEXT))
+    similarity_score = Column(REAL)
+    rating_version = Column(BigInteger)
 
 class OttTable(Base):
     """OTT 플랫폼 정보 및 추천 통계 모델"""
@@ -73,4 +124,12 @@ class OttTable(Base):
     # ott_id를 UUID로 변경하고 서버 기본값을 설정합니다.
     ott_id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     ott_name = Column(String(50), unique=True)
-    recommendation_count = Column(Integer, default=0)
\ No newline at end of file
+    recommendation_count = Column(Integer, default=0)
+    bit_position = Column(SmallInteger, unique=True)  # movie.ott_mask에서 이 플랫폼의 비트 위치
+
+class DataVersion(Base):
+    """테이블별 데이터 버전 모델 (트리거가 변경 시마다 version을 증가시킵니다)"""
+    __tablename__ = "data_version"
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
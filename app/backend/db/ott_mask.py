@@ -0,0 +1,38 @@
+# app/backend/db/ott_mask.py
+
+"""
+OTT 제공 여부 비트마스크(movie.ott_mask) 인코더/디코더.
+
+- ott_table.bit_position(0부터)이 플랫폼별 비트 위치이며, 한 번 부여되면 바뀌지 않습니다.
+- movie.ott_mask는 INTEGER이므로 플랫폼은 최대 MAX_OTT_PLATFORMS개까지 등록할 수 있습니다.
+- NULL: 아직 검색하지 않은 영화 / 0: 검색했지만 제공하는 플랫폼 없음
+"""
+
+MAX_OTT_PLATFORMS = 31  # 부호 있는 32비트 INTEGER에서 부호 비트를 제외한 비트 수
+
+
+def platform_bit(bit_position: int) -> int:
+    """비트 위치에 해당하는 단일 플랫폼 마스크를 반환합니다."""
+    if not 0 <= bit_position < MAX_OTT_PLATFORMS:
+        raise ValueError(f"OTT 비트 위치는 0 ~ {MAX_OTT_PLATFORMS - 1} 사이여야 합니다: {bit_position}")
+    return 1 << bit_position
+
+
+def encode_ott_mask(availability: dict, bit_positions: dict) -> int:
+    """
+    {OTT 키: 제공 여부} 딕셔너리를 비트마스크로 변환합니다.
+    OTT 키는 bit_positions와 같은 종류(이름 또는 UUID 문자열)여야 하며, 비트 위치가 없는 키는 무시합니다.
+    """
+    mask = 0
+    for key, available in availability.items():
+        if available and key in bit_positions:
+            mask |= platform_bit(bit_positions[key])
+    return mask
+
+
+def decode_ott_mask(mask: int, names_by_bit: dict) -> list:
+    """비트마스크를 제공 플랫폼 이름 목록(비트 위치 순)으로 변환합니다."""
+    if not mask:
+        return []
+    return [name for bit, name in sorted(names_by_bit.items()) if mask & (1 << bit)]
+
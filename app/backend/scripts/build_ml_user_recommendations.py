@@ -0,0 +1,172 @@
+# app/backend/scripts/build_ml_user_recommendations.py
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sqlalchemy import text
+
+# --- 경로 추가 (backend 패키지를 import 하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.db.database import SessionLocal
+from backend.db import crud
+from backend.core.ott_matrix import OttMatrix
+from backend.core.recommender import HIGH_RATING_THRESHOLD, summarize_recommendation
+
+JOB_NAME = "ml_user_recommendation"
+
+# 증분 갱신 기준점: 여기까지의 평점(rating_seq)과 OTT 변경(movie.ott_seq), 전체 재계산 전환용 데이터 버전
+# rating / movie를 SHARE 모드로 잠근 뒤 읽으므로, 아직 커밋되지 않은 변경의 순번을 건너뛰지 않습니다.
+CURRENT_MARKS_SQL = """
+SELECT (SELECT COALESCE(MAX(rating_seq), 0) FROM rating) AS rating_seq,
+       (SELECT COALESCE(MAX(ott_seq), 0) FROM movie) AS ott_seq,
+       COALESCE((SELECT version FROM data_version WHERE table_name = 'rating_rewrite'), 0) AS rewrite_version,
+       COALESCE((SELECT version FROM data_version WHERE table_name = 'ott_platform'), 0) AS platform_version
+"""
+
+UPSERT_WATERMARK_SQL = """
+INSERT INTO aggregate_watermark (job_name, last_rating_seq, rewrite_version, last_ott_seq, platform_version)
+VALUES (:job_name, :rating_seq, :rewrite_version, :ott_seq, :platform_version)
+ON CONFLICT (job_name) DO UPDATE
+SET last_rating_seq = EXCLUDED.last_rating_seq,
+    rewrite_version = EXCLUDED.rewrite_version,
+    last_ott_seq = EXCLUDED.last_ott_seq,
+    platform_version = EXCLUDED.platform_version;
+"""
+
+# --- 워커 프로세스 ---
+_worker_matrix = None
+_worker_titles = None
+
+def _init_worker(matrix_arrays: tuple, titles: dict):
+    """워커 전용 OTT 행렬과 영화 제목 사전을 구성합니다."""
+    global _worker_matrix, _worker_titles
+    _worker_matrix = OttMatrix(*matrix_arrays)
+    _worker_titles = titles
+
+def _recommend_shard(users: list[tuple]):
+    """(ml_user_id, 영화 ID 배열, 평점 배열) 목록의 추천 결과를 계산합니다."""
+    return [
+        dict(summarize_recommendation(_worker_matrix, movie_ids, ratings, _worker_titles), ml_user_id=ml_user_id)
+        for ml_user_id, movie_ids, ratings in users
+    ]
+
+# --- 메인 프로세스 ---
+def group_ratings_by_user(ml_user_ids, pairs) -> list[tuple]:
+    """(ml_user_id, movie_id, rating) 목록을 사용자별 (ml_user_id, 영화 ID 배열, 평점 배열)로 묶습니다."""
+    users = np.fromiter((p.ml_user_id for p in pairs), dtype=np.int64, count=len(pairs))
+    movies = np.fromiter((p.movie_id for p in pairs), dtype=np.int64, count=len(pairs))
+    ratings = np.fromiter((float(p.rating) for p in pairs), dtype=np.float64, count=len(pairs))
+
+    order = np.argsort(users, kind="stable")
+    users, movies, ratings = users[order], movies[order], ratings[order]
+    ids = np.asarray(sorted(ml_user_ids), dtype=np.int64)
+    starts = np.searchsorted(users, ids, side="left")
+    ends = np.searchsorted(users, ids, side="right")
+    return [(int(uid), movies[s:e], ratings[s:e]) for uid, s, e in zip(ids, starts, ends)]
+
+def read_marks(db):
+    """현재 기준점과 지난 실행의 워터마크를 읽습니다. 잠금은 기준점을 읽은 직후 커밋으로 풉니다."""
+    db.execute(text("LOCK TABLE rating, movie IN SHARE MODE"))
+    marks = db.execute(text(CURRENT_MARKS_SQL)).one()
+    watermark = db.execute(text(
+        "SELECT last_rating_seq, rewrite_version, last_ott_seq, platform_version "
+        "FROM aggregate_watermark WHERE job_name = :job_name"
+    ), {"job_name": JOB_NAME}).first()
+    db.commit()
+    return marks, watermark
+
+def can_update_incrementally(marks, watermark) -> bool:
+    """평점 수정/삭제나 플랫폼 구성 변경 없이 평점 추가 / 영화 OTT 변경만 있었는지 확인합니다."""
+    return watermark is not None \
+        and watermark.rewrite_version == marks.rewrite_version \
+        and watermark.platform_version == marks.platform_version \
+        and marks.rating_seq >= watermark.last_rating_seq \
+        and marks.ott_seq >= watermark.last_ott_seq
+
+def build_ml_user_recommendations(workers: int = os.cpu_count() or 1, full: bool = False, chunk_size: int = 1000):
+    """
+    MovieLens 사용자별 OTT 추천 결과를 ml_user_recommendation 테이블에 미리 계산해 둡니다.
+    - rating / movie_ott 데이터 버전이 저장된 결과와 모두 같으면 아무것도 하지 않습니다. (full=True면 항상 실행)
+    - 지난 실행 이후 평점이 추가된 사용자와, OTT 정보가 바뀐 영화에 높은 평점을 준 사용자만 다시 계산합니다.
+      (aggregate_watermark의 rating_seq / movie.ott_seq 워터마크 기준)
+    - 평점이 수정/삭제되었거나('rating_rewrite'), 플랫폼 구성이 바뀌었거나('ott_platform'), 워터마크가 없으면
+      모든 사용자를 다시 계산합니다.
+    - 사용자를 워커 프로세스에 나눠 계산하고, 내용이 바뀐 행만 다시 씁니다.
+    """
+    print("--- 📦 MovieLens 사용자별 OTT 추천 사전 계산 시작 ---")
+    db = SessionLocal()
+    try:
+        total_start = time.perf_counter()
+        rating_version = crud.get_data_version(db, "rating")
+        ott_version = crud.get_data_version(db, "movie_ott")
+
+        stale = crud.count_stale_ml_user_recommendations(db, rating_version, ott_version)
+        if not full and stale == 0:
+            print(f"☑️ 추천 결과가 이미 최신입니다. (rating 버전 {rating_version}, movie_ott 버전 {ott_version})")
+            return
+        print(f"🔄 데이터 버전이 지난 추천 결과 {stale}건 (rating 버전 {rating_version}, movie_ott 버전 {ott_version})")
+
+        # 1. 다시 계산할 사용자 결정 및 입력 데이터 로드
+        start = time.perf_counter()
+        marks, watermark = read_marks(db)
+        if not full and can_update_incrementally(marks, watermark):
+            ml_user_ids = crud.get_changed_recommendation_users(
+                db, watermark.last_rating_seq, marks.rating_seq, watermark.last_ott_seq, marks.ott_seq,
+                HIGH_RATING_THRESHOLD,
+            )
+            pairs = crud.get_high_ratings(db, HIGH_RATING_THRESHOLD, ml_user_ids) if ml_user_ids else []
+            print(f"🔎 증분 갱신: rating_seq {watermark.last_rating_seq} → {marks.rating_seq}, "
+                  f"ott_seq {watermark.last_ott_seq} → {marks.ott_seq}")
+        else:
+            ml_user_ids = [user.ml_user_id for user in crud.get_all_ml_users(db)]
+            pairs = crud.get_high_ratings(db, HIGH_RATING_THRESHOLD)
+            print("🔎 전체 재계산 (워터마크 없음, 평점 수정/삭제, 플랫폼 구성 변경 또는 --full)")
+        matrix = OttMatrix.build(db, ott_version)
+        users = group_ratings_by_user(ml_user_ids, pairs)
+        titles = crud.get_movie_titles_by_ids(db, matrix.movie_ids.tolist())
+        print(f"✅ 데이터 로드 완료: 계산 대상 사용자 {len(users)}명, OTT 제공 영화 {len(matrix.movie_ids)}편 "
+              f"({time.perf_counter() - start:.2f}초)")
+
+        # 2. 사용자별 추천 계산 (병렬)
+        start = time.perf_counter()
+        matrix_arrays = (matrix.movie_ids, matrix.masks, matrix.ott_bits, matrix.ott_names, matrix.version)
+        shards = [users[i:i + chunk_size] for i in range(0, len(users), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(matrix_arrays, titles)) as pool:
+            rows = [row for shard_rows in pool.map(_recommend_shard, shards) for row in shard_rows]
+        compute_sec = time.perf_counter() - start
+        print(f"✅ 추천 계산 완료: {len(rows)}명 ({compute_sec:.2f}초, 워커 {workers}개)")
+
+        # 3. 저장 (내용이 바뀐 행만 쓰고, 다시 계산하지 않은 사용자는 결과가 그대로이므로 버전만 일괄 갱신)
+        start = time.perf_counter()
+        for i in range(0, len(rows), chunk_size):
+            chunk = [dict(row, rating_version=rating_version, ott_version=ott_version) for row in rows[i:i + chunk_size]]
+            crud.upsert_ml_user_recommendations(db, chunk, only_changed=not full)
+        crud.stamp_ml_user_recommendations(db, rating_version, ott_version)
+        db.execute(text(UPSERT_WATERMARK_SQL), {
+            "job_name": JOB_NAME, "rating_seq": marks.rating_seq, "rewrite_version": marks.rewrite_version,
+            "ott_seq": marks.ott_seq, "platform_version": marks.platform_version,
+        })
+        db.commit()
+        print(f"✅ 저장 완료 ({time.perf_counter() - start:.2f}초)")
+
+        print(f"\n🎉 총 소요 시간: {time.perf_counter() - total_start:.2f}초")
+    except Exception as e:
+        print(f"\n🚨 오류가 발생했습니다: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MovieLens 사용자별 OTT 추천 결과 사전 계산")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="워커 프로세스 수")
+    parser.add_argument("--full", action="store_true", help="버전이 같아도 모든 사용자의 결과를 다시 씁니다.")
+    args = parser.parse_args()
+    build_ml_user_recommendations(workers=args.workers, full=args.full)
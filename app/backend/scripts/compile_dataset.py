@@ -0,0 +1,18 @@
+# app/backend/scripts/compile_dataset.py
+import argparse
+import os
+import sys
+
+# --- 경로 추가 (backend 패키지를 import 하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.core.rating_dataset import DATASET_DIR, compile_dataset
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ratings.csv → 메모리 맵 평점 데이터셋(.npy 열 배열) 생성")
+    parser.add_argument("--csv", default=os.path.join(app_root, "backend", "data", "ratings.csv"), help="원본 ratings.csv 경로")
+    parser.add_argument("--out", default=DATASET_DIR, help="데이터셋을 저장할 디렉터리")
+    args = parser.parse_args()
+    compile_dataset(args.csv, args.out)
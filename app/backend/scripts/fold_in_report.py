@@ -0,0 +1,104 @@
+# app/backend/scripts/fold_in_report.py
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# --- 경로 추가 (backend 패키지를 import 하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.core.ncf_inference import NCF_MODEL_PATH, NCFPredictor
+from backend.core.rating_dataset import DATASET_DIR, open_dataset
+from backend.core.recommender import HIGH_RATING_THRESHOLD
+
+class ProxyMatcher:
+    """평점 데이터셋의 영화 → 사용자 역색인으로, 선택한 영화 집합과 자카드 유사도가 가장 높은 사용자를 찾습니다."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        order = np.argsort(dataset.movie_idx, kind="stable")
+        self.raters = np.asarray(dataset.user_idx)[order]
+        self.movie_indptr = np.zeros(dataset.n_movies + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dataset.movie_idx, minlength=dataset.n_movies), out=self.movie_indptr[1:])
+        self.user_sizes = np.diff(np.asarray(dataset.user_indptr))
+
+    def best_match(self, movie_idx, exclude_user: int) -> int:
+        raters = np.concatenate([self.raters[self.movie_indptr[m]:self.movie_indptr[m + 1]] for m in movie_idx])
+        overlap = np.bincount(raters, minlength=self.dataset.n_users).astype(np.float64)
+        similarity = overlap / (self.user_sizes + len(movie_idx) - overlap)
+        similarity[exclude_user] = -1.0
+        return int(np.argmax(similarity))
+
+def top_k(scores: np.ndarray, exclude, k: int) -> np.ndarray:
+    scores = scores.astype(np.float64, copy=True)
+    scores[exclude] = -np.inf
+    k = min(k, len(scores))
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+def recall(ranked, held_out: set, k: int) -> float:
+    return len(set(ranked[:k].tolist()) & held_out) / min(k, len(held_out))
+
+def run_report(model_path: str, n_users: int, picks: int, k: int, steps: int, seed: int):
+    """
+    MovieLens 사용자의 고평점 영화 중 picks편을 '설문 선택'으로 보고, 나머지 고평점 영화를 맞히는 정도(recall@k)를
+    fold-in과 기존 대리 사용자 경로(자카드 매칭 → 대리 사용자의 고평점 영화)로 비교합니다.
+    주의: 평가 사용자의 평점도 모델 학습(영화 임베딩)에 쓰였으므로 fold-in 수치는 다소 낙관적입니다.
+    """
+    predictor = NCFPredictor.load(model_path)
+    dataset = open_dataset(DATASET_DIR)
+    if not np.array_equal(predictor.movie_ids, dataset.movie_ids):
+        raise ValueError("모델의 영화 ID 매핑이 평점 데이터셋과 다릅니다.")
+    predictor.movie_hidden()
+    matcher = ProxyMatcher(dataset)
+    print(f"✅ 모델/데이터셋 로드: 사용자 {dataset.n_users}명, 영화 {dataset.n_movies}편")
+
+    rng = np.random.default_rng(seed)
+    results = {"fold-in": [], "대리 사용자 평점": [], "대리 사용자 NCF": []}
+    fold_in_ms, proxy_ms = [], []
+    for user in rng.permutation(dataset.n_users):
+        if len(fold_in_ms) >= n_users:
+            break
+        movies, ratings = dataset.user_ratings(user)
+        liked = np.asarray(movies)[np.asarray(ratings) >= HIGH_RATING_THRESHOLD]
+        if len(liked) < picks + 5:
+            continue
+        liked = rng.permutation(liked)
+        chosen, held_out = liked[:picks], set(liked[picks:].tolist())
+
+        start = time.perf_counter()
+        scores = predictor.predict_embedding(predictor.fold_in(chosen, steps=steps))
+        ranked = top_k(scores, chosen, k)
+        fold_in_ms.append((time.perf_counter() - start) * 1000)
+        results["fold-in"].append(recall(ranked, held_out, k))
+
+        start = time.perf_counter()
+        proxy = matcher.best_match(chosen, exclude_user=user)
+        proxy_ms.append((time.perf_counter() - start) * 1000)
+        proxy_movies, proxy_ratings = dataset.user_ratings(proxy)
+        proxy_scores = np.full(dataset.n_movies, -np.inf)
+        proxy_scores[proxy_movies] = np.where(np.asarray(proxy_ratings) >= HIGH_RATING_THRESHOLD, proxy_ratings, -np.inf)
+        results["대리 사용자 평점"].append(recall(top_k(proxy_scores, chosen, k), held_out, k))
+        results["대리 사용자 NCF"].append(recall(top_k(predictor.predict_user(proxy), chosen, k), held_out, k))
+
+    print(f"\n📊 평가 사용자 {len(fold_in_ms)}명, 선택 영화 {picks}편, recall@{k}")
+    for name, values in results.items():
+        print(f"   {name:<12}: {np.mean(values):.4f}")
+    print(f"⏱️ fold-in ({steps}스텝 + 전체 영화 예측): p50 {np.percentile(fold_in_ms, 50):.1f}ms, "
+          f"p95 {np.percentile(fold_in_ms, 95):.1f}ms")
+    print(f"⏱️ 대리 사용자 매칭: p50 {np.percentile(proxy_ms, 50):.1f}ms, p95 {np.percentile(proxy_ms, 95):.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="신규 사용자 fold-in vs 대리 사용자 매칭 추천 품질/지연 시간 리포트")
+    parser.add_argument("--model", default=NCF_MODEL_PATH, help="export_ncf.py로 내보낸 .npz 경로")
+    parser.add_argument("--users", type=int, default=300, help="평가할 사용자 수")
+    parser.add_argument("--picks", type=int, default=10, help="사용자당 선택 영화 수 (설문 선택 수와 비슷하게)")
+    parser.add_argument("--k", type=int, default=50, help="recall@k의 k")
+    parser.add_argument("--steps", type=int, default=50, help="fold-in 최적화 스텝 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run_report(args.model, args.users, args.picks, args.k, args.steps, args.seed)
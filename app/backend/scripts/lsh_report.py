@@ -0,0 +1,41 @@
+# app/backend/scripts/lsh_report.py
+import argparse
+import os
+import sys
+
+# --- 경로 추가 (backend 패키지를 import 하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.db.database import SessionLocal
+from backend.db import crud
+from backend.core.matching_index import MatchingIndex
+from backend.core.minhash_lsh import recall_latency_report
+
+def parse_configs(value: str):
+    """'128x1,64x2' 형식의 문자열을 [(128, 1), (64, 2)]로 변환합니다."""
+    configs = []
+    for item in value.split(","):
+        bands, rows = item.lower().split("x")
+        configs.append((int(bands), int(rows)))
+    return configs
+
+def run_report(configs, n_queries: int, picks: int):
+    """DB에서 매칭 인덱스를 만든 뒤, 정확한 매칭 대비 LSH의 recall@1/지연 시간을 출력합니다."""
+    db = SessionLocal()
+    try:
+        index = MatchingIndex.build(db, crud.get_data_version(db, "rating"))
+    finally:
+        db.close()
+    print(f"✅ 매칭 인덱스: 사용자 {index.matrix.shape[0]}명 × 영화 {index.matrix.shape[1]}편")
+    recall_latency_report(index, configs, n_queries=n_queries, picks=picks)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MinHash-LSH recall@1 / 지연 시간 리포트")
+    parser.add_argument("--configs", type=parse_configs, default=parse_configs("128x1,64x1,64x2,32x2"),
+                        help="비교할 bands x rows 조합 (예: 128x1,64x2)")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수")
+    parser.add_argument("--picks", type=int, default=10, help="질의당 선택 영화 수 (설문 선택 수와 비슷하게)")
+    args = parser.parse_args()
+    run_report(args.configs, args.queries, args.picks)
@@ -0,0 +1,138 @@
+# app/backend/scripts/match_pending_users.py
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# --- 경로 추가 (backend 패키지를 import 하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.db.database import SessionLocal
+from backend.db import crud
+from backend.core.matching_index import MatchingIndex
+from backend.core.user_matching import match_conditions
+from backend.core.movie_titles import resolve_pref_movie_ids
+
+# --- 공유 메모리 관리 ---
+def share_arrays(arrays: dict):
+    """배열들을 공유 메모리 블록으로 복사하고, (블록 목록, 워커에 넘길 명세)를 반환합니다."""
+    blocks, spec = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        spec[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, spec
+
+# --- 워커 프로세스 ---
+_worker_index = None
+_worker_blocks = []
+
+def _init_worker(spec: dict, version: int):
+    """공유 메모리의 배열로 워커 전용 매칭 인덱스를 복사 없이 구성합니다."""
+    global _worker_index
+    arrays = {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    _worker_index = MatchingIndex.from_exported(arrays, version)
+
+def _match_shard(users: list[tuple]):
+    """
+    (user_id, 성별, 나이, 선호 영화 ID 목록) 목록을 매칭합니다.
+    반환값: [(user_id, ml_user_id 또는 None, 유사도, 겹치는 영화 ID 목록), ...]
+    """
+    results = []
+    for user_id, gender, age, movie_ids in users:
+        gender_to_match, age_min, age_max = match_conditions(gender, age)
+        lo, hi = _worker_index.candidate_range(gender_to_match, age_min, age_max)
+        movie_ids = set(movie_ids)
+        ml_user_id, similarity = _worker_index.best_match(lo, hi, movie_ids) if hi > lo else (None, 0)
+        overlap = _worker_index.overlap_movie_ids(ml_user_id, movie_ids) if ml_user_id is not None else []
+        results.append((user_id, ml_user_id, similarity, overlap))
+    return results
+
+# --- 메인 프로세스 ---
+def match_pending_users(workers: int = os.cpu_count() or 1, chunk_size: int = 2000):
+    """
+    similarity 결과가 없는 신규 사용자를 한 번에 매칭합니다.
+    - 매칭 인덱스는 한 번만 만들어 공유 메모리에 올리고, 사용자를 워커 프로세스에 나눠 계산합니다.
+    - chunk_size명마다 결과를 similarity 테이블에 한 번에 저장(commit)하므로,
+      중간에 중단되어도 다시 실행하면 남은 사용자부터 이어서 처리합니다.
+    - 매칭 후보가 없는 사용자도 ml_user_id를 비운 결과로 저장해 다시 선택되지 않게 합니다.
+    """
+    print("--- 👥 대기 중인 신규 사용자 일괄 매칭 시작 ---")
+    db = SessionLocal()
+    blocks = []
+    try:
+        start = time.perf_counter()
+        version = crud.get_data_version(db, "rating")
+        index = MatchingIndex.build(db, version)
+        print(f"✅ 매칭 인덱스 생성 완료: 사용자 {index.matrix.shape[0]}명 × 영화 {index.matrix.shape[1]}편 "
+              f"({time.perf_counter() - start:.2f}초)")
+
+        blocks, spec = share_arrays(index.export_arrays())
+        total_matched, total_start = 0, time.perf_counter()
+        last_user_id = None
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec, version)) as pool:
+            while True:
+                pending = crud.get_pending_users(db, after_user_id=last_user_id, limit=chunk_size)
+                if not pending:
+                    break
+                last_user_id = pending[-1].user_id
+                chunk_start = time.perf_counter()
+
+                users = [
+                    (str(user.user_id), user.gender, user.age, resolve_pref_movie_ids(db, user))
+                    for user in pending
+                ]
+                shards = [users[i::workers] for i in range(workers) if users[i::workers]]
+                results = [r for shard_result in pool.map(_match_shard, shards) for r in shard_result]
+
+                # 겹치는 영화 ID → 제목 변환은 청크당 한 번의 IN 쿼리로 처리합니다.
+                id_to_title = crud.get_movie_titles_by_ids(db, {m for result in results for m in result[3]})
+                rows = []
+                for user_id, ml_user_id, similarity, overlap in results:
+                    rows.append({
+                        "user_id": user_id,
+                        "ml_user_id": ml_user_id,
+                        "overlapped_movies": [id_to_title[m] for m in overlap if m in id_to_title],
+                        "similarity_score": float(similarity),
+                        "rating_version": version,
+                    })
+                crud.bulk_create_similarities(db, rows)
+
+                total_matched += len(results)
+                elapsed = time.perf_counter() - chunk_start
+                print(f"🚀 {len(results)}명 매칭 및 저장 완료 ({len(results) / elapsed:.1f}명/초, 누적 {total_matched}명)")
+
+        total_elapsed = time.perf_counter() - total_start
+        if total_matched:
+            print(f"\n🎉 총 {total_matched}명 매칭 완료: {total_elapsed:.2f}초 ({total_matched / total_elapsed:.1f}명/초)")
+        else:
+            print("☑️ 매칭할 신규 사용자가 없습니다.")
+    except Exception as e:
+        print(f"\n🚨 오류가 발생했습니다: {e}")
+        print("다시 실행하면 저장되지 않은 사용자부터 이어서 처리합니다.")
+        db.rollback()
+    finally:
+        db.close()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="similarity 결과가 없는 신규 사용자 일괄 매칭")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="워커 프로세스 수")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="한 번에 매칭/저장할 사용자 수")
+    args = parser.parse_args()
+    match_pending_users(workers=args.workers, chunk_size=args.chunk_size)
@@ -0,0 +1,64 @@
+# app/backend/scripts/stub_search_server.py
+import argparse
+import hashlib
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PLATFORMS = ["Netflix", "Disney+", "Tving", "Wavve", "Coupang Play", "Watcha"]
+
+
+def stub_platforms(query):
+    """쿼리 문자열의 해시로 항상 같은 OTT 목록을 정합니다. (크롤러 결과 검증용)"""
+    digest = hashlib.sha256(query.encode("utf-8")).digest()
+    return [p for i, p in enumerate(PLATFORMS) if digest[i] & 1]
+
+
+def make_handler(fail_rate, latency_ms, fail_statuses=(429, 503)):
+    class StubSearchHandler(BaseHTTPRequestHandler):
+        """Google Custom Search API 흉내: /customsearch/v1?q=... 에 JustWatch 검색 결과 형태로 응답합니다."""
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            if random.random() < fail_rate:
+                status = random.choice(fail_statuses)
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                return
+
+            query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+            body = json.dumps({
+                "items": [{"title": query, "snippet": f"Watch on {p}"} for p in stub_platforms(query)]
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubSearchHandler
+
+
+def serve(host="127.0.0.1", port=8765, fail_rate=0.1, latency_ms=50, fail_statuses=(429, 503)):
+    server = ThreadingHTTPServer((host, port), make_handler(fail_rate, latency_ms, fail_statuses))
+    print(f"🧪 검색 API stub 서버 시작: http://{host}:{server.server_port}/customsearch/v1 "
+          f"(실패율 {fail_rate:.0%}, 지연 {latency_ms}ms)")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OTT 크롤러 로컬 테스트용 검색 API stub 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="429/503으로 응답할 확률")
+    parser.add_argument("--latency-ms", type=int, default=50, help="응답 지연(ms)")
+    parser.add_argument("--fail-status", type=int, nargs="+", default=[429, 503], help="실패 시 응답할 HTTP 상태 코드")
+    args = parser.parse_args()
+    serve(port=args.port, fail_rate=args.fail_rate, latency_ms=args.latency_ms,
+          fail_statuses=args.fail_status).serve_forever()
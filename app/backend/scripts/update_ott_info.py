@@ -1,8 +1,12 @@
 import sys
 import os
+import json
+import time
+import socket
+from datetime import datetime
+import argparse
 import asyncio
 from dotenv import load_dotenv
-from time import sleep
 
 # --- 경로 설정 ---
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
@@ -15,106 +19,388 @@ load_dotenv(dotenv_path=os.path.join(project_root, "app", "env", ".env"))
 # --- 내부 모듈 import ---
 from app.backend.db.database import SessionLocal
 from app.backend.db import crud
-from app.backend.services.ott_search import OTTSearcher
+from app.backend.db.ott_mask import encode_ott_mask
+from app.backend.services.ott_search import GOOGLE_CSE_URL, OTTSearchError, build_search_query, parse_ott_availability
+from app.backend.services.async_ott_search import AsyncOTTSearcher
+from app.backend.services.search_cache import CACHE_PATH, SearchCache
+from app.backend.scripts.register_otts import OTT_PLATFORMS
+
+TARGET_OTT = OTT_PLATFORMS
+CHECKPOINT_PATH = os.path.join(project_root, "app", "backend", "data", "ott_update_checkpoint.json")
 
 
 class OTTUpdater:
-    def __init__(self, api_key, cse_id, target_ott, concurrency=5, timeout=15, batch_size=30, pause_sec=3):
-        self.searcher = OTTSearcher(api_key=api_key, cse_id=cse_id)
+    """
+    작업 큐 + 워커 방식의 OTT 정보 크롤러.
+    - 미검색 영화를 movie_id 키셋 페이지 단위로 DB에서 임대(FOR UPDATE SKIP LOCKED + 임대 만료 시각)해 가져오므로,
+      여러 프로세스가 작업을 나눠 처리할 수 있고 메모리 사용량은 페이지 크기만큼으로 일정합니다.
+    - 페이지 안에서 제목을 정규화한 검색 쿼리 단위로 묶어, 같은 쿼리는 한 번만 요청하고 결과를 해당 영화 모두에 저장합니다.
+    - 검색 API 원본 응답은 SearchCache(SQLite)에 저장하며, TTL 안의 응답은 다시 요청하지 않습니다.
+    - 검색 실패는 네거티브 캐시로 따로 기록하고 DB에는 저장하지 않습니다. (다음 실행에서 다시 시도)
+    - 요청 속도는 토큰 버킷(rate_per_sec), 동시 요청 수는 AIMD(429/5xx 시 절반으로 감소)로 조절합니다.
+    - DB 저장은 단일 writer가 맡습니다(write-behind). 워커는 결과를 쓰기 큐에 넣기만 하고, writer가
+      flush_size건 또는 flush_interval_ms마다 한 번의 UPDATE ... FROM (VALUES ...)로 모아서 커밋합니다.
+      비정상 종료 시 잃는 결과는 아직 flush되지 않은 한 배치 이하이며, 해당 영화는 다음 실행에서 다시 처리됩니다.
+    - dry_run=True이면 DB에 쓰지 않고 검색 결과만 출력합니다.
+    """
+
+    def __init__(self, api_key, cse_id, target_ott, base_url=GOOGLE_CSE_URL, rate_per_sec=5.0,
+                 initial_concurrency=4, max_concurrency=16, timeout=15, dry_run=False, cache_path=CACHE_PATH,
+                 flush_size=200, flush_interval_ms=1000, checkpoint_path=CHECKPOINT_PATH,
+                 page_size=500, lease_sec=600):
+        self.api_key = api_key
+        self.cse_id = cse_id
         self.target_ott = target_ott
-        self.sem = asyncio.Semaphore(concurrency)
+        self.base_url = base_url
+        self.rate_per_sec = rate_per_sec
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
         self.timeout = timeout
-        self.batch_size = batch_size
-        self.pause_sec = pause_sec
+        self.dry_run = dry_run
+        self.cache_path = cache_path
+        self.flush_size = flush_size
+        self.flush_interval_ms = flush_interval_ms
+        self.checkpoint_path = checkpoint_path
+        self.page_size = page_size
+        self.lease_sec = lease_sec
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
         self.ott_name_map = {}
+        self.ott_bit_map = {}
+        self.stats = {"updated": 0, "failed": 0, "cache_hit": 0, "negative_hit": 0, "stale_used": 0, "fetched": 0}
+        self.flush_stats = {"flushes": 0, "rows": 0, "max_rows": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    def load_ott_map(self, ott_rows=None):
+        """
+        OTT 이름 → UUID / 비트 위치 매핑을 준비합니다. ott_rows(ott_name, ott_id, bit_position을 가진 행)를 주면
+        DB 대신 그 목록을 사용합니다. (DB 없이 movies를 넘겨 실행할 때)
+        """
+        if ott_rows is None:
+            db = SessionLocal()
+            try:
+                ott_rows = crud.get_all_ott_platforms(db)
+            finally:
+                db.close()
+        self.ott_name_map = {row.ott_name: str(row.ott_id) for row in ott_rows}
+        self.ott_bit_map = {row.ott_name: row.bit_position for row in ott_rows if row.bit_position is not None}
 
-    def load_ott_map(self):
+    def claim_page(self, after_movie_id):
+        """movie_id가 after_movie_id보다 큰 미검색 영화 한 페이지를 임대합니다. (dry_run이면 조회만 합니다.)"""
         db = SessionLocal()
         try:
-            ott_rows = crud.get_all_ott_platforms(db)
-            self.ott_name_map = {row.ott_name: str(row.ott_id) for row in ott_rows}
+            if self.dry_run:
+                return [tuple(row) for row in crud.get_pending_ott_movies(db, after_movie_id, self.page_size)]
+            rows = crud.claim_pending_ott_movies(db, self.owner, after_movie_id, self.page_size, self.lease_sec)
+            db.commit()
+            return [tuple(row) for row in rows]
         finally:
             db.close()
 
-    async def timeout_wrapper(self, coro):
+    def release_leases(self):
+        db = SessionLocal()
         try:
-            return await asyncio.wait_for(coro, timeout=self.timeout)
-        except asyncio.TimeoutError:
-            return f"⏱️ Timeout after {self.timeout}s"
+            released = crud.release_ott_leases(db, self.owner)
+            db.commit()
+            if released:
+                print(f"🔓 저장하지 못한 영화 {released}편의 작업 임대를 해제했습니다.")
+        finally:
+            db.close()
 
-    async def update_single_movie(self, movie):
-        async with self.sem:
-            db = SessionLocal()
-            try:
-                if movie.ott_list:
-                    return  # 이미 저장된 경우 skip
+    async def produce(self, queue, movies=None):
+        """
+        미검색 영화를 페이지 단위로 가져와 검색 쿼리별로 작업 큐에 넣고, 넣은 (영화 수, 쿼리 수)를 반환합니다.
+        작업 큐의 크기가 제한되어 있으므로 워커가 따라잡을 때까지 다음 페이지를 가져오지 않습니다.
+        movies를 주면 DB 대신 해당 (movie_id, title) 목록을 페이지로 나눠 사용합니다.
+        """
+        total_movies, total_queries, after_movie_id = 0, 0, 0
+        while True:
+            if movies is None:
+                page = await asyncio.to_thread(self.claim_page, after_movie_id)
+            else:
+                page = movies[total_movies:total_movies + self.page_size]
+            if not page:
+                break
+            after_movie_id = page[-1][0]
+            total_movies += len(page)
+            groups = self.group_by_query(page)
+            total_queries += len(groups)
+            print(f"📥 영화 {len(page)}편 (검색 쿼리 {len(groups)}개) 가져옴, movie_id ~{after_movie_id}")
+            for item in groups.items():
+                await queue.put(item)
+        return total_movies, total_queries
+
+    @staticmethod
+    def group_by_query(movies):
+        """(movie_id, title) 목록을 정규화된 검색 쿼리별로 묶습니다."""
+        groups = {}
+        for movie_id, title in movies:
+            groups.setdefault(build_search_query(title), []).append((movie_id, title))
+        return groups
+
+    def encode_result(self, result):
+        """{OTT 이름: 제공 여부}를 DB에 저장할 ({OTT UUID: 제공 여부}, ott_mask)로 변환합니다."""
+        uuid_result = {
+            self.ott_name_map[ott]: val
+            for ott, val in result.items()
+            if ott in self.ott_name_map
+        }
+        return uuid_result, encode_ott_mask(result, self.ott_bit_map)
+
+    def write_batch(self, rows):
+        """[(movie_id, ott_list, ott_mask)]를 한 트랜잭션으로 저장합니다."""
+        if self.dry_run:
+            return len(rows)
+        db = SessionLocal()
+        try:
+            updated = crud.bulk_update_movie_ott(db, rows)
+            db.commit()
+            return updated
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
 
-                print(f"🔍 '{movie.title}' 검색 중...")
-                result = await self.timeout_wrapper(
-                    asyncio.to_thread(self.searcher.find, movie.title, self.target_ott)
-                )
+    def save_checkpoint(self, last_movie_ids):
+        checkpoint = {
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "flushes": self.flush_stats["flushes"],
+            "flushed_movies": self.flush_stats["rows"],
+            "last_flushed_movie_ids": last_movie_ids,
+        }
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
 
-                if isinstance(result, str):
-                    print(f"🚨 타임아웃 - {movie.title}: {result}")
-                    return
+    def flush(self, rows):
+        """쓰기 배치 [(movie_id, ott_list, ott_mask)] 하나를 저장하고 크기/지연 시간을 기록합니다."""
+        start = time.perf_counter()
+        try:
+            self.write_batch(rows)
+        except Exception as e:
+            self.stats["failed"] += len(rows)
+            print(f"🚨 저장 실패 ({len(rows)}편, 다음 실행에서 다시 처리) - {type(e).__name__}: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
 
-                uuid_result = {
-                    self.ott_name_map[ott]: val
-                    for ott, val in result.items()
-                    if ott in self.ott_name_map
-                }
+        self.stats["updated"] += len(rows)
+        fs = self.flush_stats
+        fs["flushes"] += 1
+        fs["rows"] += len(rows)
+        fs["max_rows"] = max(fs["max_rows"], len(rows))
+        fs["total_ms"] += elapsed_ms
+        fs["max_ms"] = max(fs["max_ms"], elapsed_ms)
+        self.save_checkpoint([row[0] for row in rows])
+        print(f"💾 {len(rows)}편 저장 ({elapsed_ms:.1f}ms, 누적 {fs['rows']}편)")
 
-                await asyncio.to_thread(crud.update_movie_ott_list, db, movie.movie_id, uuid_result)
-                print(f"✅ 완료: {movie.title} → {uuid_result}")
+    async def writer(self, write_queue):
+        """쓰기 큐를 flush_size건 또는 flush_interval_ms마다 비웁니다. None을 받으면 남은 배치를 저장하고 끝납니다."""
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            item = await write_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval_ms / 1000
+            while len(batch) < self.flush_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(write_queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            await asyncio.to_thread(self.flush, batch)
 
+    async def save_group(self, movies, response, ott_names, write_queue):
+        uuid_result, ott_mask = self.encode_result(parse_ott_availability(response, ott_names))
+        for movie_id, title in movies:
+            await write_queue.put((movie_id, uuid_result, ott_mask))
+            print(f"✅ 완료: {title} → {uuid_result} (mask={ott_mask:#b})")
+
+    async def fetch_response(self, searcher, cache, query):
+        """캐시 → 검색 API 순서로 쿼리의 원본 응답을 가져옵니다. 쓸 수 있는 응답이 없으면 None."""
+        entry = cache.get(query)
+        if entry is not None:
+            if entry.ok:
+                self.stats["cache_hit"] += 1
+                return entry.response
+            self.stats["negative_hit"] += 1
+            print(f"⏭️ 최근 실패한 쿼리라 건너뜁니다: '{query}' ({entry.error})")
+            return None
+
+        try:
+            response = await asyncio.wait_for(searcher.search(query), timeout=self.timeout * 4)
+            cache.put_response(query, response)
+            self.stats["fetched"] += 1
+            return response
+        except (OTTSearchError, asyncio.TimeoutError) as e:
+            error = str(e) or "전체 재시도 시간 초과"
+            cache.put_error(query, error, getattr(e, "status_code", None))
+            print(f"🚨 검색 실패 (다음 실행에서 다시 시도) - '{query}': {error}")
+
+        # TTL이 지난 정상 응답이라도 남아 있으면 실패 대신 사용합니다.
+        stale = cache.get(query, include_expired=True)
+        if stale is not None and stale.ok:
+            self.stats["stale_used"] += 1
+            return stale.response
+        return None
+
+    async def worker(self, searcher, cache, queue, write_queue):
+        while True:
+            query, movies = await queue.get()
+            try:
+                response = await self.fetch_response(searcher, cache, query)
+                if response is None:
+                    self.stats["failed"] += len(movies)
+                else:
+                    await self.save_group(movies, response, self.target_ott, write_queue)
             except Exception as e:
-                print(f"🚨 기타 오류 - {movie.title}: {type(e).__name__} - {e}")
+                self.stats["failed"] += len(movies)
+                print(f"🚨 기타 오류 - '{query}': {type(e).__name__} - {e}")
             finally:
-                db.close()
+                queue.task_done()
 
-    async def run(self):
-        print("🎬 병렬 OTT 정보 업데이트 시작")
-        self.load_ott_map()
+    async def run(self, movies=None):
+        """
+        미검색 영화의 OTT 정보를 검색해 저장합니다.
+        movies를 주면 DB 대신 해당 (movie_id, title) 목록을 처리하며, 이때는 먼저 load_ott_map(ott_rows)로
+        플랫폼 매핑을 준비해야 합니다. (매핑 없이 저장하면 모든 영화가 빈 ott_list / ott_mask=0이 되므로 거부합니다.)
+        """
+        print(f"🎬 병렬 OTT 정보 업데이트 시작 (작업자 {self.owner})")
+        if movies is None:
+            self.load_ott_map()
+        if not self.ott_name_map or not self.ott_bit_map:
+            raise ValueError("OTT 플랫폼 매핑이 비어 있습니다. movies를 넘길 때는 먼저 load_ott_map()을 호출하세요.")
 
-        db = SessionLocal()
-        try:
-            movies = crud.get_all_movies(db)
-        finally:
-            db.close()
+        queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        write_queue = asyncio.Queue()
+        writer = asyncio.create_task(self.writer(write_queue))
 
-        filtered = [m for m in movies if not m.ott_list]
-        print(f"🎯 처리 대상 영화 수: {len(filtered)}")
+        start = time.perf_counter()
+        with SearchCache(self.cache_path) as cache:
+            async with AsyncOTTSearcher(
+                self.api_key, self.cse_id, base_url=self.base_url, rate_per_sec=self.rate_per_sec,
+                initial_concurrency=self.initial_concurrency, max_concurrency=self.max_concurrency,
+                timeout=self.timeout,
+            ) as searcher:
+                # 실제 동시 요청 수는 AIMD 한도가 정하므로, 워커는 최대 한도만큼 띄워 둡니다.
+                workers = [asyncio.create_task(self.worker(searcher, cache, queue, write_queue))
+                           for _ in range(self.max_concurrency)]
+                try:
+                    total_movies, total_queries = await self.produce(queue, movies)
+                    await queue.join()
+                finally:
+                    for w in workers:
+                        w.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+                    await write_queue.put(None)
+                    await writer
+                    if movies is None and not self.dry_run:
+                        await asyncio.to_thread(self.release_leases)
+                search_stats = searcher.stats
+                final_limit = searcher.concurrency.limit
 
-        for i in range(0, len(filtered), self.batch_size):
-            batch = filtered[i:i + self.batch_size]
-            print(f"🚀 [{i+1} ~ {i+len(batch)}]번 영화 처리 중...")
+        elapsed = time.perf_counter() - start
+        print(f"✅ 전체 완료: 대상 {total_movies}편 (검색 쿼리 {total_queries}개), "
+              f"성공 {self.stats['updated']}편, 실패 {self.stats['failed']}편, "
+              f"{elapsed:.1f}초 ({total_movies / elapsed if elapsed else 0:.2f}편/초)")
+        print(f"   캐시 적중 {self.stats['cache_hit']}건, 네거티브 캐시 {self.stats['negative_hit']}건, "
+              f"만료 응답 사용 {self.stats['stale_used']}건, 새로 검색 {self.stats['fetched']}건")
+        print(f"   요청 {search_stats['requests']}회, 재시도 {search_stats['retries']}회, "
+              f"과부하 응답 {search_stats['overloaded']}회, 최종 동시 요청 한도 {final_limit}")
+        self.print_flush_stats()
 
-            tasks = [self.update_single_movie(m) for m in batch]
-            await asyncio.gather(*tasks, return_exceptions=True)
+    def print_flush_stats(self):
+        fs = self.flush_stats
+        if fs["flushes"]:
+            print(f"   DB 저장 {fs['flushes']}회: 평균 {fs['rows'] / fs['flushes']:.1f}편 / "
+                  f"{fs['total_ms'] / fs['flushes']:.1f}ms, 최대 {fs['max_rows']}편 / {fs['max_ms']:.1f}ms")
 
-            if i + self.batch_size < len(filtered):
-                print(f"⏸️ {self.pause_sec}초 대기 중 (rate limit 회피)...")
-                await asyncio.sleep(self.pause_sec)
+    def replay(self, movies=None):
+        """
+        네트워크 요청 없이, 캐시된 원본 응답으로 모든 영화의 ott_list / ott_mask를 다시 계산합니다.
+        (register_otts.py로 플랫폼을 추가한 뒤 실행하면 새 플랫폼까지 반영됩니다.)
+        """
+        print("🔁 캐시된 검색 응답으로 OTT 정보 재계산 시작")
+        self.load_ott_map()
+        if movies is None:
+            db = SessionLocal()
+            try:
+                movies = [tuple(row) for row in crud.get_all_movie_titles(db)]
+            finally:
+                db.close()
+        ott_names = list(self.ott_name_map) or self.target_ott
+        print(f"🎯 대상 영화 수: {len(movies)}, 플랫폼: {ott_names}")
 
-        print("✅ 전체 완료")
+        batch, missing = [], 0
+        with SearchCache(self.cache_path) as cache:
+            for query, group in self.group_by_query(movies).items():
+                entry = cache.get(query, include_expired=True)
+                if entry is None or not entry.ok:
+                    missing += len(group)
+                    continue
+                uuid_result, ott_mask = self.encode_result(parse_ott_availability(entry.response, ott_names))
+                batch.extend((movie_id, uuid_result, ott_mask) for movie_id, _ in group)
+                if len(batch) >= self.flush_size:
+                    self.flush(batch)
+                    batch = []
+        if batch:
+            self.flush(batch)
+
+        print(f"✅ 재계산 완료: {self.stats['updated']}편 갱신, 캐시된 응답이 없는 영화 {missing}편 (네트워크 요청 0회)")
+        self.print_flush_stats()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="영화별 OTT 제공 정보 비동기 크롤러")
+    parser.add_argument("--base-url", default=GOOGLE_CSE_URL,
+                        help="검색 API 주소 (로컬 테스트 시 stub_search_server.py 주소)")
+    parser.add_argument("--rate", type=float, default=5.0, help="초당 최대 요청 수 (토큰 버킷)")
+    parser.add_argument("--initial-concurrency", type=int, default=4, help="시작 동시 요청 수")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="최대 동시 요청 수")
+    parser.add_argument("--timeout", type=float, default=15, help="단일 요청 최대 대기 시간(초)")
+    parser.add_argument("--dry-run", action="store_true", help="DB에 쓰지 않고 검색 결과만 출력합니다.")
+    parser.add_argument("--flush-size", type=int, default=200, help="한 번에 DB에 저장할 최대 영화 수")
+    parser.add_argument("--flush-interval-ms", type=int, default=1000, help="쓰기 배치를 모으는 최대 시간(ms)")
+    parser.add_argument("--page-size", type=int, default=500, help="DB에서 한 번에 임대할 영화 수")
+    parser.add_argument("--lease-sec", type=int, default=600, help="작업 임대 유지 시간(초)")
+    parser.add_argument("--cache-path", default=CACHE_PATH, help="검색 응답 캐시(SQLite) 파일 경로")
+    parser.add_argument("--replay", action="store_true",
+                        help="네트워크 요청 없이 캐시된 응답으로 전체 영화의 OTT 정보를 다시 계산합니다.")
+    args = parser.parse_args()
+
     api_key = os.getenv("GEMINI_API_KEY")
     cse_id = os.getenv("CSE_ID")
 
-    if not api_key or not cse_id:
+    if not args.replay and args.base_url == GOOGLE_CSE_URL and (not api_key or not cse_id):
         print("❌ API 키 또는 CSE ID 누락")
         sys.exit(1)
 
     updater = OTTUpdater(
         api_key=api_key,
         cse_id=cse_id,
-        target_ott=["Netflix", "Disney+", "Tving", "Wavve", "Coupang Play", "Watcha"],
-        concurrency=3,     # 병렬 요청 개수
-        timeout=15,        # 단일 요청 최대 대기 시간
-        batch_size=12,     # 30개 단위로 처리
-        pause_sec=2,       # 3초 휴식
+        target_ott=TARGET_OTT,
+        base_url=args.base_url,
+        rate_per_sec=args.rate,
+        initial_concurrency=args.initial_concurrency,
+        max_concurrency=args.max_concurrency,
+        timeout=args.timeout,
+        dry_run=args.dry_run,
+        cache_path=args.cache_path,
+        flush_size=args.flush_size,
+        flush_interval_ms=args.flush_interval_ms,
+        page_size=args.page_size,
+        lease_sec=args.lease_sec,
     )
 
-    asyncio.run(updater.run())
+    if args.replay:
+        updater.replay()
+    else:
+        asyncio.run(updater.run())
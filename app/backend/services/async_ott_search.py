@@ -0,0 +1,158 @@
+import asyncio
+import random
+import time
+
+import httpx
+
+from .ott_search import GOOGLE_CSE_URL, OTTSearchError, build_search_query, parse_ott_availability
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    초당 rate개의 토큰이 채워지는 토큰 버킷 (최대 capacity개까지 모아 둘 수 있음).
+    요청마다 토큰 하나를 쓰므로, 장기 평균 요청 속도가 rate(요청/초)를 넘지 않습니다.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class AIMDConcurrency:
+    """
+    AIMD(가산 증가 / 승산 감소) 방식의 동시 요청 수 제한.
+    - 성공: 현재 한도만큼 연속으로 성공하면 한도를 1 늘립니다. (왕복 한 번에 +1과 비슷한 효과)
+    - 과부하(429/5xx/타임아웃): 한도를 decrease배로 줄입니다. (최소 min_limit)
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=32, decrease=0.5):
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.in_flight = 0
+        self.successes = 0
+        self.condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    async def on_success(self):
+        async with self.condition:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+    async def on_overload(self):
+        async with self.condition:
+            self.limit = max(self.min_limit, int(self.limit * self.decrease))
+            self.successes = 0
+
+
+class AsyncOTTSearcher:
+    """
+    httpx.AsyncClient(연결 풀 재사용) 기반의 비동기 OTT 검색기.
+    모든 요청은 토큰 버킷(요청/초)과 AIMD 동시성 제한을 거치며, 429/5xx는 지수 백오프 후 재시도합니다.
+    """
+
+    def __init__(self, api_key, cse_id, base_url=GOOGLE_CSE_URL, rate_per_sec=5.0,
+                 initial_concurrency=4, max_concurrency=32, timeout=15, max_retries=3):
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate_per_sec)
+        self.concurrency = AIMDConcurrency(initial=initial_concurrency, max_limit=max_concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self.stats = {"requests": 0, "retries": 0, "overloaded": 0, "failed": 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def _get(self, params):
+        """토큰과 동시성 슬롯을 얻은 뒤 한 번의 HTTP 요청을 보냅니다."""
+        await self.bucket.acquire()
+        async with self.concurrency:
+            self.stats["requests"] += 1
+            return await self.client.get(self.base_url, params=params)
+
+    async def search(self, query):
+        """
+        검색 쿼리의 원본 응답(JSON)을 반환합니다.
+        429/5xx/타임아웃은 재시도하고, 끝내 실패하거나 재시도할 수 없는 오류면 OTTSearchError를 발생시킵니다.
+        """
+        params = {"q": query, "key": self.api_key, "cx": self.cse_id}
+        status_code = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._get(params)
+                status_code = response.status_code
+                if status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    await self.concurrency.on_success()
+                    return response.json()
+                retry_after = response.headers.get("Retry-After", "")
+                retry_after = float(retry_after) if retry_after.isdigit() else None
+                reason = f"HTTP {status_code}"
+            except httpx.TimeoutException:
+                retry_after, reason = None, "타임아웃"
+            except (httpx.HTTPError, ValueError) as e:
+                self.stats["failed"] += 1
+                raise OTTSearchError(f"요청 오류: {type(e).__name__} - {e}", status_code) from e
+
+            self.stats["overloaded"] += 1
+            await self.concurrency.on_overload()
+            if attempt == self.max_retries:
+                break
+            self.stats["retries"] += 1
+            delay = retry_after if retry_after is not None else min(30.0, 2 ** attempt) * (0.5 + random.random())
+            print(f"⏳ '{query}' {reason} → 동시 요청 한도 {self.concurrency.limit}, "
+                  f"{delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+        self.stats["failed"] += 1
+        raise OTTSearchError(f"재시도 {self.max_retries}회 후에도 실패 ({reason})", status_code)
+
+    async def find(self, movie_title, ott_names):
+        """플랫폼별 제공 여부를 반환합니다. 검색에 실패하면 None을 반환합니다."""
+        try:
+            return parse_ott_availability(await self.search(build_search_query(movie_title)), ott_names)
+        except OTTSearchError as e:
+            print(f"🚨 '{movie_title}' {e}")
+            return None
@@ -1,7 +1,37 @@
+import re
+import unicodedata
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
+
+
+class OTTSearchError(Exception):
+    """재시도 후에도 검색 API 응답을 받지 못했을 때 발생합니다. ("제공 안 함" 결과와 구분하기 위함)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def normalize_title(movie_title):
+    """유니코드 정규화(NFKC) + 소문자 + 공백 정리. 표기만 다른 제목은 같은 검색 쿼리를 쓰게 됩니다."""
+    title = unicodedata.normalize("NFKC", movie_title).casefold()
+    return re.sub(r"\s+", " ", title).strip()
+
+
+def build_search_query(movie_title):
+    """영화 제목으로 JustWatch 검색 쿼리를 만듭니다. (응답 캐시의 키로도 사용)"""
+    return f"{normalize_title(movie_title)} site:justwatch.com"
+
+
+def parse_ott_availability(data, ott_names):
+    """검색 API 응답(JSON)에 OTT 이름이 등장하는지로 플랫폼별 제공 여부를 판단합니다."""
+    result_string = str(data).lower()
+    return {platform: (platform.lower() in result_string) for platform in ott_names}
+
 
 class OTTSearcher:
     def __init__(self, api_key, cse_id):
@@ -21,23 +51,31 @@ class OTTSearcher:
         session.mount("https://", adapter)
         return session
 
-    def find(self, movie_title, ott_names):
+    def search(self, query):
+        """검색 쿼리의 원본 응답(JSON)을 반환합니다. 실패하면 OTTSearchError를 발생시킵니다."""
         try:
-            query = f"{movie_title} site:justwatch.com"
             params = {
                 "q": query,
                 "key": self.api_key,
                 "cx": self.cse_id,
             }
-            response = self.session.get("https://www.googleapis.com/customsearch/v1", params=params, timeout=10)
+            response = self.session.get(GOOGLE_CSE_URL, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
-            result_string = str(data).lower()
-            return {platform: (platform.lower() in result_string) for platform in ott_names}
+            return response.json()
 
         except requests.exceptions.SSLError as e:
-            print(f"🚨 SSL 오류: {type(e).__name__} - {e}")
-            return {platform: False for platform in ott_names}
+            raise OTTSearchError(f"SSL 오류: {type(e).__name__} - {e}") from e
         except requests.exceptions.RequestException as e:
-            print(f"🚨 요청 오류: {type(e).__name__} - {e}")
-            return {platform: False for platform in ott_names}
+            status_code = e.response.status_code if e.response is not None else None
+            raise OTTSearchError(f"요청 오류: {type(e).__name__} - {e}", status_code) from e
+
+    def find(self, movie_title, ott_names):
+        """
+        플랫폼별 제공 여부를 반환합니다.
+        검색에 실패하면 모두 False 대신 None을 반환하므로, 호출하는 쪽에서 저장하지 않고 건너뛸 수 있습니다.
+        """
+        try:
+            return parse_ott_availability(self.search(build_search_query(movie_title)), ott_names)
+        except OTTSearchError as e:
+            print(f"🚨 {e}")
+            return None
@@ -0,0 +1,101 @@
+import json
+import os
+import sqlite3
+import time
+
+CACHE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ott_search_cache.sqlite3'))
+
+RESPONSE_TTL_SEC = 90 * 24 * 3600  # 정상 응답: 90일 (OTT 제공 정보는 자주 바뀌지 않음)
+ERROR_TTL_SEC = 3600               # 실패 기록(네거티브 캐시): 1시간 동안은 같은 쿼리를 다시 요청하지 않음
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    query       TEXT PRIMARY KEY,  -- 정규화된 검색 쿼리 (build_search_query 결과)
+    status      TEXT NOT NULL,     -- 'ok': 정상 응답 / 'error': 검색 실패
+    response    TEXT,              -- 'ok'일 때 검색 API 원본 응답 (JSON)
+    error       TEXT,              -- 'error'일 때 오류 메시지
+    status_code INTEGER,           -- 'error'일 때 HTTP 상태 코드 (없으면 NULL)
+    fetched_at  REAL NOT NULL      -- 저장 시각 (UNIX time)
+)
+"""
+
+
+class CacheEntry:
+    def __init__(self, query, status, response, error, status_code, fetched_at):
+        self.query = query
+        self.status = status
+        self.response = json.loads(response) if response is not None else None
+        self.error = error
+        self.status_code = status_code
+        self.fetched_at = fetched_at
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+
+class SearchCache:
+    """
+    검색 API 원본 응답을 정규화된 쿼리 단위로 저장하는 SQLite 캐시.
+    - 정상 응답과 실패(네거티브 캐시)를 status로 구분해, 실패가 "제공 안 함"으로 저장되지 않게 합니다.
+    - 원본 응답을 그대로 보관하므로, OTT 플랫폼이 추가되어도 네트워크 요청 없이 ott_list를 다시 계산할 수 있습니다.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl_sec=RESPONSE_TTL_SEC, error_ttl_sec=ERROR_TTL_SEC):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.error_ttl_sec = error_ttl_sec
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(CREATE_SQL)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, query, include_expired=False):
+        """
+        쿼리의 캐시 항목을 반환합니다. 없거나 TTL이 지났으면 None.
+        include_expired=True이면 TTL과 관계없이 저장된 항목을 반환합니다. (replay용)
+        """
+        row = self.conn.execute(
+            "SELECT query, status, response, error, status_code, fetched_at FROM search_cache WHERE query = ?",
+            (query,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = CacheEntry(*row)
+        ttl = self.ttl_sec if entry.ok else self.error_ttl_sec
+        if not include_expired and time.time() - entry.fetched_at > ttl:
+            return None
+        return entry
+
+    def put_response(self, query, response):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO search_cache (query, status, response, error, status_code, fetched_at) "
+            "VALUES (?, 'ok', ?, NULL, NULL, ?)",
+            (query, json.dumps(response, ensure_ascii=False), time.time()),
+        )
+        self.conn.commit()
+
+    def put_error(self, query, error, status_code=None):
+        """실패를 기록합니다. 이미 정상 응답이 있으면 덮어쓰지 않습니다."""
+        self.conn.execute(
+            "INSERT INTO search_cache (query, status, response, error, status_code, fetched_at) "
+            "VALUES (?, 'error', NULL, ?, ?, ?) "
+            "ON CONFLICT (query) DO UPDATE SET error = excluded.error, status_code = excluded.status_code, "
+            "fetched_at = excluded.fetched_at WHERE search_cache.status = 'error'",
+            (query, str(error), status_code, time.time()),
+        )
+        self.conn.commit()
+
+    def stats(self):
+        """상태별 저장 건수를 반환합니다."""
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM search_cache GROUP BY status").fetchall())
@@ -1,6 +1,7 @@
 # app/streamlit_app/pages/01_Survey.py
 
 import streamlit as st
+import random
 import sys
 import os
 
@@ -11,14 +12,17 @@ from backend.db.database import SessionLocal
 from backend.db import crud
 from backend.core import user_matching # 유사 사용자 매칭 함수 임포트
 
-# --- 페이지 로드 시 한 번만 영화 목록 가져오기 ---
-@st.cache_data
-def load_movies():
+SURVEY_MOVIE_COUNT = 100
+
+# --- 설문 후보 영화 풀 (모든 방문자가 공유, 10분마다 새로 읽기) ---
+@st.cache_data(ttl=600)
+def load_movie_pool():
     db = SessionLocal()
     try:
-        movies = crud.get_movies_for_survey(db, limit=100)
-        movies.sort(key=lambda x: x.title)
-        return movies
+        pool = crud.get_survey_movie_pool(db)
+        if not pool:  # 풀이 아직 만들어지지 않은 경우 기존 방식으로 가져옵니다.
+            pool = crud.get_movies_for_survey(db, limit=SURVEY_MOVIE_COUNT)
+        return pool
     finally:
         db.close()
 
@@ -26,8 +30,15 @@ def load_movies():
 if 'selected_movies' not in st.session_state:
     st.session_state.selected_movies = {}
 
+# 방문자(세션)마다 풀에서 새로 표본을 뽑고, 세션 동안에는 같은 목록을 유지합니다.
+if 'survey_movies' not in st.session_state:
+    pool = load_movie_pool()
+    movies = random.sample(pool, min(SURVEY_MOVIE_COUNT, len(pool)))
+    movies.sort(key=lambda x: x.title)
+    st.session_state.survey_movies = movies
+
 # --- 앱 UI 구성 ---
-movie_options = load_movies()
+movie_options = st.session_state.survey_movies
 
 st.title("🙋‍♂️ 당신만을 위한 OTT 추천 설문")
 st.info("정확한 추천을 위해 아래 설문에 상세히 답변해주시면 감사하겠습니다. 답변 내용은 추천 외 다른 목적으로 사용되지 않습니다.")
@@ -96,7 +107,9 @@ with st.form("user_survey_form"):
 # --- 제출 후 로직 처리 ---
 if submitted:
     # 데이터 유효성 검사
-    pref_movie_list = [movie.title for movie in movie_options if st.session_state.selected_movies.get(movie.movie_id)]
+    selected = [movie for movie in movie_options if st.session_state.selected_movies.get(movie.movie_id)]
+    pref_movie_list = [movie.title for movie in selected]
+    pref_movie_ids = [movie.movie_id for movie in selected]
     
     # ✨ 유효성 검사 로직 수정 ✨
     if len(pref_movie_list) < 5:
@@ -111,6 +124,7 @@ if submitted:
             "gender": "Male" if gender == "남성" else "Female",
             "age": age, "level_of_edu": level_of_edu, "income": income,
             "ott_consume_freq": watch_time, "pref_movie_list": pref_movie_list,
+            "pref_movie_ids": pref_movie_ids,
             "current_otts": current_otts, "watch_with": watch_with,
             "preferred_movie_genres": preferred_movie_genres, # 수정된 필드
             "preferred_tv_genres": preferred_tv_genres,       # 수정된 필드
@@ -125,15 +139,22 @@ if submitted:
             st.balloons()
 
             # 2. 유사 사용자 매칭 시작
+            # (MATCHING_ENGINE=index(기본값) 또는 topk이면 시간 제한 안에 끝나지 않을 때 그때까지의 최고 후보를 보여주고,
+            #  Result 페이지에서 정확히 다시 계산합니다. 다른 엔진은 설정대로 끝까지 계산합니다.)
             with st.spinner('취향이 비슷한 사용자를 찾고 있습니다...'):
-                matched_user_id, similarity_score = user_matching.find_similar_user(
+                matched_user_id, similarity_score, complete, scanned = user_matching.find_similar_user_anytime(
                     db=db, new_user_id=str(new_user.user_id)
                 )
             
             # 3. 매칭 결과 출력
             if matched_user_id:
                 st.success(f"매칭 완료! 당신과 가장 비슷한 사용자는 ID {matched_user_id} 입니다. (유사도: {similarity_score:.2%})")
-                st.info("매칭 결과는 서버의 app/data/sim_user_id_and_meta.jsonl 파일에 저장되었습니다.")
+                if not complete:
+                    st.caption(f"접속이 많아 후보의 일부(탐색 범위의 {scanned:.0%})만 비교한 결과입니다. "
+                               "Result 페이지에서 정확한 결과로 다시 계산됩니다.")
+                st.info("매칭 결과가 저장되었습니다. 'Result' 페이지에서 사용자 ID로 추천 결과를 확인하세요.")
+            elif not complete:
+                st.info("매칭을 준비 중입니다. 잠시 후 'Result' 페이지에서 사용자 ID로 추천 결과를 확인하세요.")
             else:
                 st.warning("아쉽지만 비슷한 사용자를 찾지 못했습니다.")
         except Exception as e:
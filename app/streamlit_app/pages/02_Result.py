@@ -13,7 +13,7 @@ if project_root not in sys.path:
 from backend.db.database import SessionLocal
 from backend.db import crud
 from backend.core import user_matching
-from backend.core.recommender import recommend_ott_platform
+from backend.core.recommender import NCF_FOLD_IN, get_fold_in_recommendation, get_ml_user_recommendation
 
 # ✅ 페이지 설정
 st.set_page_config(page_title="OTT 추천 결과", page_icon="📊")
@@ -30,29 +30,39 @@ if st.button("추천 결과 확인") and user_id:
         if not user:
             st.error("해당 사용자 ID를 찾을 수 없습니다.")
         else:
-            matched_ml_user_id, similarity = user_matching.find_similar_user(db, user_id)
+            # 설문 제출 시 저장된 매칭 결과를 재사용합니다. (rating 데이터가 바뀐 경우에만 다시 계산)
+            matched_ml_user_id, similarity = user_matching.get_match(db, user_id)
             if not matched_ml_user_id:
                 st.warning("유사 사용자를 찾지 못했습니다.")
             else:
                 st.success(f"매칭된 MovieLens 사용자: {matched_ml_user_id} (유사도: {similarity:.2%})")
 
-                watched = crud.get_watched_movies_by_ml_user(db, matched_ml_user_id)
-                watched = [(mid, float(r)) for mid, r in watched if r >= 4.0]
-                watched_ids = [mid for mid, _ in watched]
+                # 매칭된 사용자의 추천 결과는 미리 계산되어 있습니다. (ml_user_recommendation 기본 키 조회)
+                recommendation = get_ml_user_recommendation(db, matched_ml_user_id)
 
-                recommended_movies = crud.get_recommended_movies_with_ott(db, watched_ids)
-                movie_titles = [m.title for m in recommended_movies]
-
-                if not movie_titles:
+                if not recommendation["top_ott"]:
                     st.error("추천할 영화가 없습니다 (OTT 정보 없음).")
                 else:
-                    final_ott, movie_ott_map = recommend_ott_platform(db, movie_titles)
+                    st.subheader(f"🏆 최적의 OTT 플랫폼: **{recommendation['top_ott']}**")
 
-                    st.subheader(f"🏆 최적의 OTT 플랫폼: **{final_ott}**")
+                    st.markdown("#### 📊 OTT 플랫폼 순위 (평점 가중)")
+                    for rank, (ott_name, score) in enumerate(recommendation["ranked_otts"], start=1):
+                        st.write(f"{rank}. **{ott_name}** — {score:.1f}점")
                     st.markdown("---")
 
                     st.markdown("### 🎬 추천 영화 및 방영 OTT")
-                    for title, otts in movie_ott_map.items():
+                    for title, otts in recommendation["movie_otts"].items():
+                        otts_display = ", ".join(otts) if otts else "❌ 없음"
+                        st.write(f"- **{title}** → {otts_display}")
+
+            # 설문 선호 영화를 NCF 임베딩 공간에 fold-in한 예측 평점 기반 추천 (NCF_FOLD_IN=1일 때만)
+            if NCF_FOLD_IN:
+                fold_in = get_fold_in_recommendation(db, user)
+                if fold_in and fold_in["top_ott"]:
+                    st.markdown("---")
+                    st.markdown(f"### 🧠 취향 기반 예측 추천 (NCF, {fold_in['elapsed_ms']:.0f}ms)")
+                    st.subheader(f"🏆 예측 추천 영화를 가장 많이 제공하는 OTT: **{fold_in['top_ott']}**")
+                    for title, otts in fold_in["movie_otts"].items():
                         otts_display = ", ".join(otts) if otts else "❌ 없음"
                         st.write(f"- **{title}** → {otts_display}")
     except Exception as e:
@@ -12,6 +12,7 @@ CREATE TABLE "user" (
     income VARCHAR(50),
     ott_consume_freq VARCHAR(50),
     pref_movie_list TEXT[],
+    pref_movie_ids INTEGER[],      -- pref_movie_list와 같은 순서의 영화 ID
     -- 새로운 설문 항목들
     current_otts TEXT[],
     watch_with VARCHAR(50),
@@ -37,9 +38,21 @@ CREATE TABLE movie (
     title VARCHAR(255),
     rating_avg NUMERIC(3, 2),
     view_count INTEGER DEFAULT 0,
-    ott_list JSONB -- OTT 플랫폼 정보를 JSONB 타입으로 저장
+    rating_sum NUMERIC,                     -- NULL이 아닌 평점의 합계 (rating 행이 없으면 NULL)
+    rating_count INTEGER NOT NULL DEFAULT 0, -- NULL이 아닌 평점 수 (rating_avg = rating_sum / rating_count)
+    ott_list JSONB, -- OTT 플랫폼 정보를 JSONB 타입으로 저장
+    ott_mask INTEGER, -- ott_table.bit_position 기준 OTT 제공 여부 비트마스크 (NULL: 미검색, 0: 제공 없음)
+    ott_lease_owner VARCHAR(100),  -- OTT 정보 수집 작업을 가져간 크롤러 (호스트:PID)
+    ott_lease_until TIMESTAMPTZ,   -- 작업 임대 만료 시각 (지나면 다른 크롤러가 다시 가져갈 수 있음)
+    ott_seq BIGINT NOT NULL DEFAULT 0 -- ott_mask가 마지막으로 바뀐 순번 (추천 사전 계산 증분 갱신의 워터마크 기준)
 );
 COMMENT ON TABLE movie IS '영화 정보 및 상영 플랫폼 정보 (JSONB)';
+CREATE INDEX idx_movie_title ON movie (title);
+-- "어느 OTT에서든 제공" 필터용 부분 인덱스
+CREATE INDEX idx_movie_ott_available ON movie (movie_id) WHERE ott_mask <> 0;
+-- OTT 정보 수집 대상(미검색) 영화의 키셋 페이지네이션용 부분 인덱스
+CREATE INDEX idx_movie_ott_pending ON movie (movie_id) WHERE ott_list IS NULL OR ott_list = '{}'::jsonb;
+CREATE INDEX idx_movie_ott_seq ON movie (ott_seq);
 
 
 -- 4. rating 테이블: 모델이 예측한 사용자별 영화 평점
@@ -48,16 +61,22 @@ CREATE TABLE rating (
     ml_user_id INTEGER REFERENCES movie_lens_data(ml_user_id),
     movie_id INTEGER REFERENCES movie(movie_id),
     -- 평점은 0.0에서 5.0 사이의 값만 허용
-    rating NUMERIC(3, 2) CHECK (rating >= 0.0 AND rating <= 5.0)
+    rating NUMERIC(3, 2) CHECK (rating >= 0.0 AND rating <= 5.0),
+    rating_seq BIGSERIAL -- 입력 순서 (영화 통계 증분 갱신의 워터마크 기준)
 );
 COMMENT ON TABLE rating IS '모델이 예측한 사용자별 영화 평점';
+CREATE INDEX idx_rating_ml_user_id ON rating (ml_user_id);
+CREATE INDEX idx_rating_seq ON rating (rating_seq);
+CREATE INDEX idx_rating_movie_id ON rating (movie_id);
 
 
 -- 5. similarity 테이블: 신규 사용자와 가장 유사한 MovieLens 사용자 매칭 결과
 CREATE TABLE similarity (
     user_id UUID PRIMARY KEY REFERENCES "user"(user_id),
     ml_user_id INTEGER REFERENCES movie_lens_data(ml_user_id),
-    overlapped_movies TEXT[]
+    overlapped_movies TEXT[],
+    similarity_score REAL,        -- 자카드 유사도
+    rating_version BIGINT         -- 매칭 당시 rating 데이터 버전 (다르면 재계산 대상)
 );
 COMMENT ON TABLE similarity IS '신규 사용자와 가장 유사한 MovieLens 사용자 매칭 결과';
 
@@ -66,6 +85,124 @@ COMMENT ON TABLE similarity IS '신규 사용자와 가장 유사한 MovieLens 
 CREATE TABLE ott_table (
     ott_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(), -- 기본 키를 UUID로 변경
     ott_name VARCHAR(50) UNIQUE NOT NULL,
-    recommendation_count INTEGER DEFAULT 0
+    recommendation_count INTEGER DEFAULT 0,
+    bit_position SMALLINT UNIQUE CHECK (bit_position >= 0 AND bit_position < 31) -- movie.ott_mask의 비트 위치
 );
-COMMENT ON TABLE ott_table IS 'OTT 플랫폼별 정보 및 추천 횟수 통계';
\ No newline at end of file
+COMMENT ON TABLE ott_table IS 'OTT 플랫폼별 정보 및 추천 횟수 통계';
+
+-- 7. data_version 테이블: 캐시 무효화를 위한 테이블별 데이터 버전
+CREATE TABLE data_version (
+    table_name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+COMMENT ON TABLE data_version IS '테이블 변경 시마다 증가하는 데이터 버전 (프로세스 캐시 무효화용)';
+
+-- 트리거 인자가 있으면 그 이름으로, 없으면 테이블 이름으로 버전을 1 증가시킵니다.
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO data_version (table_name, version)
+    VALUES (COALESCE(TG_ARGV[0], TG_TABLE_NAME), 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = data_version.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER rating_bump_data_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rating
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+-- 평점 수정/삭제 시 'rating_rewrite' 버전을 올립니다. (영화 통계 증분 갱신 → 전체 재계산 전환)
+CREATE TRIGGER rating_rewrite_bump_data_version
+AFTER UPDATE OR DELETE OR TRUNCATE ON rating
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('rating_rewrite');
+
+-- movie.ott_list·ott_mask / ott_table 변경 시 OTT 행렬 캐시 버전('movie_ott')을 올립니다.
+CREATE TRIGGER movie_ott_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_list, ott_mask OR TRUNCATE ON movie
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_ott');
+
+CREATE TRIGGER ott_table_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_name, bit_position OR TRUNCATE ON ott_table
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_ott');
+
+-- 플랫폼 구성이 바뀌면 'ott_platform' 버전도 올립니다. (추천 사전 계산 증분 갱신 → 전체 재계산 전환)
+CREATE TRIGGER ott_platform_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_name, bit_position OR TRUNCATE ON ott_table
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('ott_platform');
+
+-- movie.title 변경 시 제목 인덱스 캐시 버전('movie_title')을 올립니다.
+CREATE TRIGGER movie_title_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF title OR TRUNCATE ON movie
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_title');
+
+-- ott_mask가 실제로 바뀐 영화에 movie.ott_seq 순번을 새로 매깁니다.
+CREATE SEQUENCE movie_ott_seq;
+
+CREATE OR REPLACE FUNCTION stamp_movie_ott_seq() RETURNS trigger AS $$
+BEGIN
+    IF NEW.ott_mask IS DISTINCT FROM OLD.ott_mask THEN
+        NEW.ott_seq := nextval('movie_ott_seq');
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER movie_stamp_ott_seq
+BEFORE UPDATE OF ott_list, ott_mask ON movie
+FOR EACH ROW EXECUTE FUNCTION stamp_movie_ott_seq();
+
+
+-- 8. ml_user_profile 테이블: rating에서 파생된 MovieLens 사용자별 시청 영화 배열 (SQL 매칭 엔진용)
+CREATE TABLE ml_user_profile (
+    ml_user_id INTEGER PRIMARY KEY REFERENCES movie_lens_data(ml_user_id),
+    gender VARCHAR(10),
+    age INTEGER,
+    movie_ids INTEGER[] NOT NULL,   -- 중복 없이 정렬된 시청 영화 ID
+    movie_count INTEGER NOT NULL    -- cardinality(movie_ids)
+);
+CREATE INDEX idx_ml_user_profile_movie_ids ON ml_user_profile USING GIN (movie_ids);
+CREATE INDEX idx_ml_user_profile_gender_age ON ml_user_profile (gender, age);
+COMMENT ON TABLE ml_user_profile IS 'rating에서 파생된 사용자별 시청 영화 배열 (scripts/update_user_profiles.py로 갱신)';
+
+
+-- 9. ml_user_recommendation 테이블: MovieLens 사용자별 OTT 추천 결과 (Result 페이지용 사전 계산)
+CREATE TABLE ml_user_recommendation (
+    ml_user_id INTEGER PRIMARY KEY REFERENCES movie_lens_data(ml_user_id),
+    top_ott VARCHAR(50),            -- 1순위 OTT 이름 (추천할 영화가 없으면 NULL)
+    ranked_otts JSONB NOT NULL,     -- [[OTT 이름, 평점 가중 점수], ...] 점수 내림차순
+    movie_ids INTEGER[] NOT NULL,   -- OTT에서 제공되는 평점 4.0 이상 영화 (평점 내림차순)
+    movie_otts JSONB NOT NULL,      -- {영화 제목: [OTT 이름, ...]} (화면 표시용)
+    rating_version BIGINT NOT NULL, -- 계산 당시 rating 데이터 버전
+    ott_version BIGINT NOT NULL     -- 계산 당시 movie_ott 데이터 버전
+);
+COMMENT ON TABLE ml_user_recommendation IS 'MovieLens 사용자별 OTT 추천 결과 (scripts/build_ml_user_recommendations.py로 갱신)';
+
+
+-- 10. survey_movie_pool 테이블: 설문에 노출할 후보 영화 풀 (인기·고평점 상위 200편)
+CREATE TABLE survey_movie_pool (
+    movie_id INTEGER PRIMARY KEY REFERENCES movie(movie_id),
+    pool_rank INTEGER NOT NULL      -- 평점 순위 (1부터)
+);
+COMMENT ON TABLE survey_movie_pool IS '설문 후보 영화 풀 (scripts/update_view_counts.py, update_averagers.py 실행 시 재생성)';
+
+
+-- 11. aggregate_watermark 테이블: 증분 집계 작업별 마지막 처리 위치
+CREATE TABLE aggregate_watermark (
+    job_name VARCHAR(50) PRIMARY KEY,
+    last_rating_seq BIGINT NOT NULL,  -- 마지막으로 반영한 rating.rating_seq
+    rewrite_version BIGINT NOT NULL,  -- 마지막 실행 시점의 'rating_rewrite' 데이터 버전
+    last_ott_seq BIGINT NOT NULL DEFAULT 0,     -- 마지막으로 반영한 movie.ott_seq
+    platform_version BIGINT NOT NULL DEFAULT 0  -- 마지막 실행 시점의 'ott_platform' 데이터 버전
+);
+COMMENT ON TABLE aggregate_watermark IS '증분 집계 작업의 워터마크 (scripts/update_movie_stats.py, build_ml_user_recommendations.py)';
+
+
+-- 12. predicted_rating 테이블: NCF 모델이 예측한 사용자별 미시청 영화 상위 N편
+CREATE TABLE predicted_rating (
+    ml_user_id INTEGER REFERENCES movie_lens_data(ml_user_id),
+    movie_id INTEGER REFERENCES movie(movie_id),
+    predicted_rating REAL NOT NULL, -- 예측 평점 (0.0 ~ 5.0으로 자름)
+    rank SMALLINT NOT NULL,         -- 사용자 안에서의 순위 (1부터)
+    PRIMARY KEY (ml_user_id, movie_id)
+);
+COMMENT ON TABLE predicted_rating IS 'NCF 모델 예측 평점 상위 N편 (scripts/score_predicted_ratings.py로 전체 갱신)';
@@ -0,0 +1,22 @@
+-- 001: 캐시 무효화를 위한 data_version 테이블과 rating 변경 트리거
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/001_data_version.sql
+
+CREATE TABLE IF NOT EXISTS data_version (
+    table_name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+COMMENT ON TABLE data_version IS '테이블 변경 시마다 증가하는 데이터 버전 (프로세스 캐시 무효화용)';
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO data_version (table_name, version)
+    VALUES (COALESCE(TG_ARGV[0], TG_TABLE_NAME), 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = data_version.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS rating_bump_data_version ON rating;
+CREATE TRIGGER rating_bump_data_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rating
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
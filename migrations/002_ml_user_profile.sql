@@ -0,0 +1,13 @@
+-- 002: SQL 매칭 엔진용 ml_user_profile 테이블
+-- 적용 후 `python -m app.backend.scripts.update_user_profiles --full`로 데이터를 채웁니다.
+
+CREATE TABLE IF NOT EXISTS ml_user_profile (
+    ml_user_id INTEGER PRIMARY KEY REFERENCES movie_lens_data(ml_user_id),
+    gender VARCHAR(10),
+    age INTEGER,
+    movie_ids INTEGER[] NOT NULL,
+    movie_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ml_user_profile_movie_ids ON ml_user_profile USING GIN (movie_ids);
+CREATE INDEX IF NOT EXISTS idx_ml_user_profile_gender_age ON ml_user_profile (gender, age);
+COMMENT ON TABLE ml_user_profile IS 'rating에서 파생된 사용자별 시청 영화 배열 (scripts/update_user_profiles.py로 갱신)';
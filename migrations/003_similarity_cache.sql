@@ -0,0 +1,7 @@
+-- 003: similarity 테이블을 매칭 결과 캐시로 사용하기 위한 컬럼 추가
+--      + 매칭된 사용자의 평점 조회(get_watched_movies_by_ml_user)용 인덱스
+
+ALTER TABLE similarity ADD COLUMN IF NOT EXISTS similarity_score REAL;
+ALTER TABLE similarity ADD COLUMN IF NOT EXISTS rating_version BIGINT;
+
+CREATE INDEX IF NOT EXISTS idx_rating_ml_user_id ON rating (ml_user_id);
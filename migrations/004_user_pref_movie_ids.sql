@@ -0,0 +1,16 @@
+-- 004: 설문 선호 영화를 영화 ID 배열로 저장 + 기존 사용자 backfill
+--      제목이 같은 영화가 여러 편이면 movie_id가 가장 작은 영화를 사용합니다.
+
+ALTER TABLE "user" ADD COLUMN IF NOT EXISTS pref_movie_ids INTEGER[];
+CREATE INDEX IF NOT EXISTS idx_movie_title ON movie (title);
+
+UPDATE "user" u
+SET pref_movie_ids = ARRAY(
+    SELECT m.movie_id
+    FROM unnest(u.pref_movie_list) WITH ORDINALITY AS t(title, ord)
+    CROSS JOIN LATERAL (SELECT MIN(movie_id) AS movie_id FROM movie WHERE movie.title = t.title) AS m
+    WHERE m.movie_id IS NOT NULL
+    ORDER BY t.ord
+)
+WHERE u.pref_movie_ids IS NULL
+  AND u.pref_movie_list IS NOT NULL;
@@ -0,0 +1,12 @@
+-- 005: OTT 행렬 캐시 무효화를 위한 movie.ott_list / ott_table 변경 트리거
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/005_movie_ott_version.sql
+
+DROP TRIGGER IF EXISTS movie_ott_bump_data_version ON movie;
+CREATE TRIGGER movie_ott_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_list OR TRUNCATE ON movie
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_ott');
+
+DROP TRIGGER IF EXISTS ott_table_bump_data_version ON ott_table;
+CREATE TRIGGER ott_table_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_name OR TRUNCATE ON ott_table
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_ott');
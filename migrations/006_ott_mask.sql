@@ -0,0 +1,40 @@
+-- 006: OTT 제공 여부 비트마스크(movie.ott_mask)와 플랫폼별 비트 위치(ott_table.bit_position)
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/006_ott_mask.sql
+
+ALTER TABLE ott_table ADD COLUMN IF NOT EXISTS bit_position SMALLINT UNIQUE
+    CHECK (bit_position >= 0 AND bit_position < 31);
+ALTER TABLE movie ADD COLUMN IF NOT EXISTS ott_mask INTEGER;
+
+-- 기존 플랫폼에는 이름 순으로 비트 위치를 부여합니다.
+UPDATE ott_table o
+SET bit_position = n.bit_position
+FROM (
+    SELECT ott_id,
+           (SELECT COALESCE(MAX(bit_position) + 1, 0) FROM ott_table)
+           + ROW_NUMBER() OVER (ORDER BY ott_name) - 1 AS bit_position
+    FROM ott_table
+    WHERE bit_position IS NULL
+) AS n
+WHERE o.ott_id = n.ott_id;
+
+-- ott_list(JSONB)에서 비트마스크를 채웁니다. (검색된 적 없는 영화는 NULL 유지)
+UPDATE movie m
+SET ott_mask = COALESCE((
+    SELECT bit_or(1 << o.bit_position)
+    FROM jsonb_each_text(m.ott_list) AS e(ott_id, available)
+    JOIN ott_table o ON o.ott_id::text = e.ott_id
+    WHERE e.available = 'true'
+), 0)
+WHERE m.ott_list IS NOT NULL AND m.ott_list <> '{}'::jsonb;
+
+CREATE INDEX IF NOT EXISTS idx_movie_ott_available ON movie (movie_id) WHERE ott_mask <> 0;
+
+DROP TRIGGER IF EXISTS movie_ott_bump_data_version ON movie;
+CREATE TRIGGER movie_ott_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_list, ott_mask OR TRUNCATE ON movie
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_ott');
+
+DROP TRIGGER IF EXISTS ott_table_bump_data_version ON ott_table;
+CREATE TRIGGER ott_table_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_name, bit_position OR TRUNCATE ON ott_table
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_ott');
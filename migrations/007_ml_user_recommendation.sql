@@ -0,0 +1,14 @@
+-- 007: MovieLens 사용자별 OTT 추천 결과를 미리 계산해 두는 ml_user_recommendation 테이블
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/007_ml_user_recommendation.sql
+-- 이후 python app/backend/scripts/build_ml_user_recommendations.py 로 채웁니다.
+
+CREATE TABLE IF NOT EXISTS ml_user_recommendation (
+    ml_user_id INTEGER PRIMARY KEY REFERENCES movie_lens_data(ml_user_id),
+    top_ott VARCHAR(50),
+    ranked_otts JSONB NOT NULL,
+    movie_ids INTEGER[] NOT NULL,
+    movie_otts JSONB NOT NULL,
+    rating_version BIGINT NOT NULL,
+    ott_version BIGINT NOT NULL
+);
+COMMENT ON TABLE ml_user_recommendation IS 'MovieLens 사용자별 OTT 추천 결과 (scripts/build_ml_user_recommendations.py로 갱신)';
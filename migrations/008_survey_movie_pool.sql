@@ -0,0 +1,9 @@
+-- 008: 설문 후보 영화 풀(survey_movie_pool) 테이블
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/008_survey_movie_pool.sql
+-- 이후 python app/backend/scripts/rebuild_survey_pool.py 로 채웁니다.
+
+CREATE TABLE IF NOT EXISTS survey_movie_pool (
+    movie_id INTEGER PRIMARY KEY REFERENCES movie(movie_id),
+    pool_rank INTEGER NOT NULL
+);
+COMMENT ON TABLE survey_movie_pool IS '설문 후보 영화 풀 (scripts/update_view_counts.py, update_averagers.py 실행 시 재생성)';
@@ -0,0 +1,21 @@
+-- 009: movie.view_count / rating_avg 증분 갱신을 위한 누적값·워터마크
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/009_movie_stats_watermark.sql
+-- 이후 python app/backend/scripts/update_movie_stats.py 를 한 번 실행하면 전체 재계산으로 누적값이 채워집니다.
+
+ALTER TABLE movie ADD COLUMN IF NOT EXISTS rating_sum NUMERIC;
+ALTER TABLE movie ADD COLUMN IF NOT EXISTS rating_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE rating ADD COLUMN IF NOT EXISTS rating_seq BIGSERIAL;
+CREATE INDEX IF NOT EXISTS idx_rating_seq ON rating (rating_seq);
+
+DROP TRIGGER IF EXISTS rating_rewrite_bump_data_version ON rating;
+CREATE TRIGGER rating_rewrite_bump_data_version
+AFTER UPDATE OR DELETE OR TRUNCATE ON rating
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('rating_rewrite');
+
+CREATE TABLE IF NOT EXISTS aggregate_watermark (
+    job_name VARCHAR(50) PRIMARY KEY,
+    last_rating_seq BIGINT NOT NULL,
+    rewrite_version BIGINT NOT NULL
+);
+COMMENT ON TABLE aggregate_watermark IS '증분 집계 작업의 워터마크 (scripts/update_movie_stats.py)';
@@ -0,0 +1,9 @@
+-- 010: OTT 정보 수집 작업 임대(lease) 컬럼과 미검색 영화 부분 인덱스
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/010_ott_work_lease.sql
+-- 여러 update_ott_info.py 프로세스가 FOR UPDATE SKIP LOCKED + 임대 만료 시각으로 작업을 나눠 가져갑니다.
+
+ALTER TABLE movie ADD COLUMN IF NOT EXISTS ott_lease_owner VARCHAR(100);
+ALTER TABLE movie ADD COLUMN IF NOT EXISTS ott_lease_until TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_movie_ott_pending ON movie (movie_id)
+WHERE ott_list IS NULL OR ott_list = '{}'::jsonb;
@@ -0,0 +1,12 @@
+-- 011: NCF 모델 예측 평점 테이블
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/011_predicted_rating.sql
+-- 이후 python app/backend/scripts/score_predicted_ratings.py 로 예측 평점을 채웁니다.
+
+CREATE TABLE IF NOT EXISTS predicted_rating (
+    ml_user_id INTEGER REFERENCES movie_lens_data(ml_user_id),
+    movie_id INTEGER REFERENCES movie(movie_id),
+    predicted_rating REAL NOT NULL,
+    rank SMALLINT NOT NULL,
+    PRIMARY KEY (ml_user_id, movie_id)
+);
+COMMENT ON TABLE predicted_rating IS 'NCF 모델 예측 평점 상위 N편 (scripts/score_predicted_ratings.py로 전체 갱신)';
@@ -0,0 +1,32 @@
+-- 012: MovieLens 사용자별 추천 사전 계산의 증분 갱신 (바뀐 사용자만 다시 계산)
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/012_ml_user_recommendation_watermark.sql
+-- 워터마크가 없으므로 다음 build_ml_user_recommendations.py 실행은 전체 재계산입니다.
+
+ALTER TABLE movie ADD COLUMN IF NOT EXISTS ott_seq BIGINT NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_movie_ott_seq ON movie (ott_seq);
+CREATE INDEX IF NOT EXISTS idx_rating_movie_id ON rating (movie_id);
+
+CREATE SEQUENCE IF NOT EXISTS movie_ott_seq;
+
+CREATE OR REPLACE FUNCTION stamp_movie_ott_seq() RETURNS trigger AS $$
+BEGIN
+    IF NEW.ott_mask IS DISTINCT FROM OLD.ott_mask THEN
+        NEW.ott_seq := nextval('movie_ott_seq');
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS movie_stamp_ott_seq ON movie;
+CREATE TRIGGER movie_stamp_ott_seq
+BEFORE UPDATE OF ott_list, ott_mask ON movie
+FOR EACH ROW EXECUTE FUNCTION stamp_movie_ott_seq();
+
+DROP TRIGGER IF EXISTS ott_platform_bump_data_version ON ott_table;
+CREATE TRIGGER ott_platform_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF ott_name, bit_position OR TRUNCATE ON ott_table
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('ott_platform');
+
+ALTER TABLE aggregate_watermark ADD COLUMN IF NOT EXISTS last_ott_seq BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE aggregate_watermark ADD COLUMN IF NOT EXISTS platform_version BIGINT NOT NULL DEFAULT 0;
+COMMENT ON TABLE aggregate_watermark IS '증분 집계 작업의 워터마크 (scripts/update_movie_stats.py, build_ml_user_recommendations.py)';
@@ -0,0 +1,7 @@
+-- 013: ml_user_recommendation.top_ott를 다시 가중치 없는 편수 기준(가장 많은 추천 영화를 제공하는 플랫폼)으로 계산
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/013_ml_user_recommendation_top_ott.sql
+-- 평점 가중 기준으로 저장된 결과를 지우므로, 다음 build_ml_user_recommendations.py 실행이 모든 사용자를 다시 계산합니다.
+-- (지운 동안 Result 페이지는 읽을 때 바로 계산한 결과를 보여줍니다.)
+
+TRUNCATE ml_user_recommendation;
+DELETE FROM aggregate_watermark WHERE job_name = 'ml_user_recommendation';
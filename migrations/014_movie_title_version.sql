@@ -0,0 +1,7 @@
+-- 014: 제목 인덱스 캐시 무효화를 위한 movie.title 변경 트리거
+-- 기존 DB에 적용: docker exec -i OTT_rec_db psql -U proj2 -d OTT_rec < migrations/014_movie_title_version.sql
+
+DROP TRIGGER IF EXISTS movie_title_bump_data_version ON movie;
+CREATE TRIGGER movie_title_bump_data_version
+AFTER INSERT OR DELETE OR UPDATE OF title OR TRUNCATE ON movie
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('movie_title');
@@ -0,0 +1,81 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# --- 경로 추가 (app/backend 패키지의 NumPy 예측기를 사용하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.core.ncf_inference import NCFPredictor
+
+# export_ncf.py를 import하면 TensorFlow가 함께 로드되므로 경로만 따로 둡니다.
+KERAS_PATH = "ncf_model_light.keras"
+NPZ_PATH = "ncf_model_light.npz"
+
+# 새 프로세스에서 import + 모델 로드 + 첫 예측까지 걸리는 시간 (콜드 스타트)
+COLD_START_SCRIPTS = {
+    "numpy": f"""
+import sys
+sys.path.append({app_root!r})
+from backend.core.ncf_inference import NCFPredictor
+p = NCFPredictor.load({{path!r}})
+p.predict_indices([0], [0])
+""",
+    "keras": """
+import numpy as np
+from tensorflow.keras.models import load_model
+m = load_model({path!r})
+m.predict([np.array([0]), np.array([0])], verbose=0)
+""",
+}
+
+
+def cold_start(engine: str, path: str, repeat: int = 3) -> float:
+    script = COLD_START_SCRIPTS[engine].format(path=path)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def throughput(predict, n_users: int, n_movies: int, batch_size: int, n_batches: int = 20) -> float:
+    rng = np.random.default_rng(0)
+    batches = [(rng.integers(0, n_users, batch_size), rng.integers(0, n_movies, batch_size))
+               for _ in range(n_batches)]
+    predict(*batches[0])  # 워밍업
+    start = time.perf_counter()
+    for user_idx, movie_idx in batches:
+        predict(user_idx, movie_idx)
+    return batch_size * n_batches / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NCF 예측기 벤치마크 (NumPy vs Keras)")
+    parser.add_argument("--keras", action="store_true", help="Keras 모델도 함께 측정합니다. (TensorFlow 필요)")
+    parser.add_argument("--batch-sizes", default="1,64,4096")
+    args = parser.parse_args()
+
+    predictor = NCFPredictor.load(NPZ_PATH)
+    engines = {"numpy": (NPZ_PATH, predictor.predict_indices)}
+    if args.keras:
+        from tensorflow.keras.models import load_model
+        model = load_model(KERAS_PATH)
+        engines["keras"] = (KERAS_PATH, lambda u, m: model.predict([u, m], batch_size=4096, verbose=0))
+
+    for engine, (path, predict) in engines.items():
+        print(f"⏱️ [{engine}] 콜드 스타트: {cold_start(engine, path):.2f}초")
+        for batch_size in map(int, args.batch_sizes.split(",")):
+            rate = throughput(predict, predictor.n_users, predictor.n_movies, batch_size)
+            print(f"   배치 {batch_size:>5}: {rate:,.0f}건/초")
+
+    predictor.predict_user(0)  # 영화별 첫 층 기여분 미리 계산
+    start = time.perf_counter()
+    scores = predictor.predict_user(1 % predictor.n_users)
+    print(f"⏱️ [numpy] 사용자 1명의 전체 영화 {len(scores)}편 예측: {(time.perf_counter() - start) * 1000:.1f}ms")
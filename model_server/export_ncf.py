@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+from tensorflow.keras.layers import Dense, Embedding
+from tensorflow.keras.models import load_model
+
+# --- 경로 추가 (app/backend 패키지의 공용 평점 데이터셋 / NumPy 예측기를 사용하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.core.ncf_inference import NCFPredictor
+from backend.core.rating_dataset import load_or_compile_dataset
+
+KERAS_PATH = "ncf_model_light.keras"
+NPZ_PATH = "ncf_model_light.npz"
+
+
+def extract_arrays(model, dataset) -> dict:
+    """
+    학습된 Keras 모델에서 임베딩 테이블과 Dense 가중치를 꺼내, 평점 데이터셋의 ID 매핑과 함께 반환합니다.
+    mysqlmovie.py는 사용자 임베딩 → 영화 임베딩, Dense 32 → 16 → 1 순서로 층을 만듭니다.
+    """
+    embeddings = [layer.get_weights()[0] for layer in model.layers if isinstance(layer, Embedding)]
+    denses = [layer.get_weights() for layer in model.layers if isinstance(layer, Dense)]
+    if len(embeddings) != 2 or len(denses) != 3:
+        raise ValueError(f"예상한 NCF 구조가 아닙니다. (Embedding {len(embeddings)}개, Dense {len(denses)}개)")
+
+    user_embedding, movie_embedding = embeddings
+    if len(user_embedding) != dataset.n_users or len(movie_embedding) != dataset.n_movies:
+        raise ValueError("임베딩 크기가 평점 데이터셋과 다릅니다. 모델을 다시 학습하세요. (mysqlmovie.py)")
+
+    (w1, b1), (w2, b2), (w3, b3) = denses
+    return {
+        "user_embedding": user_embedding, "movie_embedding": movie_embedding,
+        "w1": w1, "b1": b1, "w2": w2, "b2": b2, "w3": w3, "b3": b3,
+        "user_ids": np.asarray(dataset.user_ids), "movie_ids": np.asarray(dataset.movie_ids),
+    }
+
+
+def verify(model, predictor, dataset, n_samples=10000, atol=1e-4, seed=0) -> float:
+    """임의의 (사용자, 영화) 쌍에서 Keras와 NumPy 예측값의 최대 오차를 확인합니다."""
+    rng = np.random.default_rng(seed)
+    user_idx = rng.integers(0, dataset.n_users, n_samples)
+    movie_idx = rng.integers(0, dataset.n_movies, n_samples)
+    expected = model.predict([user_idx, movie_idx], batch_size=4096, verbose=0)[:, 0]
+    actual = predictor.predict_indices(user_idx, movie_idx)
+    max_err = float(np.max(np.abs(expected - actual)))
+    if max_err > atol:
+        raise AssertionError(f"🚨 Keras와 NumPy 예측값이 다릅니다. (최대 오차 {max_err:.2e} > {atol:.0e})")
+    print(f"✅ 검증 완료: {n_samples}쌍, 최대 오차 {max_err:.2e}")
+    return max_err
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="학습된 NCF 모델을 NumPy 예측기용 .npz로 내보냅니다.")
+    parser.add_argument("--model", default=KERAS_PATH)
+    parser.add_argument("--out", default=NPZ_PATH)
+    parser.add_argument("--samples", type=int, default=10000, help="Keras와 비교할 (사용자, 영화) 쌍 수")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    dataset = load_or_compile_dataset("ratings.csv")
+
+    arrays = extract_arrays(model, dataset)
+    np.savez(args.out, **arrays)
+    size_mb = os.path.getsize(args.out) / 1024 ** 2
+    print(f"✅ 내보내기 완료: {args.out} ({size_mb:.1f}MB, 사용자 {dataset.n_users}명, 영화 {dataset.n_movies}편)")
+
+    verify(model, NCFPredictor.load(args.out), dataset, n_samples=args.samples)
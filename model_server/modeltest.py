@@ -1,28 +1,23 @@
-import numpy as np
-import pandas as pd
-from tensorflow.keras.models import load_model
+import os
+import sys
 
-# 1. 모델 불러오기
-model = load_model("ncf_model_light.keras")
+# --- 경로 추가 (app/backend 패키지의 NumPy 예측기를 사용하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
 
-# 2. 데이터 불러오기 및 매핑 생성
-df = pd.read_csv("ratings.csv")
-df = df.sample(frac=0.1, random_state=42)
+from backend.core.ncf_inference import NCFPredictor
 
-user_ids = df['userId'].unique()
-movie_ids = df['movieId'].unique()
+# 1. 모델 불러오기 (export_ncf.py로 내보낸 가중치와 ID 매핑, TensorFlow 불필요)
+if not os.path.exists("ncf_model_light.npz"):
+    print("❌ ncf_model_light.npz가 없습니다. 먼저 python export_ncf.py를 실행하세요.")
+    sys.exit(1)
+predictor = NCFPredictor.load("ncf_model_light.npz")
 
-user_to_index = {uid: idx for idx, uid in enumerate(user_ids)}
-movie_to_index = {mid: idx for idx, mid in enumerate(movie_ids)}
+# 2. 테스트할 사용자와 영화 ID 지정 (학습 데이터셋에 있어야 함)
+test_user_id = predictor.user_ids[0]  # 또는 실제 존재하는 userId로 바꾸기
+test_movie_id = predictor.movie_ids[10]
 
-# 3. 테스트할 사용자와 영화 ID 지정 (데이터셋에 있어야 함)
-test_user_id = user_ids[0]  # 또는 0, 1, 2 처럼 실제 존재하는 ID로 바꾸기
-test_movie_id = movie_ids[10]
-
-# 4. 인덱스 변환
-user_idx = user_to_index[test_user_id]
-movie_idx = movie_to_index[test_movie_id]
-
-# 5. 예측
-pred = model.predict([np.array([user_idx]), np.array([movie_idx])])
-print(f"🎯 예측된 평점: {pred[0][0]:.2f}")
\ No newline at end of file
+# 3. 예측 (ID → 인덱스 변환은 예측기가 처리)
+pred = predictor.predict([test_user_id], [test_movie_id])
+print(f"🎯 예측된 평점: {pred[0]:.2f}")
@@ -1,54 +1,85 @@
-import pandas as pd
-import numpy as np
+import argparse
+import math
+import os
+import sys
+
 from tensorflow.keras.models import Model
 from tensorflow.keras.layers import Input, Embedding, Flatten, Concatenate, Dense
 from tensorflow.keras.optimizers import Adam
-from sklearn.model_selection import train_test_split
+from tensorflow.keras.callbacks import BackupAndRestore
+
+# --- 경로 추가 (app/backend 패키지의 공용 평점 데이터셋을 사용하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.core.rating_dataset import DATASET_DIR, load_or_compile_dataset
+from ncf_pipeline import SHARD_ROWS, EpochTimer, count_rows, make_input_pipeline
+
+BACKUP_DIR = "ncf_training_backup"
+
 
-# CSV 데이터 로딩 및 경량화 샘플링
-df = pd.read_csv("ratings.csv")
-df = df.sample(frac=0.1, random_state=42)  # 데이터 10%만 사용
+def build_model(n_users: int, n_movies: int, embedding_dim: int = 16) -> Model:
+    """NCF 모델: 사용자/영화 임베딩 → concat → Dense 32 → 16 → 1 (export_ncf.py / NCFPredictor와 같은 구조)"""
+    user_input = Input(shape=(1,))
+    movie_input = Input(shape=(1,))
 
-# 인덱스 매핑
-user_ids = df['userId'].unique()
-movie_ids = df['movieId'].unique()
+    user_emb = Embedding(input_dim=n_users, output_dim=embedding_dim)(user_input)
+    movie_emb = Embedding(input_dim=n_movies, output_dim=embedding_dim)(movie_input)
 
-user_to_index = {uid: idx for idx, uid in enumerate(user_ids)}
-movie_to_index = {mid: idx for idx, mid in enumerate(movie_ids)}
+    user_vec = Flatten()(user_emb)
+    movie_vec = Flatten()(movie_emb)
 
-df['user_idx'] = df['userId'].map(user_to_index)
-df['movie_idx'] = df['movieId'].map(movie_to_index)
+    merged = Concatenate()([user_vec, movie_vec])
+    x = Dense(32, activation='relu')(merged)
+    x = Dense(16, activation='relu')(x)
+    output = Dense(1)(x)
 
-# 훈련/테스트 분할
-X = df[['user_idx', 'movie_idx']].values
-y = df['rating'].values
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = Model(inputs=[user_input, movie_input], outputs=output)
+    model.compile(loss='mse', optimizer=Adam(learning_rate=0.001), metrics=['mae'])
+    return model
 
-# 하이퍼파라미터
-n_users = len(user_to_index)
-n_movies = len(movie_to_index)
-embedding_dim = 16  # 줄임
 
-# 모델 구성
-user_input = Input(shape=(1,))
-movie_input = Input(shape=(1,))
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NCF 모델 학습 (메모리 맵 샤드 + tf.data 스트리밍)")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--embedding-dim", type=int, default=16)
+    parser.add_argument("--full", action="store_true",
+                        help="10%% 샘플 대신 전체 평점으로 학습합니다. (ID 매핑이 DB 샘플과 달라 서빙용 모델과는 별도)")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS, help="샤드 하나의 평점 수")
+    parser.add_argument("--checkpoint-steps", type=int, default=0,
+                        help="N 스텝마다 중간 체크포인트를 저장합니다. (0이면 에포크마다)")
+    args = parser.parse_args()
 
-user_emb = Embedding(input_dim=n_users, output_dim=embedding_dim)(user_input)
-movie_emb = Embedding(input_dim=n_movies, output_dim=embedding_dim)(movie_input)
+    # 평점 데이터셋 로딩 (ratings.csv를 컴파일한 메모리 맵 배열, 없으면 생성)
+    # user_idx / movie_idx는 처음 등장한 순서로 매긴 인덱스입니다.
+    if args.full:
+        dataset = load_or_compile_dataset("ratings.csv", DATASET_DIR + "_full", frac=1.0)
+    else:
+        dataset = load_or_compile_dataset("ratings.csv")
 
-user_vec = Flatten()(user_emb)
-movie_vec = Flatten()(movie_emb)
+    # 학습/검증 분할은 (사용자, 영화) 해시로 정해지므로 재시작해도 같습니다.
+    n_train = count_rows(dataset, validation=False, shard_rows=args.shard_rows)
+    n_val = count_rows(dataset, validation=True, shard_rows=args.shard_rows)
+    print(f"✅ 평점 {len(dataset.rating)}건 (학습 {n_train}, 검증 {n_val}), "
+          f"사용자 {dataset.n_users}명, 영화 {dataset.n_movies}편")
 
-merged = Concatenate()([user_vec, movie_vec])
-x = Dense(32, activation='relu')(merged)
-x = Dense(16, activation='relu')(x)
-output = Dense(1)(x)
+    train_ds = make_input_pipeline(dataset, args.batch_size, shard_rows=args.shard_rows)
+    val_ds = make_input_pipeline(dataset, args.batch_size, validation=True, shard_rows=args.shard_rows)
 
-model = Model(inputs=[user_input, movie_input], outputs=output)
-model.compile(loss='mse', optimizer=Adam(learning_rate=0.001), metrics=['mae'])
+    model = build_model(dataset.n_users, dataset.n_movies, args.embedding_dim)
 
-# 모델 훈련 (epoch 수 줄임)
-model.fit([X_train[:, 0], X_train[:, 1]], y_train, epochs=2, batch_size=256, validation_split=0.1)
+    # 중간에 중단되면 같은 명령으로 다시 실행했을 때 마지막 체크포인트부터 이어서 학습합니다.
+    backup = BackupAndRestore(BACKUP_DIR, save_freq=args.checkpoint_steps or "epoch")
+    model.fit(
+        train_ds.repeat(),
+        epochs=args.epochs,
+        steps_per_epoch=math.ceil(n_train / args.batch_size),
+        validation_data=val_ds,
+        callbacks=[backup, EpochTimer(n_train)],
+    )
 
-# 모델 저장
-model.save("ncf_model_light.keras")
\ No newline at end of file
+    # 모델 저장
+    model.save("ncf_model_light.keras")
+    print("✅ 모델 저장 완료: ncf_model_light.keras (서빙용 NumPy 가중치는 python export_ncf.py로 내보내세요)")
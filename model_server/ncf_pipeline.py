@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+# --- 경로 추가 (app/backend 패키지의 공용 평점 데이터셋 / 해시 샘플러를 사용하기 위함) ---
+app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app'))
+if app_root not in sys.path:
+    sys.path.append(app_root)
+
+from backend.core.rating_sampler import sample_mask
+
+SHARD_ROWS = 1 << 20        # 샤드 하나 = 메모리 맵 배열의 연속 구간 (약 100만 행)
+VAL_FRACTION = 0.1          # 검증 데이터 비율 ((사용자, 영화) 해시로 정해지므로 에포크/재시작과 무관하게 고정)
+VAL_SEED = 7
+SHUFFLE_BUFFER_BATCHES = 64  # 여러 샤드에서 섞여 들어온 배치를 다시 섞는 버퍼 크기 (배치 단위)
+
+
+def validation_mask(user_ids, movie_ids) -> np.ndarray:
+    """평점이 검증 데이터에 속하는지 여부. 학습 샘플링과 다른 seed의 같은 해시 샘플러를 사용합니다."""
+    return sample_mask(user_ids, movie_ids, frac=VAL_FRACTION, seed=VAL_SEED)
+
+
+def count_rows(dataset, validation: bool, shard_rows: int = SHARD_ROWS) -> int:
+    """샤드를 한 번 훑어 학습(또는 검증) 평점 수를 셉니다. (메모리는 샤드 하나 크기만 사용)"""
+    total = 0
+    for start in range(0, len(dataset.rating), shard_rows):
+        users = dataset.user_ids[dataset.user_idx[start:start + shard_rows]]
+        movies = dataset.movie_ids[dataset.movie_idx[start:start + shard_rows]]
+        mask = validation_mask(users, movies)
+        total += int(mask.sum() if validation else (~mask).sum())
+    return total
+
+
+def make_input_pipeline(dataset, batch_size: int, validation: bool = False, shard_rows: int = SHARD_ROWS,
+                        shuffle_buffer_batches: int = SHUFFLE_BUFFER_BATCHES, cycle_length: int = 4) -> tf.data.Dataset:
+    """
+    평점 데이터셋(메모리 맵 int32/float32 열 배열)을 샤드 단위로 읽어 tf.data 파이프라인을 만듭니다.
+    - 샤드 순서를 에포크마다 섞고, cycle_length개의 샤드를 병렬 interleave로 동시에 읽습니다.
+    - 샤드 안에서는 NumPy로 행 순서를 섞어 배치로 자르고, 배치 단위 셔플 버퍼로 샤드 간에 다시 섞습니다.
+    - 한 번에 메모리에 올리는 양은 (cycle_length개 샤드 + 셔플 버퍼) 정도로, 전체 평점 수와 무관합니다.
+    """
+    n_rows = len(dataset.rating)
+    starts = np.arange(0, n_rows, shard_rows, dtype=np.int64)
+
+    def read_shard(start):
+        start = int(start)
+        user_idx = np.asarray(dataset.user_idx[start:start + shard_rows])
+        movie_idx = np.asarray(dataset.movie_idx[start:start + shard_rows])
+        rating = np.asarray(dataset.rating[start:start + shard_rows])
+        mask = validation_mask(dataset.user_ids[user_idx], dataset.movie_ids[movie_idx])
+        if not validation:
+            mask = ~mask
+        rows = np.flatnonzero(mask)
+        if not validation:
+            np.random.default_rng().shuffle(rows)
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            yield (user_idx[batch, None], movie_idx[batch, None]), rating[batch]
+
+    signature = (
+        (tf.TensorSpec(shape=(None, 1), dtype=tf.int32), tf.TensorSpec(shape=(None, 1), dtype=tf.int32)),
+        tf.TensorSpec(shape=(None,), dtype=tf.float32),
+    )
+    shards = tf.data.Dataset.from_tensor_slices(starts)
+    if not validation:
+        shards = shards.shuffle(len(starts), reshuffle_each_iteration=True)
+    pipeline = shards.interleave(
+        lambda start: tf.data.Dataset.from_generator(read_shard, output_signature=signature, args=(start,)),
+        cycle_length=cycle_length,
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=validation,
+    )
+    if not validation:
+        pipeline = pipeline.shuffle(shuffle_buffer_batches, reshuffle_each_iteration=True)
+    return pipeline.prefetch(tf.data.AUTOTUNE)
+
+
+class EpochTimer(tf.keras.callbacks.Callback):
+    """에포크마다 소요 시간과 초당 학습 샘플 수를 출력하고 logs에 기록합니다."""
+
+    def __init__(self, n_samples: int):
+        super().__init__()
+        self.n_samples = n_samples
+        self._start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._start
+        rate = self.n_samples / elapsed if elapsed else 0.0
+        if logs is not None:
+            logs["epoch_sec"] = elapsed
+            logs["samples_per_sec"] = rate
+        print(f"\n⏱️ 에포크 {epoch + 1}: {elapsed:.1f}초, {rate:,.0f}샘플/초")
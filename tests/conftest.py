@@ -0,0 +1,44 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+# backend 패키지(app/)와, app.backend로 import하는 스크립트(저장소 루트)를 모두 찾을 수 있게 합니다.
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (repo_root, os.path.join(repo_root, "app")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+INIT_SQL_PATH = os.path.join(repo_root, "init.sql")
+
+
+@pytest.fixture
+def database_url():
+    """
+    TEST_DATABASE_URL의 서버에 임시 DB를 만들고 init.sql을 적용한 뒤 접속 URL을 넘깁니다. (테스트가 끝나면 삭제)
+    TEST_DATABASE_URL이 없으면 DB 테스트는 건너뜁니다.
+    """
+    server_url = os.getenv("TEST_DATABASE_URL")
+    if not server_url:
+        pytest.skip("TEST_DATABASE_URL이 설정되지 않아 DB 테스트를 건너뜁니다.")
+    url = make_url(server_url)
+    name = f"ott_rec_test_{os.getpid()}"
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        connection.execute(text(f'CREATE DATABASE "{name}"'))
+
+    test_url = url.set(database=name)
+    engine = create_engine(test_url)
+    with open(INIT_SQL_PATH, encoding="utf-8") as f, engine.begin() as connection:
+        connection.exec_driver_sql(f.read())
+    engine.dispose()
+    try:
+        yield test_url.render_as_string(hide_password=False)
+    finally:
+        with admin.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        admin.dispose()
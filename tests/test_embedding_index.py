@@ -0,0 +1,63 @@
+# tests/test_embedding_index.py
+# IVF 임베딩 검색이, 탐색한 리스트에 나이/성별 구간의 후보가 없어도 유효한 후보가 있으면 결과를 반환하는지 확인합니다.
+import numpy as np
+
+from backend.core.embedding_index import EmbeddingIndex
+from backend.core.matching_index import MatchingIndex
+from backend.core.ncf_inference import NCFPredictor
+
+N_USERS, N_MOVIES, DIM = 400, 50, 8
+
+
+def build(n_lists):
+    rng = np.random.default_rng(13)
+    user_ids = np.arange(1, N_USERS + 1, dtype=np.int64)
+    genders = rng.choice(["M", "F"], N_USERS).astype(object)
+    ages = rng.integers(18, 60, N_USERS).astype(np.int64)
+    pair_users = np.repeat(user_ids, 3)
+    pair_movies = rng.integers(1, N_MOVIES + 1, len(pair_users)).astype(np.int64)
+    index = MatchingIndex.from_arrays(user_ids, genders, ages, pair_users, pair_movies)
+
+    # 학습 샘플에 없던 사용자(일부)는 임베딩이 없어 후보에서 제외됩니다.
+    model_users = np.sort(rng.choice(user_ids, size=N_USERS - 40, replace=False)).astype(np.int32)
+    predictor = NCFPredictor({
+        "user_embedding": rng.normal(size=(len(model_users), DIM)).astype(np.float32),
+        "movie_embedding": rng.normal(size=(N_MOVIES, DIM)).astype(np.float32),
+        "w1": rng.normal(size=(2 * DIM, 32)).astype(np.float32), "b1": np.zeros(32, np.float32),
+        "w2": rng.normal(size=(32, 16)).astype(np.float32), "b2": np.zeros(16, np.float32),
+        "w3": rng.normal(size=(16, 1)).astype(np.float32), "b3": np.zeros(1, np.float32),
+        "user_ids": model_users, "movie_ids": np.arange(1, N_MOVIES + 1, dtype=np.int32),
+    })
+    return index, EmbeddingIndex.build(index, predictor, model_mtime=0.0, n_lists=n_lists)
+
+
+def test_ivf_search_returns_a_match_whenever_the_bucket_has_valid_rows():
+    index, ivf = build(n_lists=64)
+    _, exact = build(n_lists=0)
+    rng = np.random.default_rng(17)
+    fallbacks = 0
+    for _ in range(50):
+        gender = str(rng.choice(["M", "F"]))
+        age = int(rng.integers(20, 58))
+        lo, hi = index.candidate_range(gender, age, age + 1)  # 후보가 몇 명뿐인 좁은 구간
+        query = rng.normal(size=DIM).astype(np.float32)
+        results = ivf.search(index, lo, hi, query, k=1, n_probe=2)
+
+        if not np.any(ivf.valid[lo:hi]):
+            assert results == []
+            continue
+        assert len(results) == 1
+        if len(ivf._candidate_rows(query / np.linalg.norm(query), lo, hi, 2)) == 0:
+            fallbacks += 1
+            assert results == exact.search(index, lo, hi, query, k=1)
+    assert fallbacks > 0
+
+
+def test_ivf_search_without_fallback_stays_inside_probed_lists():
+    index, ivf = build(n_lists=4)
+    lo, hi = 0, len(index.row_user_ids)
+    query = np.ones(DIM, dtype=np.float32)
+    results = ivf.search(index, lo, hi, query, k=3, n_probe=1)
+    rows = ivf._candidate_rows(query / np.linalg.norm(query), lo, hi, 1)
+    allowed = set(index.row_user_ids[rows].tolist())
+    assert len(results) == 3 and all(user_id in allowed for user_id, _ in results)
@@ -0,0 +1,203 @@
+# tests/test_matching_engines.py
+# 고정된 작은 평점 행렬에서 모든 매칭 엔진이 기존 pandas 루프와 같은 (ml_user_id, 유사도)를 반환하는지 확인합니다.
+# (동점이면 ml_user_id가 가장 작은 사용자)
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.core import user_matching
+from backend.core.matching_index import MatchingIndex
+from backend.core.minhash_lsh import MinHashLSH
+from backend.core.topk_search import SetSimilarityIndex
+from backend.scripts import update_user_profiles
+
+
+def make_fixture():
+    """
+    사용자 61명 × 영화 25편의 고정 평점 데이터.
+    - 시청 편수가 적어 유사도 동점이 많고, 평점이 없는 사용자와 같은 (사용자, 영화) 중복 평점도 포함합니다.
+    - 사용자 61, 2는 같은 버킷의 같은 시청 목록이라, 동점 시 작은 ID가 이겨야 합니다.
+    - 사용자 62는 혼자 있는 버킷(F, 50세)의 평점 없는 사용자입니다.
+    """
+    rng = np.random.default_rng(7)
+    users = [(user_id, str(rng.choice(["M", "F"])), int(rng.integers(20, 31))) for user_id in range(3, 61)]
+    ratings = []
+    for user_id, _, _ in users:
+        for movie_id in rng.choice(np.arange(1, 26), size=int(rng.integers(0, 8)), replace=False).tolist():
+            ratings.append((user_id, movie_id, float(rng.integers(1, 6))))
+    ratings += [(5, 3, 4.0), (5, 3, 2.0)]
+    users += [(61, "M", 25), (2, "M", 25), (62, "F", 50)]
+    ratings += [(61, m, 5.0) for m in (4, 9, 17)] + [(2, m, 3.0) for m in (17, 9, 4)]
+    return users, ratings
+
+
+def make_queries(users, ratings):
+    """(성별, 최소 나이, 최대 나이, 선호 영화 ID 집합) 목록. 평점에 없는 영화(26, 27)와 빈 집합도 포함합니다."""
+    rng = np.random.default_rng(11)
+    queries = []
+    for _ in range(150):
+        age = int(rng.integers(18, 34))
+        picks = rng.choice(np.arange(1, 28), size=int(rng.integers(0, 11)), replace=False).tolist()
+        queries.append((str(rng.choice(["M", "F"])), age - 5, age + 5, set(picks)))
+    watched = {}
+    for user_id, movie_id, _ in ratings:
+        watched.setdefault(user_id, set()).add(movie_id)
+    for user_id, gender, age in users:
+        if user_id in watched:
+            queries.append((gender, age - 5, age + 5, set(watched[user_id])))  # 자기 자신과 유사도 1
+    queries += [("F", 45, 55, {1, 2}), ("M", 70, 80, {1, 2})]  # 평점 있는 후보 없음 / 후보 없음
+    return queries
+
+
+def reference_match(users, ratings, gender, age_min, age_max, movie_ids):
+    """기존 find_similar_user의 pandas 필터링 + 자카드 루프"""
+    ml_users_df = pd.DataFrame(users, columns=["ml_user_id", "gender", "age"])
+    ratings_df = pd.DataFrame(ratings, columns=["ml_user_id", "movie_id", "rating"])
+    candidates_df = ml_users_df[(ml_users_df["age"].between(age_min, age_max)) & (ml_users_df["gender"] == gender)]
+    candidate_ids = candidates_df["ml_user_id"].tolist()
+    if not candidate_ids:
+        return None, 0
+
+    candidate_ratings = ratings_df[ratings_df["ml_user_id"].isin(candidate_ids)]
+    user_movie_groups = candidate_ratings.groupby("ml_user_id")["movie_id"].apply(set)
+    if user_movie_groups.empty:
+        return None, 0
+
+    best_match_user_id, max_similarity = -1, -1
+    for ml_user_id, watched_movie_ids in user_movie_groups.items():
+        similarity = user_matching.jaccard_similarity(movie_ids, watched_movie_ids)
+        if similarity > max_similarity:
+            max_similarity = similarity
+            best_match_user_id = ml_user_id
+    return (int(best_match_user_id), max_similarity) if best_match_user_id != -1 else (None, 0)
+
+
+USERS, RATINGS = make_fixture()
+QUERIES = make_queries(USERS, RATINGS)
+EXPECTED = [reference_match(USERS, RATINGS, *query) for query in QUERIES]
+
+
+def build_index():
+    user_ids, genders, ages = (np.array(column) for column in zip(*USERS))
+    pairs = np.array([(u, m) for u, m, _ in RATINGS], dtype=np.int64)
+    return MatchingIndex.from_arrays(user_ids.astype(np.int64), genders.astype(object), ages.astype(np.int64),
+                                     pairs[:, 0], pairs[:, 1])
+
+
+def normalize(result):
+    user_id, similarity = result
+    return (None, 0) if user_id is None else (int(user_id), float(similarity))
+
+
+def test_fixture_has_ties_and_zero_matches():
+    similarities = [similarity for _, similarity in EXPECTED]
+    assert any(similarity == 0 for similarity in similarities)
+    assert any(user_id is None for user_id, _ in EXPECTED)
+    assert reference_match(USERS, RATINGS, "M", 20, 30, {4, 9, 17}) == (2, 1.0)
+
+
+def test_index_engine_matches_reference(monkeypatch):
+    index = build_index()
+    monkeypatch.setattr(user_matching, "get_matching_index", lambda db: index)
+    for query, expected in zip(QUERIES, EXPECTED):
+        assert normalize(user_matching._match_with_index(None, *query)) == expected, query
+
+
+def test_index_anytime_matches_reference_and_stops_at_deadline():
+    index = build_index()
+    for query, expected in zip(QUERIES, EXPECTED):
+        gender, age_min, age_max, movie_ids = query
+        lo, hi = index.candidate_range(gender, age_min, age_max)
+        result, complete, scanned = index.best_match_anytime(lo, hi, movie_ids, time.perf_counter() + 60, chunk=4)
+        assert complete and scanned == 1.0
+        assert normalize(result) == expected, query
+
+    lo, hi = index.candidate_range("M", 20, 30)
+    result, complete, scanned = index.best_match_anytime(lo, hi, {4, 9, 17}, deadline=time.perf_counter())
+    assert (result, complete, scanned) == ((None, 0), False, 0.0)
+
+
+@pytest.fixture
+def anytime_user(monkeypatch):
+    """find_similar_user_anytime이 DB 대신 고정 데이터를 쓰도록 바꾸고, 저장된 매칭 결과 목록을 넘깁니다."""
+    index = build_index()
+    saved = []
+    monkeypatch.setattr(user_matching, "_load_match_query", lambda db, user_id: (None, "M", 20, 30, {4, 9, 17}))
+    monkeypatch.setattr(user_matching.crud, "get_data_version", lambda db, table_name: 1)
+    monkeypatch.setattr(user_matching.crud, "get_watched_movies_by_ml_user", lambda db, ml_user_id: [])
+    monkeypatch.setattr(user_matching, "save_match_to_db", lambda db, user, *args: saved.append(args))
+    monkeypatch.setattr(user_matching, "save_match_to_jsonl", lambda *args: None)
+    monkeypatch.setitem(user_matching.ANYTIME_ENGINES, "index", (lambda version: index, None))
+    return saved
+
+
+def test_anytime_default_engine_honours_budget(anytime_user):
+    assert user_matching.find_similar_user_anytime(None, "new-user", budget_ms=0) == (None, 0, False, 0.0)
+    assert anytime_user == []
+
+    result = user_matching.find_similar_user_anytime(None, "new-user", budget_ms=10_000)
+    assert result == (2, 1.0, True, 1.0)
+    assert anytime_user == [(2, 1.0, [], 1)]
+
+
+def test_topk_engine_matches_reference(monkeypatch):
+    set_index = SetSimilarityIndex(build_index())
+    monkeypatch.setattr(user_matching, "get_set_similarity_index", lambda db: set_index)
+    for query, expected in zip(QUERIES, EXPECTED):
+        assert normalize(user_matching._match_with_topk(None, *query)) == expected, query
+
+        gender, age_min, age_max, movie_ids = query
+        lo, hi = set_index.index.candidate_range(gender, age_min, age_max)
+        result, complete, _ = set_index.search_anytime(lo, hi, movie_ids, deadline=time.perf_counter() + 60)
+        assert complete
+        assert normalize(result) == expected, query
+
+
+def test_minhash_engine_matches_reference_when_exact(monkeypatch):
+    """
+    MinHash-LSH는 근사 매칭이므로, 결과가 정확해야 하는 경우만 비교합니다.
+    - 겹치는 영화가 없어 LSH 후보가 없으면 정확한 매칭(best_match)으로 대체됩니다.
+    - 최고 유사도가 1이면(같은 시청 목록) 모든 밴드가 같은 버킷이므로 동점 후보가 모두 후보에 들어갑니다.
+    """
+    index = build_index()
+    lsh = MinHashLSH.build(index)
+    monkeypatch.setattr(user_matching, "get_lsh_index", lambda db: (index, lsh))
+    checked = 0
+    for query, expected in zip(QUERIES, EXPECTED):
+        gender, age_min, age_max, movie_ids = query
+        lo, hi = index.candidate_range(gender, age_min, age_max)
+        in_bucket = lsh.candidates(movie_ids)
+        no_candidates = not np.any((in_bucket >= lo) & (in_bucket < hi))
+        if no_candidates or expected[1] == 1.0:
+            assert normalize(user_matching._match_with_minhash(None, *query)) == expected, query
+            checked += 1
+    assert checked >= 20
+
+
+@pytest.fixture
+def profile_db(database_url, monkeypatch):
+    """고정 평점 데이터를 적재하고 ml_user_profile을 만든 DB 세션"""
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO movie_lens_data (ml_user_id, gender, age) VALUES (:u, :g, :a)"),
+                           [{"u": u, "g": g, "a": a} for u, g, a in USERS])
+        connection.execute(text("INSERT INTO movie (movie_id, title) "
+                                "SELECT i, 'movie ' || i FROM generate_series(1, 27) AS i"))
+        connection.execute(text("INSERT INTO rating (ml_user_id, movie_id, rating) VALUES (:u, :m, :r)"),
+                           [{"u": u, "m": m, "r": r} for u, m, r in RATINGS])
+    monkeypatch.setattr(update_user_profiles, "DATABASE_URL", database_url)
+    update_user_profiles.update_user_profiles(full=True)
+
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_sql_engine_matches_reference(profile_db):
+    for query, expected in zip(QUERIES, EXPECTED):
+        assert normalize(user_matching._match_with_sql(profile_db, *query)) == expected, query
@@ -0,0 +1,36 @@
+# tests/test_movie_titles.py
+# 프로세스 전역 제목 인덱스가 movie.title 변경(데이터 버전 'movie_title')을 반영하는지 확인합니다. (TEST_DATABASE_URL 필요)
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.core import movie_titles
+
+
+@pytest.fixture
+def db(database_url, monkeypatch):
+    monkeypatch.setattr(movie_titles, "_title_index", None)
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO movie (movie_id, title) VALUES (1, 'Heat'), (2, 'Alien'), (3, 'Heat')"))
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_title_index_is_rebuilt_when_movie_titles_change(db):
+    assert movie_titles.get_title_index(db) == {"Heat": 1, "Alien": 2}  # 제목이 겹치면 작은 movie_id
+    assert movie_titles.get_title_index(db) is movie_titles.get_title_index(db)
+
+    db.execute(text("UPDATE movie SET title = 'Aliens' WHERE movie_id = 2"))
+    db.execute(text("DELETE FROM movie WHERE movie_id = 1"))
+    db.execute(text("INSERT INTO movie (movie_id, title) VALUES (4, 'Up')"))
+    db.commit()
+    assert movie_titles.get_title_index(db) == {"Heat": 3, "Aliens": 2, "Up": 4}
+
+    # 제목과 무관한 컬럼 변경은 인덱스를 다시 만들지 않습니다.
+    index = movie_titles.get_title_index(db)
+    db.execute(text("UPDATE movie SET view_count = 5 WHERE movie_id = 3"))
+    db.commit()
+    assert movie_titles.get_title_index(db) is index
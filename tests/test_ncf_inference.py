@@ -0,0 +1,87 @@
+# tests/test_ncf_inference.py
+# NCFPredictor의 분해된 계산 경로(첫 층을 사용자/영화 부분으로 나눈 계산)를
+# mysqlmovie.py 모델 그대로의 concat → Dense 32 → 16 → 1 순전파와 비교합니다. (NumPy만 사용)
+import numpy as np
+import pytest
+
+from backend.core.ncf_inference import NCF_ARRAY_NAMES, NCFPredictor
+
+N_USERS, N_MOVIES, DIM = 7, 11, 8
+
+
+@pytest.fixture
+def arrays():
+    rng = np.random.default_rng(3)
+    weights = {
+        "user_embedding": rng.normal(size=(N_USERS, DIM)),
+        "movie_embedding": rng.normal(size=(N_MOVIES, DIM)),
+        "w1": rng.normal(size=(2 * DIM, 32)), "b1": rng.normal(size=32),
+        "w2": rng.normal(size=(32, 16)) / 4, "b2": rng.normal(size=16),
+        "w3": rng.normal(size=(16, 1)) / 4, "b3": rng.normal(size=1) + 3,
+    }
+    arrays = {name: value.astype(np.float32) for name, value in weights.items()}
+    # 원본 ID는 정렬되어 있지 않습니다. (평점 데이터셋의 첫 등장 순서 매핑)
+    arrays["user_ids"] = rng.permutation(np.arange(100, 100 + N_USERS)).astype(np.int32)
+    arrays["movie_ids"] = rng.permutation(np.arange(1, 3 * N_MOVIES, 3)).astype(np.int32)
+    return arrays
+
+
+def naive_forward(arrays, user_idx, movie_idx):
+    """임베딩 concat 후 Dense(ReLU) 두 층과 출력 층을 그대로 계산합니다."""
+    x = np.concatenate([arrays["user_embedding"][user_idx], arrays["movie_embedding"][movie_idx]], axis=1)
+    h = np.maximum(x @ arrays["w1"] + arrays["b1"], 0)
+    h = np.maximum(h @ arrays["w2"] + arrays["b2"], 0)
+    return (h @ arrays["w3"] + arrays["b3"])[:, 0]
+
+
+def all_pairs():
+    users, movies = np.meshgrid(np.arange(N_USERS), np.arange(N_MOVIES), indexing="ij")
+    return users.ravel(), movies.ravel()
+
+
+def test_predict_indices_matches_naive_forward(arrays):
+    predictor = NCFPredictor(arrays)
+    users, movies = all_pairs()
+    np.testing.assert_allclose(predictor.predict_indices(users, movies), naive_forward(arrays, users, movies),
+                               rtol=1e-5, atol=1e-5)
+
+
+def test_predict_user_and_predict_users_match_naive_forward(arrays):
+    predictor = NCFPredictor(arrays)
+    users, movies = all_pairs()
+    expected = naive_forward(arrays, users, movies).reshape(N_USERS, N_MOVIES)
+
+    for user_idx in range(N_USERS):
+        np.testing.assert_allclose(predictor.predict_user(user_idx), expected[user_idx], rtol=1e-5, atol=1e-5)
+        np.testing.assert_allclose(predictor.predict_user(user_idx, [4, 0, 9]), expected[user_idx, [4, 0, 9]],
+                                   rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(predictor.predict_users(np.arange(N_USERS)), expected, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(predictor.predict_users([5, 2]), expected[[5, 2]], rtol=1e-5, atol=1e-5)
+
+
+def test_predict_maps_original_ids_and_marks_unknown_as_nan(arrays, tmp_path):
+    path = tmp_path / "ncf.npz"
+    np.savez(path, **{name: arrays[name] for name in NCF_ARRAY_NAMES})
+    predictor = NCFPredictor.load(str(path))
+
+    user_ids = [arrays["user_ids"][2], arrays["user_ids"][6], 9999, arrays["user_ids"][0]]
+    movie_ids = [arrays["movie_ids"][10], arrays["movie_ids"][3], arrays["movie_ids"][1], 2]
+    scores = predictor.predict(user_ids, movie_ids)
+
+    expected = naive_forward(arrays, [2, 6], [10, 3])
+    np.testing.assert_allclose(scores[:2], expected, rtol=1e-5, atol=1e-5)
+    assert np.isnan(scores[2:]).all()
+
+
+def test_fold_in_moves_predictions_toward_target(arrays):
+    predictor = NCFPredictor(arrays)
+    picks = np.array([1, 4, 7])
+    anchor = predictor.mean_user_embedding.astype(np.float32)
+    user_vector = predictor.fold_in(picks, steps=100)
+
+    def loss(vector):
+        return np.mean((predictor.predict_embedding(vector, picks) - 5.0) ** 2)
+
+    assert user_vector.shape == (DIM,)
+    assert loss(user_vector) < loss(anchor)
+    np.testing.assert_array_equal(predictor.fold_in([]), anchor)
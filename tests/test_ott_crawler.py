@@ -0,0 +1,120 @@
+# tests/test_ott_crawler.py
+# stub_search_server.py를 띄워 OTT 크롤러의 토큰 버킷, AIMD 백오프(429/Retry-After), 응답 파싱 경로를 확인합니다.
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.backend.scripts.stub_search_server import PLATFORMS, serve, stub_platforms
+from app.backend.scripts.update_ott_info import OTTUpdater
+from app.backend.services.async_ott_search import AIMDConcurrency, AsyncOTTSearcher, TokenBucket
+from app.backend.services.ott_search import OTTSearchError, build_search_query
+
+OTT_ROWS = [SimpleNamespace(ott_name=name, ott_id=f"uuid-{i}", bit_position=i) for i, name in enumerate(PLATFORMS)]
+
+
+@pytest.fixture
+def stub_server():
+    """stub 서버를 임의 포트로 띄우고 (설정 함수)를 넘깁니다. 설정 함수는 검색 API 주소를 반환합니다."""
+    servers = []
+
+    def start(fail_rate=0.0, latency_ms=0, fail_statuses=(429, 503)):
+        server = serve(port=0, fail_rate=fail_rate, latency_ms=latency_ms, fail_statuses=fail_statuses)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/customsearch/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class RecordingUpdater(OTTUpdater):
+    """DB 대신 저장할 행을 모아 두는 크롤러"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written = []
+
+    def write_batch(self, rows):
+        self.written.extend(rows)
+        return len(rows)
+
+
+def make_updater(tmp_path, base_url, **kwargs):
+    return RecordingUpdater(
+        "key", "cx", PLATFORMS, base_url=base_url, cache_path=str(tmp_path / "cache.sqlite"),
+        checkpoint_path=str(tmp_path / "checkpoint.json"), flush_interval_ms=50, **kwargs,
+    )
+
+
+def test_token_bucket_limits_rate():
+    async def acquire_all(bucket, n):
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 버스트 1개 이후에는 초당 20개: 11번째 토큰까지 최소 0.5초
+    elapsed = asyncio.run(acquire_all(TokenBucket(20, capacity=1), 11))
+    assert 0.45 <= elapsed < 1.5
+
+
+def test_aimd_increases_on_success_and_halves_on_overload():
+    async def scenario():
+        aimd = AIMDConcurrency(initial=4, max_limit=8)
+        for _ in range(4):
+            await aimd.on_success()
+        grown = aimd.limit
+        await aimd.on_overload()
+        return grown, aimd.limit
+
+    assert asyncio.run(scenario()) == (5, 2)
+
+
+def test_searcher_backs_off_on_429_with_retry_after(stub_server):
+    base_url = stub_server(fail_rate=1.0, fail_statuses=(429,))
+
+    async def search():
+        async with AsyncOTTSearcher("key", "cx", base_url=base_url, rate_per_sec=100,
+                                    initial_concurrency=4, max_retries=1) as searcher:
+            start = time.monotonic()
+            with pytest.raises(OTTSearchError) as error:
+                await searcher.search("inception site:justwatch.com")
+            return searcher, error.value, time.monotonic() - start
+
+    searcher, error, elapsed = asyncio.run(search())
+    assert error.status_code == 429
+    assert searcher.stats == {"requests": 2, "retries": 1, "overloaded": 2, "failed": 1}
+    assert searcher.concurrency.limit == 1  # 4 → 2 → 1
+    assert 1.0 <= elapsed < 2.0  # Retry-After: 1초를 따른 한 번의 재시도
+
+
+def test_run_parses_stub_responses_into_ott_list_and_mask(stub_server, tmp_path):
+    base_url = stub_server()
+    updater = make_updater(tmp_path, base_url, rate_per_sec=100)
+    updater.load_ott_map(OTT_ROWS)
+    movies = [(1, "Inception"), (2, "inception "), (3, "Toy Story"), (4, "기생충")]
+
+    asyncio.run(updater.run(movies=movies))
+
+    written = {movie_id: (ott_list, ott_mask) for movie_id, ott_list, ott_mask in updater.written}
+    assert sorted(written) == [1, 2, 3, 4]
+    for movie_id, title in movies:
+        platforms = stub_platforms(build_search_query(title))
+        ott_list, ott_mask = written[movie_id]
+        assert ott_list == {row.ott_id: row.ott_name in platforms for row in OTT_ROWS}
+        assert ott_mask == sum(1 << row.bit_position for row in OTT_ROWS if row.ott_name in platforms)
+    # 표기만 다른 제목은 같은 쿼리로 한 번만 검색합니다.
+    assert updater.stats["fetched"] == 3
+    assert updater.stats["failed"] == 0
+
+
+def test_run_with_movies_requires_ott_map(stub_server, tmp_path):
+    updater = make_updater(tmp_path, stub_server())
+    with pytest.raises(ValueError):
+        asyncio.run(updater.run(movies=[(1, "Inception")]))
+    assert updater.written == []
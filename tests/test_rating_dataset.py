@@ -0,0 +1,37 @@
+# tests/test_rating_dataset.py
+# 원본 CSV가 바뀌면(크기가 같은 수정 포함) 컴파일된 평점 데이터셋을 다시 만드는지 확인합니다.
+import numpy as np
+
+from backend.core.array_store import FINGERPRINT_BLOCK_BYTES, file_fingerprint
+from backend.core.rating_dataset import compile_dataset, load_or_compile_dataset
+
+
+def write_ratings(path, n_rows=400_000):
+    rng = np.random.default_rng(5)
+    lines = ["userId,movieId,rating,timestamp"] + [
+        f"{u},{m},{r},1" for u, m, r in zip(rng.integers(1, 500, n_rows), rng.integers(1, 900, n_rows),
+                                            rng.choice(["1.5", "2.5", "3.5", "4.5"], n_rows))
+    ]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_same_size_edit_in_the_middle_invalidates_dataset(tmp_path):
+    csv = tmp_path / "ratings.csv"
+    write_ratings(csv)
+    content = csv.read_bytes()
+    assert len(content) > 3 * FINGERPRINT_BLOCK_BYTES
+
+    dataset = compile_dataset(str(csv), str(tmp_path / "dataset"), frac=1.0)
+    assert dataset.is_current(str(csv), 1.0)
+
+    # 파일 한가운데의 평점 하나를 같은 길이의 값으로 바꿉니다. (3.5 → 4.5)
+    middle = content.index(b",3.5,", len(content) // 2)
+    edited = content[:middle] + b",4.5," + content[middle + 5:]
+    csv.write_bytes(edited)
+    assert len(edited) == len(content)
+    assert file_fingerprint(str(csv)) != dataset.meta["source"]
+    assert not dataset.is_current(str(csv), 1.0)
+
+    rebuilt = load_or_compile_dataset(str(csv), str(tmp_path / "dataset"), frac=1.0)
+    assert rebuilt.is_current(str(csv), 1.0)
+    assert float(np.asarray(rebuilt.rating).sum()) == float(np.asarray(dataset.rating).sum()) + 1.0
@@ -0,0 +1,30 @@
+# tests/test_recommender.py
+# summarize_recommendation의 최적 OTT(top_ott)가 기존과 같은 가중치 없는 편수 기준인지 확인합니다.
+from collections import Counter
+
+import numpy as np
+
+from backend.core.ott_matrix import OttMatrix
+from backend.core.recommender import summarize_recommendation
+
+# 비트 0: Netflix, 1: Tving, 2: Watcha
+MATRIX = OttMatrix(
+    movie_ids=np.array([1, 2, 3, 4, 5], dtype=np.int64),
+    masks=np.array([0b001, 0b001, 0b010, 0b011, 0b100], dtype=np.int64),
+    ott_bits=np.array([0, 1, 2], dtype=np.int64),
+    ott_names=["Netflix", "Tving", "Watcha"],
+)
+TITLES = {movie_id: f"movie {movie_id}" for movie_id in range(1, 7)}
+
+
+def test_top_ott_is_unweighted_count_while_ranking_is_weighted():
+    # Netflix는 3편(1, 2, 4)이지만 평점이 낮고, Tving은 2편(3, 4)이지만 평점 합이 더 큽니다.
+    movie_ids = [1, 2, 3, 4, 6]
+    ratings = [1.0, 1.0, 5.0, 5.0, 5.0]
+    result = summarize_recommendation(MATRIX, movie_ids, ratings, TITLES)
+
+    baseline = Counter(name for movie_id in movie_ids for name in MATRIX.platforms_of(movie_id))
+    assert result["top_ott"] == baseline.most_common(1)[0][0] == "Netflix"
+    assert result["ranked_otts"] == [["Tving", 10.0], ["Netflix", 7.0]]
+    assert result["movie_ids"] == [3, 4, 1, 2]  # OTT 정보가 없는 6은 제외, 평점 내림차순·동점 시 ID 오름차순
+    assert result["movie_otts"]["movie 4"] == ["Netflix", "Tving"]
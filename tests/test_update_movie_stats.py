@@ -0,0 +1,113 @@
+# tests/test_update_movie_stats.py
+# update_movie_stats의 증분 갱신 / 전체 재계산 결과를 기존 update_view_counts.py / update_averages.py의
+# 전체 재계산 SQL 결과와 비교합니다. (TEST_DATABASE_URL 필요)
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.scripts import update_movie_stats as stats
+
+# 기존 스크립트의 전체 재계산 SQL (시청 횟수 / 평균 평점)
+OLD_VIEW_COUNT_SQL = """
+UPDATE movie
+SET view_count = subquery.count
+FROM (
+    SELECT movie_id, COUNT(*) as count
+    FROM rating
+    GROUP BY movie_id
+) AS subquery
+WHERE movie.movie_id = subquery.movie_id;
+"""
+OLD_AVG_RATING_SQL = """
+UPDATE movie
+SET rating_avg = subquery.avg_rating
+FROM (
+    SELECT movie_id, AVG(rating) as avg_rating
+    FROM rating
+    GROUP BY movie_id
+) AS subquery
+WHERE movie.movie_id = subquery.movie_id;
+"""
+SNAPSHOT_SQL = "SELECT movie_id, view_count, rating_avg FROM movie ORDER BY movie_id"
+
+
+@pytest.fixture
+def engine(database_url, monkeypatch):
+    monkeypatch.setattr(stats, "DATABASE_URL", database_url)
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO movie_lens_data (ml_user_id, gender, age) "
+                                "SELECT i, 'M', 30 FROM generate_series(1, 5) AS i"))
+        connection.execute(text("INSERT INTO movie (movie_id, title) "
+                                "SELECT i, 'movie ' || i FROM generate_series(1, 6) AS i"))
+    yield engine
+    engine.dispose()
+
+
+def insert_ratings(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO rating (ml_user_id, movie_id, rating) VALUES (:u, :m, :r)"),
+                           [{"u": u, "m": m, "r": r} for u, m, r in rows])
+
+
+def run_stats(engine, capsys):
+    """update_movie_stats를 실행하고, 실행 경로(증분/전체)와 갱신 결과를 반환합니다."""
+    stats.update_movie_stats()
+    out = capsys.readouterr().out
+    assert "오류가 발생했습니다" not in out
+    with engine.connect() as connection:
+        snapshot = connection.execute(text(SNAPSHOT_SQL)).all()
+        watermark = connection.execute(text(
+            "SELECT last_rating_seq FROM aggregate_watermark WHERE job_name = :job_name"
+        ), {"job_name": stats.JOB_NAME}).scalar()
+        max_seq = connection.execute(text("SELECT COALESCE(MAX(rating_seq), 0) FROM rating")).scalar()
+    assert watermark == max_seq
+    path = "full" if "전체 재계산" in out else "delta" if "증분 갱신" in out else "none"
+    return path, snapshot
+
+
+def old_full_scan(engine):
+    """현재 movie 상태에 기존 전체 재계산 SQL을 적용한 결과 (롤백하므로 DB는 바뀌지 않습니다.)"""
+    with engine.connect() as connection:
+        with connection.begin() as transaction:
+            connection.execute(text(OLD_VIEW_COUNT_SQL))
+            connection.execute(text(OLD_AVG_RATING_SQL))
+            snapshot = connection.execute(text(SNAPSHOT_SQL)).all()
+            transaction.rollback()
+    return snapshot
+
+
+def test_incremental_then_rewrite_matches_old_full_scan(engine, capsys):
+    insert_ratings(engine, [(1, 1, 4.5), (2, 1, 3.0), (1, 2, 5.0), (3, 3, None), (2, 4, 1.5)])
+    path, snapshot = run_stats(engine, capsys)
+    assert path == "full"  # 워터마크가 없는 첫 실행
+    assert snapshot == old_full_scan(engine)
+
+    # 추가만 있으면 증분 갱신 (평점 없는 영화가 처음 평점을 받는 경우, NULL 평점, 반복 평균 포함)
+    insert_ratings(engine, [(3, 1, 2.0), (4, 2, 3.5), (3, 3, 4.0), (5, 5, 2.5), (4, 5, None), (5, 1, 3.5)])
+    path, snapshot = run_stats(engine, capsys)
+    assert path == "delta"
+    assert snapshot == old_full_scan(engine)
+
+    path, snapshot = run_stats(engine, capsys)
+    assert path == "none"
+    assert snapshot == old_full_scan(engine)
+
+    # 증분 갱신이 연달아 쌓여도 같은 결과
+    insert_ratings(engine, [(4, 1, 5.0), (5, 2, 0.5), (1, 3, 3.0)])
+    path, snapshot = run_stats(engine, capsys)
+    assert path == "delta"
+    assert snapshot == old_full_scan(engine)
+
+    # 수정/삭제가 있으면 전체 재계산
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE rating SET rating = 0.5 WHERE ml_user_id = 1 AND movie_id = 1"))
+        connection.execute(text("DELETE FROM rating WHERE movie_id = 4"))
+    path, snapshot = run_stats(engine, capsys)
+    assert path == "full"
+    assert snapshot == old_full_scan(engine)
+
+    # 재계산 뒤의 추가는 다시 증분 갱신
+    insert_ratings(engine, [(1, 4, 4.0), (2, 6, 5.0)])
+    path, snapshot = run_stats(engine, capsys)
+    assert path == "delta"
+    assert snapshot == old_full_scan(engine)
@@ -0,0 +1,92 @@
+# tests/test_update_user_profiles.py
+# update_user_profiles의 증분 갱신 / 전체 재생성 결과를 rating 전체를 다시 집계한 결과와 비교합니다. (TEST_DATABASE_URL 필요)
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.scripts import update_user_profiles as profiles
+
+SNAPSHOT_SQL = "SELECT ml_user_id, gender, age, movie_ids, movie_count FROM ml_user_profile ORDER BY ml_user_id"
+
+
+@pytest.fixture
+def engine(database_url, monkeypatch):
+    monkeypatch.setattr(profiles, "DATABASE_URL", database_url)
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO movie_lens_data (ml_user_id, gender, age) "
+                                "SELECT i, CASE WHEN i % 2 = 0 THEN 'F' ELSE 'M' END, 20 + i FROM generate_series(1, 5) AS i"))
+        connection.execute(text("INSERT INTO movie (movie_id, title) "
+                                "SELECT i, 'movie ' || i FROM generate_series(1, 6) AS i"))
+    yield engine
+    engine.dispose()
+
+
+def insert_ratings(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO rating (ml_user_id, movie_id, rating) VALUES (:u, :m, :r)"),
+                           [{"u": u, "m": m, "r": r} for u, m, r in rows])
+
+
+def run_profiles(engine, capsys):
+    """update_user_profiles를 실행하고, 실행 경로(증분/전체)와 갱신 결과를 반환합니다."""
+    profiles.update_user_profiles()
+    out = capsys.readouterr().out
+    assert "오류가 발생했습니다" not in out
+    with engine.connect() as connection:
+        snapshot = connection.execute(text(SNAPSHOT_SQL)).all()
+        watermark = connection.execute(text(
+            "SELECT last_rating_seq FROM aggregate_watermark WHERE job_name = :job_name"
+        ), {"job_name": profiles.JOB_NAME}).scalar()
+        max_seq = connection.execute(text("SELECT COALESCE(MAX(rating_seq), 0) FROM rating")).scalar()
+    assert watermark == max_seq
+    path = "full" if "전체 재생성" in out else "delta" if "증분 갱신" in out else "none"
+    return path, snapshot
+
+
+def full_rebuild(engine):
+    """현재 rating 전체를 다시 집계한 결과 (롤백하므로 DB는 바뀌지 않습니다.)"""
+    with engine.connect() as connection:
+        with connection.begin() as transaction:
+            connection.execute(text(profiles.REBUILD_PROFILES_SQL))
+            snapshot = connection.execute(text(SNAPSHOT_SQL)).all()
+            transaction.rollback()
+    return snapshot
+
+
+def test_incremental_then_rewrite_matches_full_rebuild(engine, capsys):
+    insert_ratings(engine, [(1, 1, 4.5), (2, 1, 3.0), (1, 2, 5.0), (3, 3, None)])
+    path, snapshot = run_profiles(engine, capsys)
+    assert path == "full"  # 워터마크가 없는 첫 실행
+    assert snapshot == full_rebuild(engine)
+
+    # 추가만 있으면 증분 갱신 (처음 평점을 받는 사용자, 이미 본 영화의 중복 평점 포함)
+    insert_ratings(engine, [(3, 1, 2.0), (4, 2, 3.5), (1, 2, 4.0), (2, 5, None)])
+    path, snapshot = run_profiles(engine, capsys)
+    assert path == "delta"
+    assert snapshot == full_rebuild(engine)
+    assert len(snapshot) == 4
+
+    path, snapshot = run_profiles(engine, capsys)
+    assert path == "none"
+    assert snapshot == full_rebuild(engine)
+
+    # 증분 갱신이 연달아 쌓여도 같은 결과
+    insert_ratings(engine, [(5, 6, 5.0), (4, 1, 0.5), (1, 3, 3.0)])
+    path, snapshot = run_profiles(engine, capsys)
+    assert path == "delta"
+    assert snapshot == full_rebuild(engine)
+
+    # 수정/삭제가 있으면 전체 재생성 (평점이 모두 지워진 사용자 5의 프로필도 사라집니다.)
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE rating SET movie_id = 4 WHERE ml_user_id = 1 AND movie_id = 1"))
+        connection.execute(text("DELETE FROM rating WHERE movie_id = 6"))
+    path, snapshot = run_profiles(engine, capsys)
+    assert path == "full"
+    assert snapshot == full_rebuild(engine)
+    assert 5 not in [row.ml_user_id for row in snapshot]
+
+    # 재생성 뒤의 추가는 다시 증분 갱신
+    insert_ratings(engine, [(5, 2, 4.0), (2, 6, 5.0)])
+    path, snapshot = run_profiles(engine, capsys)
+    assert path == "delta"
+    assert snapshot == full_rebuild(engine)